@@ -1,6 +1,6 @@
 # src/api/fastapi_app.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse
 import json
 import asyncio
@@ -14,7 +14,9 @@ from src.core_engine.get_path import get_shortest_path
 from src.core_engine.simulate_route import simulate_route
 from src.core_engine.check_obstacles import is_obstacle
 from src.core_engine.navigator import Navigator
-from src.pathfinding.reroute import reroute
+from src.graph_builder.registry import graph_metrics
+from src.graph_builder.hot_swap import current_graph, GraphWatcher, graph_version_metrics
+from src.core_engine.route_cache import route_cache
 
 app = FastAPI(
     title="NavyShip Navigation API",
@@ -22,16 +24,40 @@ app = FastAPI(
     version="2.0.0"
 )
 
+
+_watcher = GraphWatcher()
+
+
+@app.on_event("startup")
+def warm_graph_cache():
+    """Load the graph before the first request and start watching for rebuilds."""
+    try:
+        current_graph()
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(f"Graph not preloaded: {exc}")
+    _watcher.start()
+
+
+@app.on_event("shutdown")
+def stop_graph_watcher():
+    _watcher.stop()
+
 # ======================================================
 # 1️⃣ Shortest path
 # ======================================================
 
 @app.post("/route", response_model=RouteResponse)
 def route(data: RouteRequest):
-    result = get_shortest_path(
-        data.start_lat, data.start_lon,
-        data.end_lat, data.end_lon
-    )
+    try:
+        result = get_shortest_path(
+            data.start_lat, data.start_lon,
+            data.end_lat, data.end_lon,
+            algorithm=data.algorithm,
+            time_budget=data.time_budget,
+            epsilon=data.epsilon
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     return RouteResponse(**result)
 
 # ======================================================
@@ -40,10 +66,14 @@ def route(data: RouteRequest):
 
 @app.post("/simulate")
 def simulate(data: RouteRequest):
-    path_ids, coords, dist, status = simulate_route(
-        data.start_lat, data.start_lon,
-        data.end_lat, data.end_lon
-    )
+    try:
+        path_ids, coords, dist, status = simulate_route(
+            data.start_lat, data.start_lon,
+            data.end_lat, data.end_lon,
+            algorithm=data.algorithm
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
     return {
         "status": status,
@@ -98,22 +128,11 @@ async def navigate_stream(
             lat = nav.nodes[node_id]["lat"]
             lon = nav.nodes[node_id]["lon"]
 
-            yield (
-                "event: update\n"
-                f"data: {json.dumps({'node': node_id, 'lat': lat, 'lon': lon, 'step': index + 1})}\n\n"
-            )
-
-            await asyncio.sleep(nav.sleep)
-
-            if nav.obstacle_engine.obstacle_checker(lat, lon):
+            # the ship sits on path[index - 1]; look at the next node before moving
+            if index > 0 and nav.obstacle_engine.obstacle_checker(lat, lon):
                 yield "event: reroute\ndata: {\"message\": \"Obstacle detected\"}\n\n"
 
-                new_path, new_dist, new_status = reroute(
-                    node_id, goal_id,
-                    nav.nodes, nav.adj,
-                    obstacle_checker=nav.obstacle_engine.obstacle_checker,
-                    threshold_km=nav.threshold
-                )
+                new_path, new_dist, new_status = nav.replan(path[index - 1])
 
                 if new_path is None:
                     yield "event: error\ndata: {\"message\": \"Reroute failed\"}\n\n"
@@ -121,7 +140,7 @@ async def navigate_stream(
 
                 path = new_path
                 total_nodes = len(path)
-                index = 0
+                index = 1
 
                 yield (
                     "event: reroute_success\n"
@@ -129,8 +148,25 @@ async def navigate_stream(
                 )
                 continue
 
+            yield (
+                "event: update\n"
+                f"data: {json.dumps({'node': node_id, 'lat': lat, 'lon': lon, 'step': index + 1})}\n\n"
+            )
+
+            await asyncio.sleep(nav.sleep)
+
             index += 1
 
         yield "event: done\ndata: {\"message\": \"Destination reached\"}\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+# ======================================================
+# 5️⃣ Metrics
+# ======================================================
+
+@app.get("/metrics")
+def metrics():
+    return {"graphs": graph_metrics(), "graph": graph_version_metrics(),
+            "graph_swaps": _watcher.swaps, "graph_swap_error": _watcher.last_error,
+            "route_cache": route_cache.stats()}
@@ -7,12 +7,16 @@ class RouteRequest(BaseModel):
     start_lon: float
     end_lat: float
     end_lon: float
+    algorithm: str = "astar"
+    time_budget: float | None = None   # seconds, anytime A* (astar only)
+    epsilon: float | None = None       # first-round suboptimality factor
 
 class RouteResponse(BaseModel):
     status: str
     distance_km: float | None
     path_latlon: list
     path_node_ids: list
+    suboptimality_bound: float | None = None
 
 class ObstacleRequest(BaseModel):
     lat: float
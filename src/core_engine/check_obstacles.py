@@ -21,11 +21,9 @@ def batch_check(coords_list):
     Returns dict: {index: True/False}
     """
 
-    results = {}
-    for idx, (lat, lon) in enumerate(coords_list):
-        results[idx] = _engine.obstacle_checker(lat, lon)
-
-    return results
+    lats = [lat for lat, _ in coords_list]
+    lons = [lon for _, lon in coords_list]
+    return dict(enumerate(_engine.obstacle_checker_batch(lats, lons)))
 
 
 if __name__ == "__main__":
@@ -1,45 +1,97 @@
-from src.graph_builder.ocean_grid import load_nodes, load_graph_pickle
-from src.pathfinding.utils import find_nearest_node, nodes_to_coordinates
-from src.pathfinding.astar import astar
+from src.graph_builder.hot_swap import current_graph
+from src.pathfinding.utils import nodes_to_coordinates
+from src.pathfinding.search import find_path, API_ALGORITHMS, DEFAULT_ALGORITHM
+from src.pathfinding.anytime import ara_star
+from src.core_engine.route_cache import route_cache
 
+# first-round inflation when only a time budget is given
+DEFAULT_EPSILON = 2.5
 
-def get_shortest_path(start_lat, start_lon, goal_lat, goal_lon):
+
+def _frozen(result):
+    """Cache form of a result: the path lists become tuples nobody can mutate."""
+    return dict(result, path_latlon=tuple(result["path_latlon"]),
+                path_node_ids=tuple(result["path_node_ids"]))
+
+
+def _thawed(result):
+    """Fresh result dict with new path lists for the caller."""
+    return dict(result, path_latlon=list(result["path_latlon"]),
+                path_node_ids=list(result["path_node_ids"]))
+
+
+def get_shortest_path(start_lat, start_lon, goal_lat, goal_lon,
+                      algorithm=DEFAULT_ALGORITHM, time_budget=None, epsilon=None):
     """
-    Compute shortest path using A* without obstacle rerouting.
+    Compute shortest path without obstacle rerouting.
+    `algorithm` picks the search (astar, dijkstra, bidirectional_astar, alt, corridor, ...;
+    see search.API_ALGORITHMS).
     Clean and simple function used by the API/backend.
+
+    time_budget (seconds) and/or epsilon switch A* to anytime ARA*: a first
+    route within epsilon of the optimum, improved until the budget runs out.
+    `suboptimality_bound` in the result is the factor actually achieved
+    (1.0 for the exact searches).
+
+    Exact results are kept in route_cache, keyed by the snapped endpoints,
+    algorithm and graph version; an anytime query is answered from a cached
+    exact route when there is one.
     """
 
-    # Load graph data
-    nodes = load_nodes()
-    adj = load_graph_pickle()
+    if algorithm not in API_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}; choose one of {API_ALGORITHMS}")
+    anytime = time_budget is not None or epsilon is not None
+    if anytime and algorithm != "astar":
+        raise ValueError("time_budget/epsilon are only supported with algorithm 'astar'")
+    if epsilon is not None and epsilon < 1.0:
+        raise ValueError("epsilon must be >= 1")
 
-    if not nodes or not adj:
-        raise RuntimeError("Graph data missing. Please generate graph first.")
+    # Shared graph version for this request (loaded once per process, hot-swapped)
+    graph = current_graph()
+    nodes, adj = graph.nodes, graph.adj
 
     # Map coordinates -> nearest nodes
-    start_id, _ = find_nearest_node(start_lat, start_lon, nodes)
-    goal_id, _ = find_nearest_node(goal_lat, goal_lon, nodes)
+    start_id, _ = graph.snap_index.snap(start_lat, start_lon)
+    goal_id, _ = graph.snap_index.snap(goal_lat, goal_lon)
+
+    # no obstacle layer here: get_shortest_path ignores obstacles
+    key = ("route", start_id, goal_id, algorithm, graph.version, None)
+    cached = route_cache.get(key)
+    if cached is not None:
+        return _thawed(cached)
 
-    # Run A* algorithm
-    path_ids, distance_km = astar(start_id, goal_id, nodes, adj)
+    # Run the search
+    if anytime:
+        path_ids, distance_km, bound = ara_star(
+            start_id, goal_id, nodes, adj,
+            epsilon=DEFAULT_EPSILON if epsilon is None else epsilon,
+            time_budget=time_budget)
+    else:
+        path_ids, distance_km = find_path(start_id, goal_id, nodes, adj, algorithm, graph.tables)
+        bound = 1.0
 
     if path_ids is None:
-        return {
+        result = {
             "status": "NO_PATH",
             "distance_km": None,
             "path_latlon": [],
             "path_node_ids": [],
+            "suboptimality_bound": None,
+        }
+    else:
+        # Convert to coordinates
+        result = {
+            "status": "OK",
+            "distance_km": distance_km,
+            "path_latlon": nodes_to_coordinates(path_ids, nodes),
+            "path_node_ids": path_ids,
+            "suboptimality_bound": bound,
         }
 
-    # Convert to coordinates
-    path_coords = nodes_to_coordinates(path_ids, nodes)
-
-    return {
-        "status": "OK",
-        "distance_km": distance_km,
-        "path_latlon": path_coords,
-        "path_node_ids": path_ids,
-    }
+    # an anytime search that stopped early is not the exact answer for this key
+    if not anytime or bound == 1.0:
+        route_cache.put(key, _frozen(result))
+    return result
 
 
 if __name__ == "__main__":
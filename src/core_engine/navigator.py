@@ -1,9 +1,11 @@
 # src/core_engine/navigator.py
 
 import time
-from src.graph_builder.ocean_grid import load_nodes, load_graph_pickle
-from src.pathfinding.utils import find_nearest_node, nodes_to_coordinates
-from src.pathfinding.reroute import reroute
+from math import inf
+from src.graph_builder.hot_swap import current_graph
+from src.pathfinding.utils import nodes_to_coordinates
+from src.pathfinding.reroute import _is_blocked_by_checker
+from src.pathfinding.incremental import DStarLite
 from src.obstacle_detection.obstacle_engine import ObstacleEngine
 
 
@@ -11,33 +13,66 @@ class Navigator:
     """
     Dynamic ship navigation engine.
     Continuously tracks the ship's position and reroutes if obstacles appear.
+    One D* Lite planner is kept per voyage, so a reroute only repairs the
+    part of the search that the new obstacles invalidate.
     """
 
     def __init__(self, reroute_threshold_km=1.5, sleep_interval=0.5):
-        self.nodes = load_nodes()
-        self.adj = load_graph_pickle()
+        # the voyage keeps this graph version even if a newer one is swapped in
+        self.graph = current_graph()
+        self.nodes = self.graph.nodes
+        self.adj = self.graph.adj
         self.obstacle_engine = ObstacleEngine()
         self.threshold_km = reroute_threshold_km
         self.sleep = sleep_interval
+        self.planner = None
 
     # ---------------------------------------------------------
     def compute_initial_route(self, start_lat, start_lon, end_lat, end_lon):
-        """Compute the initial route using reroute()."""
-
-        start_id, _ = find_nearest_node(start_lat, start_lon, self.nodes)
-        goal_id, _ = find_nearest_node(end_lat, end_lon, self.nodes)
-
-        path, dist, status = reroute(
-            start_id,
-            goal_id,
-            self.nodes,
-            self.adj,
-            obstacle_checker=self.obstacle_engine.is_obstacle,   # FIXED
-            threshold_km=self.threshold_km
-        )
+        """Compute the initial route and start the voyage's incremental planner."""
+
+        start_id, _ = self.graph.snap_index.snap(start_lat, start_lon)
+        goal_id, _ = self.graph.snap_index.snap(end_lat, end_lon)
+
+        self.planner = DStarLite(start_id, goal_id, self.nodes, self.adj)
+        path, dist, status = self._plan_clear_route()
 
         return start_id, goal_id, path, dist, status
 
+    # ---------------------------------------------------------
+    def replan(self, current_id):
+        """Reroute from the ship's current node, reusing the voyage's search state."""
+
+        self.planner.move_to(current_id)
+
+        # Obstacles that have moved away become passable again
+        cleared = [n for n in self.planner.blocked if not self._is_blocked(n)]
+        self.planner.unblock(cleared)
+
+        return self._plan_clear_route()
+
+    # ---------------------------------------------------------
+    def _is_blocked(self, node_id):
+        node = self.nodes[node_id]
+        return _is_blocked_by_checker(node["lat"], node["lon"],
+                                      self.obstacle_engine.is_obstacle, self.threshold_km)
+
+    def _plan_clear_route(self):
+        """Plan, block obstacle nodes found on the route, repeat until it is clear."""
+        status = "OK"
+        while True:
+            path, dist = self.planner.plan()
+            if path is None:
+                return None, inf, "Reroute failed" if status == "REROUTED" else "No route found"
+
+            # the ship's own position is never blocked
+            hits = [n for n in path[1:] if self._is_blocked(n)]
+            if not hits:
+                return path, dist, status
+
+            self.planner.block(hits)
+            status = "REROUTED"
+
     # ---------------------------------------------------------
     def navigate(self, start_lat, start_lon, end_lat, end_lon, verbose=True):
         """Main dynamic navigation loop."""
@@ -64,27 +99,21 @@ class Navigator:
             lon = self.nodes[node_id]["lon"]
 
             # ---------------------------------------------------------
-            # Obstacle check at this node
+            # Obstacle check at the next node (the ship sits on the previous one)
             # ---------------------------------------------------------
-            if self.obstacle_engine.is_obstacle(lat, lon):      # FIXED
+            if current_index > 0 and self.obstacle_engine.is_obstacle(lat, lon):
                 if verbose:
                     print(f"\n⚠️  Obstacle detected at index {current_index}, re-routing...")
 
-                new_path, new_dist, new_status = reroute(
-                    node_id,
-                    goal_id,
-                    self.nodes,
-                    self.adj,
-                    obstacle_checker=self.obstacle_engine.is_obstacle,  # FIXED
-                    threshold_km=self.threshold_km
-                )
+                new_path, new_dist, new_status = self.replan(current_path[current_index - 1])
 
                 if new_path is None:
                     print("❌ Reroute failed. Stopping navigation.")
                     return None
 
+                # new_path[0] is where the ship already is
                 current_path = new_path
-                current_index = 0
+                current_index = 1
 
                 if verbose:
                     print(f"✅ Rerouted: {new_status}, new distance: {new_dist:.2f} km")
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+"""
+Bounded LRU cache for route results.
+
+Requests between the same ports snap to the same (start_id, goal_id), so
+the API can answer them from memory. Keys carry everything the answer
+depends on: snapped endpoints, algorithm, graph version and obstacle-layer
+version. A rebuilt graph or changed obstacle rules therefore produce new
+keys, and the stale entries age out through the LRU order and the TTL.
+"""
+
+
+class RouteCache:
+    """
+    cache = RouteCache(max_entries=1024, ttl_seconds=600)
+    value = cache.get(key)          # None on miss or expiry
+    cache.put(key, value)
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.clock = clock
+        self._data = OrderedDict()   # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] <= self.clock():
+                del self._data[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data), "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl, "hits": self.hits, "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions, "expirations": self.expirations,
+        }
+
+
+# shared by get_shortest_path and simulate_route
+route_cache = RouteCache()
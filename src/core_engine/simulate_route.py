@@ -1,15 +1,28 @@
 import sys
 from pathlib import Path
-from src.graph_builder.ocean_grid import load_nodes, load_graph_pickle
-from src.pathfinding.utils import find_nearest_node, nodes_to_coordinates
+from src.graph_builder.hot_swap import current_graph
+from src.pathfinding.utils import nodes_to_coordinates
 from src.pathfinding.reroute import reroute
+from src.pathfinding.search import DEFAULT_ALGORITHM, API_ALGORITHMS
 from src.obstacle_detection.obstacle_engine import ObstacleEngine
+from src.core_engine.route_cache import route_cache
 
 ROOT = Path(__file__).resolve().parents[2]
 sys.path.append(str(ROOT))
 
 
-def simulate_route(start_lat, start_lon, goal_lat, goal_lon):
+_engine = None
+
+
+def _shared_engine():
+    global _engine
+    if _engine is None:
+        _engine = ObstacleEngine()
+    return _engine
+
+
+def simulate_route(start_lat, start_lon, goal_lat, goal_lon,
+                   algorithm=DEFAULT_ALGORITHM, engine=None):
     """
     Full navigation pipeline:
       1. Load graph
@@ -17,20 +30,22 @@ def simulate_route(start_lat, start_lon, goal_lat, goal_lon):
       3. Run reroute-aware A* pathfinding
       4. Apply rule-based + ML obstacle detection
       5. Return path, distance, status
+    `engine` defaults to one ObstacleEngine shared by all calls; results are
+    cached until its layer_version or the graph version changes.
     """
 
-    print("\n===== NAVIGATION SIMULATION STARTED =====")
+    if algorithm not in API_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {algorithm!r}; choose one of {API_ALGORITHMS}")
 
-    # Load nodes + adjacency
-    nodes = load_nodes()
-    adj = load_graph_pickle()
+    print("\n===== NAVIGATION SIMULATION STARTED =====")
 
-    if not nodes or not adj:
-        raise RuntimeError("Graph data missing. Generate graph first.")
+    # Shared nodes + adjacency (current graph version)
+    graph = current_graph()
+    nodes, adj = graph.nodes, graph.adj
 
     # Map lat/lon → nearest nodes
-    start_id, start_dist = find_nearest_node(start_lat, start_lon, nodes)
-    goal_id, goal_dist = find_nearest_node(goal_lat, goal_lon, nodes)
+    start_id, start_dist = graph.snap_index.snap(start_lat, start_lon)
+    goal_id, goal_dist = graph.snap_index.snap(goal_lat, goal_lon)
 
     print(f"Start input     : ({start_lat}, {start_lon})")
     print(f"Nearest node    : {start_id} (distance {start_dist:.3f} km)")
@@ -38,12 +53,20 @@ def simulate_route(start_lat, start_lon, goal_lat, goal_lon):
     print(f"Nearest node    : {goal_id} (distance {goal_dist:.3f} km)")
 
     # Obstacle engine (rule-based + ML)
-    engine = ObstacleEngine()
-
-    # Compute safe path
-    path_ids, dist_km, status = reroute(
-        start_id, goal_id, nodes, adj, engine.obstacle_checker
-    )
+    if engine is None:
+        engine = _shared_engine()
+
+    # Compute safe path (cached per endpoints, algorithm, graph and obstacle layer)
+    key = ("simulate", start_id, goal_id, algorithm, graph.version, engine.layer_version)
+    cached = route_cache.get(key)
+    if cached is None:
+        path_ids, dist_km, status = reroute(start_id, goal_id, nodes, adj, engine.obstacle_checker,
+                                            algorithm=algorithm, tables=graph.tables)
+        # cached as a tuple so callers mutating their path cannot change the entry
+        route_cache.put(key, (None if path_ids is None else tuple(path_ids), dist_km, status))
+    else:
+        path_ids, dist_km, status = cached
+        path_ids = None if path_ids is None else list(path_ids)
 
     # Convert node IDs -> coordinates for readability
     path_coords = nodes_to_coordinates(path_ids, nodes) if path_ids else []
@@ -1,11 +1,13 @@
 import json
 import pickle
-from collections import defaultdict
-from pathlib import Path
-from tqdm import tqdm
 
-from src.utils.utils import haversine_km
-from .config import LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, COARSE_RES, NEIGHBOR_OFFSETS, OUTPUT_DIR, NODES_FILE, PICKLE_FILE, LAND_MASK_PATH
+import numpy as np
+
+from src.utils.utils import haversine_km_array
+from .shared_artifacts import publish_node_store, publish_graph_csr
+from .lattice_graph import LatticeGraph
+from .land_raster import rasterize_land_mask, cached_water_raster
+from .config import LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, COARSE_RES, NEIGHBOR_OFFSETS, NODES_FILE, PICKLE_FILE, TILE_CACHE_DIR, LAND_MASK_PATH, CH_DIR, LANDMARK_DIR, graph_dirs
 
 """
 This file generates a coarse ocean-navigation graph by creating grid nodes, 
@@ -14,11 +16,9 @@ removing land points, and connecting each water node to its neighboring nodes wi
 
 try:
     import geopandas as gpd
-    from shapely.geometry import Point
     HAS_GEOPANDAS = True
 except Exception:
     HAS_GEOPANDAS = False
-    Point = None
 
 
 def estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res):
@@ -35,43 +35,122 @@ def load_land_mask(path):
 
 
 
+def build_water_mask(lats, lons, land_mask=None):
+    """Boolean (n_lat, n_lon) raster, True where the grid cell is water."""
+    return rasterize_land_mask(land_mask, lats, lons)
+
+
+def water_ids(water):
+    """Row-major node id raster for a water mask (-1 on land)."""
+    ids = np.full(water.shape, -1, dtype=np.int32)
+    node_i, node_j = np.nonzero(water)
+    ids[node_i, node_j] = np.arange(len(node_i), dtype=np.int32)
+    return ids
+
+
+def neighbour_table(ids, lats, lons, node_i, node_j):
+    """
+    (n, 8) neighbour ids (-1 = none) and distances for the cells (node_i, node_j)
+    of an id raster, in NEIGHBOR_OFFSETS order. lats/lons are the raster's axes.
+    """
+    n_lat, n_lon = ids.shape
+    nbr = np.full((len(node_i), len(NEIGHBOR_OFFSETS)), -1, dtype=np.int32)
+    dist = np.zeros(nbr.shape, dtype=np.float64)
+    for k, (di, dj) in enumerate(NEIGHBOR_OFFSETS):
+        ni, nj = node_i + di, node_j + dj
+        inside = (ni >= 0) & (ni < n_lat) & (nj >= 0) & (nj < n_lon)
+        src = np.nonzero(inside)[0]
+        ni, nj = ni[inside], nj[inside]
+        nbr[src, k] = ids[ni, nj]
+        dist[src, k] = haversine_km_array(lats[node_i[src]], lons[node_j[src]],
+                                          lats[ni], lons[nj])
+    return nbr, dist
+
+
+def build_grid_edges(water, lats, lons):
+    """
+    Build 8-neighbour edges of a water raster in CSR form.
+
+    Node ids are assigned row-major over the water cells, and each node's
+    neighbours are listed in NEIGHBOR_OFFSETS order, matching the dict builder.
+    Returns (ids, edges) where ids is the (n_lat, n_lon) id raster (-1 = land)
+    and edges is {"indptr", "indices", "weights"}.
+    """
+    ids = water_ids(water)
+    node_i, node_j = np.nonzero(water)
+    nbr, dist = neighbour_table(ids, lats, lons, node_i, node_j)
+
+    valid = nbr >= 0
+    indptr = np.zeros(len(node_i) + 1, dtype=np.int64)
+    np.cumsum(valid.sum(axis=1), out=indptr[1:])
+    edges = {"indptr": indptr, "indices": nbr[valid], "weights": dist[valid]}
+    return ids, edges
+
+
+def generate_coarse_arrays(lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX, res=COARSE_RES, land_mask=None, water=None):
+    """
+    Vectorized grid builder. Pass `water` to reuse a precomputed (e.g. cached) water raster.
+    Returns (nodes, edges) as NumPy arrays:
+      nodes: {"lat", "lon", "i", "j"}  one entry per water node, indexed by id
+      edges: {"indptr", "indices", "weights"}  CSR adjacency, weights in km
+    """
+    n_lat, n_lon, _ = estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res)
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+
+    if water is None:
+        water = build_water_mask(lats, lons, land_mask)
+    ids, edges = build_grid_edges(water, lats, lons)
+
+    node_i, node_j = np.nonzero(water)
+    nodes = {
+        "lat": lats[node_i],
+        "lon": lons[node_j],
+        "i": node_i.astype(np.int32),
+        "j": node_j.astype(np.int32),
+    }
+    return nodes, edges
+
+
+def node_arrays_to_dicts(nodes):
+    """Legacy {"i_j": {"id", "i", "j", "lat", "lon"}} node dict from node arrays."""
+    lat, lon = nodes["lat"].tolist(), nodes["lon"].tolist()
+    ii, jj = nodes["i"].tolist(), nodes["j"].tolist()
+    return {
+        f"{i}_{j}": {"id": nid, "i": i, "j": j, "lat": la, "lon": lo}
+        for nid, (i, j, la, lo) in enumerate(zip(ii, jj, lat, lon))
+    }
+
+
+def arrays_to_dicts(nodes, edges):
+    """Convert array output of generate_coarse_arrays to the legacy (nodes, adj) dicts."""
+    node_dict = node_arrays_to_dicts(nodes)
+
+    indptr = edges["indptr"].tolist()
+    indices = edges["indices"].tolist()
+    weights = edges["weights"].tolist()
+    adj = {}
+    for nid in range(len(node_dict)):
+        a, b = indptr[nid], indptr[nid + 1]
+        if a < b:
+            adj[nid] = list(zip(indices[a:b], weights[a:b]))
+    return node_dict, adj
+
+
 def generate_coarse_grid(lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX, res=COARSE_RES, land_mask=None):
-    n_lat = int(round((lat_max - lat_min) / res)) + 1
-    n_lon = int(round((lon_max - lon_min) / res)) + 1
+    """Compatibility wrapper: same arrays as generate_coarse_arrays, returned as (nodes, adj) dicts."""
+    nodes, edges = generate_coarse_arrays(lat_min, lat_max, lon_min, lon_max, res, land_mask)
+    return arrays_to_dicts(nodes, edges)
 
-    nodes = {}
-    node_id = 0
-
-    for i in tqdm(range(n_lat), desc="lat rows"):
-        lat = lat_min + i * res
-        for j in range(n_lon):
-            lon = lon_min + j * res
-            # skip if on land (if mask provided)
-            if land_mask is not None:
-                if Point(lon, lat).within(land_mask):
-                    continue
-            key = f"{i}_{j}"
-            nodes[key] = {"id": node_id, "i": i, "j": j, "lat": lat, "lon": lon}
-            node_id += 1
-
-    # Build adjacency as dict: node_id -> list of (neighbor_id, dist_km)
-    adj = defaultdict(list)
-    id_to_key = {v["id"]: k for k,v in nodes.items()}
-    key_to_id = {k: v["id"] for k,v in nodes.items()}
-
-    for key, v in tqdm(nodes.items(), desc="building adjacency"):
-        i, j = v["i"], v["j"]
-        this_id = v["id"]
-        for di, dj in NEIGHBOR_OFFSETS:
-            ni, nj = i + di, j + dj
-            neighbor_key = f"{ni}_{nj}"
-            if neighbor_key in key_to_id:
-                neigh_id = key_to_id[neighbor_key]
-                lat2, lon2 = nodes[neighbor_key]["lat"], nodes[neighbor_key]["lon"]
-                dist = haversine_km(v["lat"], v["lon"], lat2, lon2)
-                adj[this_id].append((neigh_id, dist))
-
-    return nodes, dict(adj)
+
+def generate_coarse_lattice(lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX, res=COARSE_RES, land_mask=None, water=None):
+    """Implicit-edge variant: returns a LatticeGraph (use .nodes for the node mapping)."""
+    if water is None:
+        n_lat, n_lon, _ = estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res)
+        lats = lat_min + np.arange(n_lat) * res
+        lons = lon_min + np.arange(n_lon) * res
+        water = build_water_mask(lats, lons, land_mask)
+    return LatticeGraph(lat_min, lon_min, res, water)
 
 
 def save_nodes_json(nodes, path=NODES_FILE):
@@ -92,21 +171,63 @@ def save_graph_pickle(adj, path=PICKLE_FILE):
 
 
 
-def main_generate_coarse(force=False):
+def main_generate_coarse(force=False, res=COARSE_RES, workers=1, tile_size=512, incremental=True):
+    """
+    Build and save the graph. A land mask file is rasterized through the
+    whole-grid raster cache (keyed by the mask file hash); on a miss the
+    raster is built tile by tile, with incremental=True (default) reusing
+    cached tiles whose cells / resolution / mask content did not change.
+    force=True rebuilds every tile. Resolutions other than COARSE_RES are
+    written to their own directories (config.graph_dirs), never the served ones.
+    """
     # estimate size
-    n_lat, n_lon, total = estimate_node_counts(LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, COARSE_RES)
+    n_lat, n_lon, total = estimate_node_counts(LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, res)
     print(f"Estimated grid: {n_lat} x {n_lon} = {total} raw points (before land mask).")
 
-    land_mask = None
-    if LAND_MASK_PATH:
-        if not HAS_GEOPANDAS:
-            raise RuntimeError("LAND_MASK_PATH set but geopandas not installed.")
-        land_mask = load_land_mask(LAND_MASK_PATH)
-        print("Loaded land mask.")
+    if LAND_MASK_PATH and not HAS_GEOPANDAS:
+        raise RuntimeError("LAND_MASK_PATH set but geopandas not installed.")
+
+    from .tiled_build import generate_tiled_arrays, tiled_water_raster
+    stats = {}
 
-    nodes, adj = generate_coarse_grid(land_mask=land_mask)
-    save_nodes_json(nodes)
-    save_graph_pickle(adj)
+    def rasterize(land_mask):
+        return tiled_water_raster(res=res, land_mask=land_mask, tile_size=tile_size,
+                                  workers=workers, force=force, stats=stats,
+                                  cache_dir=TILE_CACHE_DIR if incremental else None)
+
+    water = None
+    if LAND_MASK_PATH:
+        water = cached_water_raster(LAND_MASK_PATH, LAT_MIN, LAT_MAX, LON_MIN, LON_MAX,
+                                    res, load_land_mask, rasterize=rasterize, force=force)
+        print("Loaded land mask raster.")
+    if stats:
+        print(f"Tiles: {stats['tiles']} total, {stats['rebuilt']} rebuilt, {stats['cached']} from cache.")
+
+    if workers == 1 and not incremental:
+        nodes, edges = generate_coarse_arrays(res=res, water=water)
+    else:
+        if water is None:
+            water = rasterize(None)
+        # tiled edge pass across a process pool
+        nodes, edges = generate_tiled_arrays(res=res, tile_size=tile_size, workers=workers, water=water)
+
+    # swap each directory in whole: a running API keeps mapping the old files
+    node_dir, csr_dir = graph_dirs(res)
+    publish_node_store(nodes, node_dir)
+    publish_graph_csr(edges["indptr"], edges["indices"], edges["weights"], csr_dir)
+    if res == COARSE_RES and (CH_DIR.is_dir() or LANDMARK_DIR.is_dir()):
+        # the API only serves tables built after the graph (see hot_swap)
+        print("Contraction hierarchy / landmark tables are now older than the graph: "
+              "rerun src.pathfinding.contraction and src.pathfinding.landmarks to serve 'ch' / 'alt'.")
 
 if __name__ == "__main__":
-    main_generate_coarse()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the ocean navigation graph.")
+    parser.add_argument("--res", type=float, default=COARSE_RES, help="grid resolution in degrees")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the tiled build (0 = all cores)")
+    parser.add_argument("--tile-size", type=int, default=512, help="tile edge length in grid cells")
+    parser.add_argument("--force", action="store_true", help="ignore the tile cache and rebuild every tile")
+    parser.add_argument("--no-cache", action="store_true", help="single-pass build without the tile cache")
+    args = parser.parse_args()
+    main_generate_coarse(force=args.force, res=args.res, workers=args.workers or None,
+                         tile_size=args.tile_size, incremental=not args.no_cache)
@@ -14,6 +14,13 @@ LAND_MASK_PATH = None
 COARSE_RES = 0.05    # ~5.5 km - base global grid 
 FINE_RES = 0.01      # ~1.1 km - high resolution patches
 
+# fine patches stitched into the coarse grid (lat_min, lat_max, lon_min, lon_max)
+FINE_PATCHES = {
+    "singapore_strait": (0.9, 1.6, 103.3, 104.5),
+    "palk_strait": (8.8, 10.4, 78.8, 80.3),
+    "bab_el_mandeb": (12.2, 13.0, 42.9, 43.7),
+}
+
 NEIGHBOR_OFFSETS = [
     (-1,  0), (1,  0), (0, -1), (0,  1),
     (-1, -1), (-1, 1), (1, -1), (1,  1)
@@ -21,5 +28,24 @@ NEIGHBOR_OFFSETS = [
 
 OUTPUT_DIR = Path("data/graph")
 NODES_FILE = OUTPUT_DIR/"nodes_coarse.json"
+NODE_STORE_DIR = OUTPUT_DIR/"nodes_coarse"
 PICKLE_FILE = OUTPUT_DIR/"graph_coarse.pkl"
+CSR_DIR = OUTPUT_DIR/"graph_coarse_csr"
+CH_DIR = OUTPUT_DIR/"graph_coarse_ch"
+LANDMARK_DIR = OUTPUT_DIR/"graph_coarse_landmarks"
+RASTER_CACHE_DIR = OUTPUT_DIR/"raster_cache"
+TILE_CACHE_DIR = OUTPUT_DIR/"tile_cache"
+TILED_FINE_DIR = OUTPUT_DIR/"graph_fine_tiles"
+TILE_CACHE_MAX_BYTES = 512 * 1024 * 1024   # RAM ceiling for paged-in tiles
+TILE_CACHE_DISK_MAX_BYTES = 2 * 1024 ** 3  # disk ceiling for TILE_CACHE_DIR
+
 
+def graph_dirs(res=COARSE_RES):
+    """
+    (node store dir, CSR dir) of a build at resolution `res`. Only COARSE_RES
+    writes the directories the API serves; other resolutions get their own.
+    """
+    if res == COARSE_RES:
+        return NODE_STORE_DIR, CSR_DIR
+    tag = f"{res:g}".replace(".", "p")
+    return OUTPUT_DIR/f"nodes_res{tag}", OUTPUT_DIR/f"graph_res{tag}_csr"
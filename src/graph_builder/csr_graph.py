@@ -0,0 +1,118 @@
+import operator
+from pathlib import Path
+
+import numpy as np
+
+"""
+Compressed-sparse-row adjacency for the navigation graph.
+
+On disk a graph is a directory of three .npy files:
+  indptr.npy   int64   (n_nodes + 1,)  offsets into indices/weights
+  indices.npy  int32   (n_edges,)      neighbour node ids
+  weights.npy  float32 (n_edges,)      edge lengths in km
+The arrays are memory-mapped on load, so opening a graph is instant and
+pages are shared between processes through the OS page cache.
+"""
+
+CSR_ARRAYS = ("indptr", "indices", "weights")
+
+
+class CSRGraph:
+    """
+    Read-only adjacency backed by CSR arrays.
+    Behaves like the legacy adjacency dict, so the pathfinders can use it directly:
+      adj.get(node_id, []) -> [(neighbor_id, distance_km), ...]
+    """
+
+    def __init__(self, indptr, indices, weights):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+
+    @classmethod
+    def from_dict(cls, adj, num_nodes=None):
+        """Build from a legacy {id: [(neighbor_id, dist), ...]} dict with integer ids."""
+        if num_nodes is None:
+            num_nodes = max(adj.keys(), default=-1) + 1
+        counts = np.zeros(num_nodes, dtype=np.int64)
+        for nid, neighbors in adj.items():
+            counts[nid] = len(neighbors)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        indices = np.empty(indptr[-1], dtype=np.int32)
+        weights = np.empty(indptr[-1], dtype=np.float32)
+        for nid, neighbors in adj.items():
+            a = indptr[nid]
+            for k, (n, d) in enumerate(neighbors):
+                indices[a + k] = n
+                weights[a + k] = d
+        return cls(indptr, indices, weights)
+
+    @property
+    def num_nodes(self):
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    def neighbors(self, node_id):
+        """Neighbour ids and weights of a node as array slices (no Python objects)."""
+        a, b = self.indptr[node_id], self.indptr[node_id + 1]
+        return self.indices[a:b], self.weights[a:b]
+
+    def degree(self, node_id):
+        return int(self.indptr[node_id + 1] - self.indptr[node_id])
+
+    # --- dict-compatible interface -------------------------------------
+
+    def __len__(self):
+        return self.num_nodes
+
+    def __contains__(self, node_id):
+        try:
+            node_id = operator.index(node_id)
+        except TypeError:
+            return False
+        return 0 <= node_id < self.num_nodes
+
+    def __iter__(self):
+        return iter(range(self.num_nodes))
+
+    def __getitem__(self, node_id):
+        if node_id not in self:
+            raise KeyError(node_id)
+        a, b = int(self.indptr[node_id]), int(self.indptr[node_id + 1])
+        return list(zip(self.indices[a:b].tolist(), self.weights[a:b].tolist()))
+
+    def get(self, node_id, default=None):
+        if node_id not in self:
+            return default
+        return self[node_id]
+
+    def keys(self):
+        return range(self.num_nodes)
+
+    def values(self):
+        return (self[n] for n in range(self.num_nodes))
+
+    def items(self):
+        return ((n, self[n]) for n in range(self.num_nodes))
+
+
+def save_graph_csr(indptr, indices, weights, path):
+    """Write CSR arrays as .npy files in directory `path`."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / "indptr.npy", np.asarray(indptr, dtype=np.int64))
+    np.save(path / "indices.npy", np.asarray(indices, dtype=np.int32))
+    np.save(path / "weights.npy", np.asarray(weights, dtype=np.float32))
+    print(f"Saved CSR graph ({len(indptr) - 1} nodes, {len(indices)} edges) to {path}")
+
+
+def load_graph_csr(path, mmap=True):
+    """Open a CSR graph directory. With mmap=True nothing is read until touched."""
+    path = Path(path)
+    mode = "r" if mmap else None
+    arrays = [np.load(path / f"{name}.npy", mmap_mode=mode) for name in CSR_ARRAYS]
+    return CSRGraph(*arrays)
@@ -0,0 +1,226 @@
+from bisect import bisect_right
+
+import numpy as np
+
+from src.utils.utils import haversine_km
+from .config import FINE_RES, FINE_PATCHES
+from .refine_patch import generate_patch
+
+"""
+Two-level navigation graph: the coarse grid everywhere, with fine patches
+(near ports and straits) stitched in through portal nodes.
+
+Coarse nodes inside a patch bbox are hidden and replaced by the patch's fine
+nodes. Every coarse edge c -> h that enters a patch (c outside, h hidden)
+becomes a portal edge between c and the fine node nearest to h, in both
+directions. Searches therefore move over the coarse grid in open ocean and
+over the fine grid only inside patches. Nothing is copied: adjacency is
+answered on lookup from the coarse graph, the patch graphs and the portals.
+
+Ids: coarse nodes keep their ids 0..n_coarse-1; patch k's fine node with
+local id l gets id base_k + l, bases counting up from n_coarse.
+"""
+
+
+class FinePatch:
+    """One fine-resolution patch: generate_patch output plus its global id base."""
+
+    def __init__(self, lat_min, lat_max, lon_min, lon_max, res, nodes, adj, base):
+        self.bbox = (lat_min, lat_max, lon_min, lon_max)
+        self.res = res
+        self.adj = adj
+        self.base = base
+        self.nodes = [None] * len(nodes)
+        self.key_to_local = {}
+        for key, v in nodes.items():
+            self.nodes[v["id"]] = v
+            self.key_to_local[key] = v["id"]
+
+    def contains(self, lat, lon):
+        lat_min, lat_max, lon_min, lon_max = self.bbox
+        return lat_min <= lat <= lat_max and lon_min <= lon <= lon_max
+
+    def nearest_local(self, lat, lon):
+        """Local id of the fine node in the cell nearest (lat, lon), or None on land."""
+        lat_min, _, lon_min, _ = self.bbox
+        i = int(round((lat - lat_min) / self.res))
+        j = int(round((lon - lon_min) / self.res))
+        return self.key_to_local.get(f"r_{i}_{j}")
+
+
+class HierarchicalGraph:
+    """
+    Adjacency over coarse + fine ids, dict-compatible:
+      adj.get(node_id, []) -> [(neighbor_id, distance_km), ...]
+    `.nodes` is the matching node mapping (each node carries "level": 0 coarse, 1 fine).
+    """
+
+    def __init__(self, coarse_nodes, coarse_adj, patches, num_coarse):
+        self.coarse_nodes = coarse_nodes
+        self.coarse_adj = coarse_adj
+        self.patches = patches
+        self.num_coarse = num_coarse
+        self._bases = [p.base for p in patches]
+        self.hidden = set()
+        self.portals = {}
+        self.nodes = HierarchicalNodes(self)
+
+    def patch_of(self, node_id):
+        """(patch, local_id) for a fine id, None for a coarse id."""
+        if node_id < self.num_coarse:
+            return None
+        k = bisect_right(self._bases, node_id) - 1
+        patch = self.patches[k]
+        local = node_id - patch.base
+        if local >= len(patch.nodes):
+            return None
+        return patch, local
+
+    def get(self, node_id, default=None):
+        if node_id < self.num_coarse:
+            if node_id in self.hidden:
+                return default
+            neighbors = self.coarse_adj.get(node_id)
+            if neighbors is None and node_id not in self.portals:
+                return default
+            out = [(n, d) for n, d in (neighbors or []) if n not in self.hidden]
+        else:
+            found = self.patch_of(node_id)
+            if found is None:
+                return default
+            patch, local = found
+            out = [(patch.base + n, d) for n, d in patch.adj.get(local, [])]
+        out.extend(self.portals.get(node_id, ()))
+        return out
+
+    def __getitem__(self, node_id):
+        neighbors = self.get(node_id)
+        if neighbors is None:
+            raise KeyError(node_id)
+        return neighbors
+
+    def __contains__(self, node_id):
+        return node_id in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def items(self):
+        return ((n, self[n]) for n in self)
+
+    def _add_portal(self, a, b, dist):
+        self.portals.setdefault(a, []).append((b, dist))
+        self.portals.setdefault(b, []).append((a, dist))
+
+
+class HierarchicalNodes:
+    """nodes[nid] for coarse and fine ids; hidden coarse nodes are absent."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, node_id):
+        g = self.graph
+        if node_id < g.num_coarse:
+            if node_id in g.hidden:
+                raise KeyError(node_id)
+            node = dict(g.coarse_nodes[node_id])
+            node["level"] = 0
+            return node
+        found = g.patch_of(node_id)
+        if found is None:
+            raise KeyError(node_id)
+        patch, local = found
+        v = patch.nodes[local]
+        return {"lat": v["lat"], "lon": v["lon"], "i": v["i"], "j": v["j"], "level": 1}
+
+    def get(self, node_id, default=None):
+        try:
+            return self[node_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, node_id):
+        return self.get(node_id) is not None
+
+    def __len__(self):
+        g = self.graph
+        return g.num_coarse - len(g.hidden) + sum(len(p.nodes) for p in g.patches)
+
+    def __iter__(self):
+        g = self.graph
+        for nid in range(g.num_coarse):
+            if nid not in g.hidden:
+                yield nid
+        for p in g.patches:
+            yield from range(p.base, p.base + len(p.nodes))
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return (self[n] for n in self)
+
+    def items(self):
+        return ((n, self[n]) for n in self)
+
+
+def _coarse_coords(nodes, num_coarse):
+    if hasattr(nodes, "lat") and hasattr(nodes, "lon"):
+        return np.asarray(nodes.lat), np.asarray(nodes.lon)
+    lat = np.full(num_coarse, np.nan)
+    lon = np.full(num_coarse, np.nan)
+    for nid, v in nodes.items():
+        lat[nid], lon[nid] = v["lat"], v["lon"]
+    return lat, lon
+
+
+def build_hierarchical_graph(coarse_nodes, coarse_adj, patch_bboxes=None,
+                             res=FINE_RES, land_mask=None):
+    """
+    Stitch fine patches into the coarse graph.
+    coarse_nodes / coarse_adj: any node mapping / adjacency with integer ids
+    (dicts, NodeStore, CSRGraph). patch_bboxes: (lat_min, lat_max, lon_min, lon_max)
+    tuples, FINE_PATCHES by default.
+    """
+    if patch_bboxes is None:
+        patch_bboxes = FINE_PATCHES.values()
+    num_coarse = max(coarse_nodes.keys(), default=-1) + 1
+
+    patches = []
+    base = num_coarse
+    for lat_min, lat_max, lon_min, lon_max in patch_bboxes:
+        nodes, adj = generate_patch(lat_min, lat_max, lon_min, lon_max, res=res, land_mask=land_mask)
+        patches.append(FinePatch(lat_min, lat_max, lon_min, lon_max, res, nodes, adj, base))
+        base += len(nodes)
+
+    graph = HierarchicalGraph(coarse_nodes, coarse_adj, patches, num_coarse)
+
+    # hide coarse nodes covered by a patch
+    lat, lon = _coarse_coords(coarse_nodes, num_coarse)
+    owner = {}
+    for k, p in enumerate(patches):
+        lat_min, lat_max, lon_min, lon_max = p.bbox
+        inside = np.nonzero((lat >= lat_min) & (lat <= lat_max) &
+                            (lon >= lon_min) & (lon <= lon_max))[0]
+        for nid in inside.tolist():
+            owner.setdefault(nid, k)
+    graph.hidden = set(owner)
+
+    # coarse edges entering a patch become portal edges to the nearest fine node
+    for h, k in owner.items():
+        patch = patches[k]
+        for c, _ in coarse_adj.get(h, []):
+            if c in owner:
+                continue
+            local = patch.nearest_local(lat[h], lon[h])
+            if local is None:
+                continue
+            fine = patch.nodes[local]
+            dist = haversine_km(lat[c], lon[c], fine["lat"], fine["lon"])
+            graph._add_portal(c, patch.base + local, dist)
+
+    return graph
@@ -0,0 +1,170 @@
+import threading
+import time
+
+from src.pathfinding.contraction import load_contraction_hierarchy
+from src.pathfinding.landmarks import load_landmarks
+from src.pathfinding.snapping import SnapIndex
+from .config import CH_DIR, LANDMARK_DIR
+from .registry import registry, nodes_source, adjacency_source, artifact_signature, _ensure_shared
+
+"""
+Double-buffered graph versions for the API.
+
+A request or navigation session takes current_graph() once and keeps that
+GraphSnapshot (nodes, adjacency, snapping index, preprocessed tables) until
+it finishes.
+
+The contraction hierarchy (CH_DIR) and landmark tables (LANDMARK_DIR) are
+built by separate commands after the graph, so a snapshot only takes them
+if they were written after the graph artifacts and cover the same number
+of nodes. Otherwise `tables` lacks them and find_path rejects "ch" / "alt"
+for that version instead of answering with tables of an older graph.
+
+GraphWatcher polls the artifact signatures in a background thread. When a
+rebuild has landed (the new signature is seen on two polls in a row, so a
+build that is still swapping directories is not picked up half way) it
+loads the new version and its snapping index off the request path and then
+replaces the current snapshot with one assignment. New requests see the
+new graph; sessions holding the old snapshot keep it alive until they drop
+it. main_generate_coarse swaps whole directories, so old mapped files stay
+readable meanwhile.
+"""
+
+
+class GraphSnapshot:
+    """
+    One immutable graph version: nodes, adj, snap_index, version, signature,
+    and `tables` ({algorithm: preprocessed table}, see search.find_path).
+    """
+
+    def __init__(self, nodes, adj, version, signature, tables=None):
+        self.nodes = nodes
+        self.adj = adj
+        self.version = version
+        self.signature = signature
+        self.tables = {} if tables is None else tables
+        self.snap_index = SnapIndex.from_nodes(nodes)
+        self.loaded_at = time.time()
+
+
+# algorithm -> (artifact dir, loader, number of nodes the table covers)
+_TABLES = {
+    "ch": (lambda: CH_DIR, load_contraction_hierarchy, lambda t: t.num_nodes),
+    "alt": (lambda: LANDMARK_DIR, load_landmarks, lambda t: len(t.distances)),
+}
+
+
+def _signature():
+    """Signatures of nodes, adjacency and every table dir (None if missing)."""
+    (n_path, _), (a_path, _) = nodes_source(), adjacency_source()
+    return (artifact_signature(n_path), artifact_signature(a_path)) + tuple(
+        artifact_signature(path()) for path, _, _ in _TABLES.values())
+
+
+def _mtimes(signature):
+    if signature and isinstance(signature[0], tuple):
+        return [mtime for _, mtime, _ in signature]  # directory
+    return [signature[0]] if signature else []
+
+
+def _load_tables(signature, num_nodes):
+    """Tables written after the graph artifacts and sized for its nodes."""
+    graph_built = max(_mtimes(signature[0]) + _mtimes(signature[1]), default=0)
+    tables = {}
+    for (algorithm, (path, loader, size)), table_sig in zip(_TABLES.items(), signature[2:]):
+        built = _mtimes(table_sig)
+        if not built or min(built) < graph_built:
+            continue  # not built, or older than the graph
+        table = registry.get(path(), loader)
+        if size(table) == num_nodes:
+            tables[algorithm] = table
+    return tables
+
+
+def load_snapshot(version=1):
+    """Load (or reuse from the registry) the current artifacts as a GraphSnapshot."""
+    _ensure_shared()
+    signature = _signature()
+    nodes = registry.get(*nodes_source())
+    adj = registry.get(*adjacency_source())
+    if not nodes or not adj:
+        raise RuntimeError("Graph data missing. Please generate graph first.")
+    num_nodes = getattr(adj, "num_nodes", None)
+    if num_nodes is not None and num_nodes != len(nodes):
+        # caught between the node store and CSR swaps of a rebuild
+        raise RuntimeError(f"Graph artifacts out of sync: {len(nodes)} nodes, "
+                           f"adjacency for {num_nodes}")
+    return GraphSnapshot(nodes, adj, version, signature, _load_tables(signature, len(nodes)))
+
+
+_current = None
+_load_lock = threading.Lock()
+
+
+def current_graph():
+    """The graph version new requests should use (loaded on first call)."""
+    global _current
+    snapshot = _current
+    if snapshot is None:
+        with _load_lock:
+            if _current is None:
+                _current = load_snapshot()
+            snapshot = _current
+    return snapshot
+
+
+def swap_graph():
+    """Load the artifacts on disk as a new version and make it current."""
+    global _current
+    with _load_lock:
+        old = _current
+        fresh = load_snapshot(1 if old is None else old.version + 1)
+        _current = fresh
+    return fresh
+
+
+class GraphWatcher(threading.Thread):
+    """Background thread that hot-swaps the graph after a rebuild."""
+
+    def __init__(self, interval=10.0):
+        super().__init__(name="graph-watcher", daemon=True)
+        self.interval = interval
+        self.swaps = 0
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def poll(self, pending=None):
+        """One check. Returns the signature to confirm on the next poll, if any."""
+        try:
+            signature = _signature()
+            snapshot = _current
+            if None in signature[:2] or snapshot is None or signature == snapshot.signature:
+                return None
+            if signature != pending:
+                return signature  # changed: wait one more poll for the build to settle
+            swap_graph()
+            self.swaps += 1
+            self.last_error = None
+        except Exception as exc:
+            # e.g. a directory renamed away mid-scan: not stable yet, keep serving the old version
+            self.last_error = repr(exc)
+        return None
+
+    def run(self):
+        pending = None
+        while not self._stop_event.wait(self.interval):
+            try:
+                pending = self.poll(pending)
+            except Exception:  # never let the watcher thread die
+                pending = None
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def graph_version_metrics():
+    snapshot = _current
+    if snapshot is None:
+        return {"version": None}
+    return {"version": snapshot.version, "loaded_at": snapshot.loaded_at,
+            "tables": sorted(snapshot.tables)}
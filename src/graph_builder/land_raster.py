@@ -0,0 +1,102 @@
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+from .config import RASTER_CACHE_DIR
+
+"""
+Rasterize a land mask onto the navigation grid once, instead of testing a
+shapely Point per grid cell. The result is a boolean water raster
+(True = water) and, for mask files, it is cached on disk keyed by the mask
+file hash and the grid parameters.
+"""
+
+try:
+    import shapely
+    HAS_CONTAINS_XY = hasattr(shapely, "contains_xy")
+except Exception:
+    shapely = None
+    HAS_CONTAINS_XY = False
+
+
+def rasterize_land_mask(land_mask, lats, lons):
+    """
+    Boolean (len(lats), len(lons)) water raster for a land geometry.
+    A cell is land when Point(lon, lat).within(land_mask), i.e. strictly inside;
+    points on the coastline stay water, as with the per-point test.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    water = np.ones((len(lats), len(lons)), dtype=bool)
+    if land_mask is None or land_mask.is_empty:
+        return water
+
+    # only cells inside the mask's bounding box can be land
+    minx, miny, maxx, maxy = land_mask.bounds
+    rows = np.nonzero((lats >= miny) & (lats <= maxy))[0]
+    cols = np.nonzero((lons >= minx) & (lons <= maxx))[0]
+    if len(rows) == 0 or len(cols) == 0:
+        return water
+
+    r0, r1, c0, c1 = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+    lon_grid, lat_grid = np.meshgrid(lons[c0:c1], lats[r0:r1])
+
+    if HAS_CONTAINS_XY:
+        shapely.prepare(land_mask)
+        land = shapely.contains_xy(land_mask, lon_grid, lat_grid)
+    else:
+        from shapely.geometry import Point
+        from shapely.prepared import prep
+        prepared = prep(land_mask)
+        land = np.array([prepared.contains(Point(x, y))
+                         for x, y in zip(lon_grid.ravel(), lat_grid.ravel())],
+                        dtype=bool).reshape(lon_grid.shape)
+
+    water[r0:r1, c0:c1] = ~land
+    return water
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def raster_cache_key(mask_hash, lat_min, lat_max, lon_min, lon_max, res):
+    params = f"{mask_hash}|{lat_min!r}|{lat_max!r}|{lon_min!r}|{lon_max!r}|{res!r}"
+    return hashlib.sha256(params.encode()).hexdigest()[:32]
+
+
+def cached_water_raster(mask_path, lat_min, lat_max, lon_min, lon_max, res,
+                        load_geometry, cache_dir=RASTER_CACHE_DIR, rasterize=None, force=False):
+    """
+    Water raster for a land mask file, read from the cache when the same
+    mask file (by content hash) was already rasterized on the same grid.
+    load_geometry(mask_path) is only called on a cache miss; rasterize(geometry)
+    replaces the single-pass rasterize_land_mask (e.g. the tiled builder).
+    force=True ignores a cached raster and overwrites it.
+    """
+    n_lat = int(round((lat_max - lat_min) / res)) + 1
+    n_lon = int(round((lon_max - lon_min) / res)) + 1
+    key = raster_cache_key(file_sha256(mask_path), lat_min, lat_max, lon_min, lon_max, res)
+    cache_file = Path(cache_dir) / f"water_{key}.npy"
+
+    if cache_file.exists() and not force:
+        packed = np.load(cache_file)
+        return np.unpackbits(packed, count=n_lat * n_lon).astype(bool).reshape(n_lat, n_lon)
+
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+    if rasterize is None:
+        water = rasterize_land_mask(load_geometry(mask_path), lats, lons)
+    else:
+        water = rasterize(load_geometry(mask_path))
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(".tmp.npy")
+    np.save(tmp, np.packbits(water.ravel()))
+    tmp.replace(cache_file)
+    return water
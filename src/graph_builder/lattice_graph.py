@@ -0,0 +1,153 @@
+import operator
+
+import numpy as np
+
+from src.utils.utils import haversine_km_array
+from .config import NEIGHBOR_OFFSETS
+
+"""
+Implicit 8-connected lattice graph.
+
+The coarse and fine grids are regular lattices: a cell's neighbours follow
+from its (i, j) index and every edge length depends only on the latitude row
+and the direction. So instead of storing edges we keep
+  - a packed water bitmask (1 bit per cell), and
+  - a (n_lat, 8) table of haversine lengths per row and NEIGHBOR_OFFSETS direction,
+and compute adjacency on the fly. Node id = i * n_lon + j.
+"""
+
+
+def direction_weight_table(lat_min, res, n_lat):
+    """Edge length in km for every (row, direction) pair, shape (n_lat, 8)."""
+    lats = lat_min + np.arange(n_lat) * res
+    di = np.array([d[0] for d in NEIGHBOR_OFFSETS])
+    dj = np.array([d[1] for d in NEIGHBOR_OFFSETS])
+    return haversine_km_array(lats[:, None], 0.0,
+                              lats[:, None] + di[None, :] * res, dj[None, :] * res)
+
+
+class LatticeGraph:
+    """
+    Adjacency computed from (i, j) and the water bitmask.
+    Quacks like the adjacency dict: adj.get(node_id, []) -> [(neighbor_id, dist_km), ...].
+    Use `.nodes` as the matching nodes mapping.
+    """
+
+    def __init__(self, lat_min, lon_min, res, water, row_weights=None):
+        self.lat_min = lat_min
+        self.lon_min = lon_min
+        self.res = res
+        self.n_lat, self.n_lon = water.shape
+        self.bits = np.packbits(np.asarray(water, dtype=bool).ravel())
+        if row_weights is None:
+            row_weights = direction_weight_table(lat_min, res, self.n_lat)
+        self.row_weights = row_weights
+        self._bitview = memoryview(self.bits)
+        self._w = row_weights.ravel().tolist()
+        self.nodes = LatticeNodes(self)
+
+    # --- cells ---------------------------------------------------------
+
+    def node_id(self, i, j):
+        return i * self.n_lon + j
+
+    def cell(self, node_id):
+        return divmod(node_id, self.n_lon)
+
+    def is_water(self, node_id):
+        if not 0 <= node_id < self.n_lat * self.n_lon:
+            return False
+        return (self._bitview[node_id >> 3] >> (7 - (node_id & 7))) & 1 == 1
+
+    def water_mask(self):
+        """Unpacked (n_lat, n_lon) boolean raster."""
+        cells = self.n_lat * self.n_lon
+        return np.unpackbits(self.bits, count=cells).astype(bool).reshape(self.n_lat, self.n_lon)
+
+    def without_nodes(self, node_ids):
+        """Copy of the lattice with the given cells marked as land (edges untouched otherwise)."""
+        water = self.water_mask().ravel()
+        water[np.asarray(list(node_ids), dtype=np.int64)] = False
+        return LatticeGraph(self.lat_min, self.lon_min, self.res,
+                            water.reshape(self.n_lat, self.n_lon), self.row_weights)
+
+    # --- dict-compatible interface -------------------------------------
+
+    def get(self, node_id, default=None):
+        try:
+            node_id = operator.index(node_id)
+        except TypeError:
+            return default
+        if not self.is_water(node_id):
+            return default
+        i, j = divmod(node_id, self.n_lon)
+        n_lat, n_lon = self.n_lat, self.n_lon
+        bits, w = self._bitview, self._w
+        base = i * 8
+        out = []
+        for k, (di, dj) in enumerate(NEIGHBOR_OFFSETS):
+            ni, nj = i + di, j + dj
+            if 0 <= ni < n_lat and 0 <= nj < n_lon:
+                nid = ni * n_lon + nj
+                if (bits[nid >> 3] >> (7 - (nid & 7))) & 1:
+                    out.append((nid, w[base + k]))
+        return out
+
+    def __getitem__(self, node_id):
+        neighbors = self.get(node_id)
+        if neighbors is None:
+            raise KeyError(node_id)
+        return neighbors
+
+    def __contains__(self, node_id):
+        return self.get(node_id) is not None
+
+    def __len__(self):
+        return int(np.unpackbits(self.bits).sum())
+
+    def __iter__(self):
+        return iter(np.flatnonzero(self.water_mask()).tolist())
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return ((n, self[n]) for n in self)
+
+
+class LatticeNodes:
+    """nodes[nid] -> {"lat", "lon", "i", "j"} computed from the lattice index."""
+
+    def __init__(self, lattice):
+        self.lattice = lattice
+
+    def __getitem__(self, node_id):
+        g = self.lattice
+        if not g.is_water(node_id):
+            raise KeyError(node_id)
+        i, j = divmod(node_id, g.n_lon)
+        return {"lat": g.lat_min + i * g.res, "lon": g.lon_min + j * g.res, "i": i, "j": j}
+
+    def get(self, node_id, default=None):
+        try:
+            return self[node_id]
+        except (KeyError, TypeError):
+            return default
+
+    def __contains__(self, node_id):
+        return self.lattice.is_water(node_id)
+
+    def __len__(self):
+        return len(self.lattice)
+
+    def __iter__(self):
+        return iter(self.lattice)
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return (self[n] for n in self)
+
+    def items(self):
+        return ((n, self[n]) for n in self)
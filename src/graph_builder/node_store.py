@@ -0,0 +1,101 @@
+import operator
+from pathlib import Path
+
+import numpy as np
+
+"""
+Columnar node table for the navigation graph.
+
+Nodes are stored as parallel arrays indexed by node id:
+  lat.npy, lon.npy  float64 (or float32)  coordinates in degrees
+  i.npy, j.npy      int32                  grid row / column (optional)
+That is 24 bytes per node instead of a Python dict per node, and the
+arrays are memory-mapped on load.
+"""
+
+NODE_COLUMNS = ("lat", "lon", "i", "j")
+
+
+class NodeStore:
+    """
+    Read-only mapping view over the node columns.
+    nodes[nid] builds a small {"lat", "lon", "i", "j"} dict on demand, so
+    existing nodes[nid]["lat"] callers keep working; vectorized code can
+    use nodes.lat / nodes.lon directly.
+    """
+
+    def __init__(self, lat, lon, i=None, j=None):
+        self.lat = lat
+        self.lon = lon
+        self.i = i
+        self.j = j
+
+    @classmethod
+    def from_dict(cls, nodes):
+        """Build from a legacy {id: {"lat", "lon", "i", "j"}} dict with ids 0..n-1."""
+        n = len(nodes)
+        lat = np.array([nodes[k]["lat"] for k in range(n)], dtype=np.float64)
+        lon = np.array([nodes[k]["lon"] for k in range(n)], dtype=np.float64)
+        i = j = None
+        if n and nodes[0].get("i") is not None:
+            i = np.array([nodes[k]["i"] for k in range(n)], dtype=np.int32)
+            j = np.array([nodes[k]["j"] for k in range(n)], dtype=np.int32)
+        return cls(lat, lon, i, j)
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __contains__(self, node_id):
+        try:
+            node_id = operator.index(node_id)
+        except TypeError:
+            return False
+        return 0 <= node_id < len(self.lat)
+
+    def __iter__(self):
+        return iter(range(len(self.lat)))
+
+    def __getitem__(self, node_id):
+        if node_id not in self:
+            raise KeyError(node_id)
+        node = {"lat": float(self.lat[node_id]), "lon": float(self.lon[node_id])}
+        if self.i is not None:
+            node["i"] = int(self.i[node_id])
+            node["j"] = int(self.j[node_id])
+        return node
+
+    def get(self, node_id, default=None):
+        if node_id not in self:
+            return default
+        return self[node_id]
+
+    def keys(self):
+        return range(len(self.lat))
+
+    def values(self):
+        return (self[n] for n in range(len(self.lat)))
+
+    def items(self):
+        return ((n, self[n]) for n in range(len(self.lat)))
+
+
+def save_node_store(nodes, path, coord_dtype=np.float64):
+    """
+    Write node arrays {"lat", "lon", "i", "j"} as .npy files in directory `path`.
+    i/j may be missing (or None) for nodes that are not on a grid.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / "lat.npy", np.asarray(nodes["lat"], dtype=coord_dtype))
+    np.save(path / "lon.npy", np.asarray(nodes["lon"], dtype=coord_dtype))
+    if nodes.get("i") is not None and nodes.get("j") is not None:
+        np.save(path / "i.npy", np.asarray(nodes["i"], dtype=np.int32))
+        np.save(path / "j.npy", np.asarray(nodes["j"], dtype=np.int32))
+    print(f"Saved {len(nodes['lat'])} nodes to {path}")
+
+
+def load_node_store(path, mmap=True):
+    path = Path(path)
+    mode = "r" if mmap else None
+    return NodeStore(*[np.load(path / f"{name}.npy", mmap_mode=mode)
+                       if (path / f"{name}.npy").exists() else None for name in NODE_COLUMNS])
@@ -1,11 +1,23 @@
 import pickle
 import json
 from pathlib import Path
-from .config import NODES_FILE, PICKLE_FILE
+from .config import NODES_FILE, NODE_STORE_DIR, PICKLE_FILE, CSR_DIR
+from .csr_graph import load_graph_csr as _open_csr
+from .node_store import load_node_store
 
 
-def load_nodes(path=NODES_FILE):
+def load_nodes(path=None):
+    """
+    Load graph nodes as a mapping id -> {"lat", "lon", "i", "j"}.
+    A directory is opened as a memory-mapped NodeStore, a .json file is parsed
+    into dicts. By default the columnar store is used when it has been built.
+    """
+    if path is None:
+        path = NODE_STORE_DIR if NODE_STORE_DIR.is_dir() else NODES_FILE
     path = Path(path)
+    if path.is_dir():
+        return load_node_store(path)
+
     with open(path, "r") as f:
         data = json.load(f)
     # return as dict id -> (lat, lon)
@@ -17,4 +29,16 @@ def load_graph_pickle(path=PICKLE_FILE):
     path = Path(path)
     with open(path, "rb") as f:
         adj = pickle.load(f)
-    return adj
\ No newline at end of file
+    return adj
+
+
+def load_graph_csr(path=CSR_DIR, mmap=True):
+    """Memory-map the CSR graph written by build_graph.main_generate_coarse."""
+    return _open_csr(path, mmap=mmap)
+
+
+def load_adjacency(csr_path=CSR_DIR, pickle_path=PICKLE_FILE):
+    """Prefer the CSR graph; fall back to the legacy pickle if it was never built."""
+    if Path(csr_path).is_dir():
+        return load_graph_csr(csr_path)
+    return load_graph_pickle(pickle_path)
@@ -0,0 +1,110 @@
+import numpy as np
+from scipy import ndimage
+
+from src.utils.utils import haversine_km_array
+from .config import LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, COARSE_RES
+from .build_graph import estimate_node_counts
+from .land_raster import rasterize_land_mask
+
+"""
+Adaptive quadtree graph.
+
+Cells within `margin_cells` of land or a restricted polygon stay at the base
+resolution; open water away from any obstacle is merged into square
+quadtree blocks of up to 2**max_level cells per side. Every leaf is a node
+at its block centre, and two leaves are connected when any of their cells
+are 8-neighbours. Blocks are squares on a common quadtree, so the straight
+segment between two touching leaves stays inside the two leaves.
+"""
+
+
+def _leaf_blocks(open_water, max_level):
+    """
+    (r0, c0, size) of merged blocks, largest first. A block is merged when all
+    its cells are open water and its parent block is not merged.
+    """
+    n_lat, n_lon = open_water.shape
+    top = 2 ** max_level
+    H = -(-n_lat // top) * top
+    W = -(-n_lon // top) * top
+    padded = np.zeros((H, W), dtype=bool)
+    padded[:n_lat, :n_lon] = open_water
+
+    uniform = [padded]
+    for level in range(1, max_level + 1):
+        prev = uniform[-1]
+        h, w = prev.shape
+        uniform.append(prev.reshape(h // 2, 2, w // 2, 2).all(axis=(1, 3)))
+
+    blocks = []
+    taken = np.zeros(uniform[max_level].shape, dtype=bool)
+    for level in range(max_level, 0, -1):
+        leaves = uniform[level] & ~taken
+        size = 2 ** level
+        for r, c in zip(*np.nonzero(leaves)):
+            blocks.append((int(r) * size, int(c) * size, size))
+        taken = np.repeat(np.repeat(taken | uniform[level], 2, axis=0), 2, axis=1)
+    return blocks
+
+
+def generate_quadtree_graph(lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX,
+                            res=COARSE_RES, land_mask=None, restricted_polygons=None,
+                            water=None, margin_cells=2, max_level=6):
+    """
+    Build the quadtree graph.
+    Returns (nodes, adj, labels):
+      nodes:  {id: {"lat", "lon", "i", "j", "size"}}  block centre, top-left cell, side in cells
+      adj:    {id: [(neighbor_id, dist_km), ...]}
+      labels: (n_lat, n_lon) int32 raster of the leaf id covering each cell (-1 = blocked)
+    """
+    n_lat, n_lon, _ = estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res)
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+
+    if water is None:
+        water = rasterize_land_mask(land_mask, lats, lons)
+    blocked = ~water
+    for poly in restricted_polygons or []:
+        blocked |= ~rasterize_land_mask(poly, lats, lons)
+    water = ~blocked
+
+    near = blocked
+    if margin_cells > 0 and blocked.any():
+        near = ndimage.binary_dilation(blocked, np.ones((3, 3), dtype=bool),
+                                       iterations=margin_cells)
+    open_water = water & ~near
+
+    # merged blocks first, then every remaining water cell as its own leaf
+    labels = np.full((n_lat, n_lon), -1, dtype=np.int32)
+    leaves = []
+    for r0, c0, size in _leaf_blocks(open_water, max_level):
+        labels[r0:r0 + size, c0:c0 + size] = len(leaves)
+        leaves.append((r0, c0, size))
+    single_i, single_j = np.nonzero(water & (labels < 0))
+    labels[single_i, single_j] = np.arange(len(leaves), len(leaves) + len(single_i))
+    leaves.extend((i, j, 1) for i, j in zip(single_i.tolist(), single_j.tolist()))
+
+    leaf = np.array(leaves, dtype=np.float64).reshape(-1, 3)
+    centre_lat = lat_min + (leaf[:, 0] + (leaf[:, 2] - 1) / 2.0) * res
+    centre_lon = lon_min + (leaf[:, 1] + (leaf[:, 2] - 1) / 2.0) * res
+
+    # leaves touching through any pair of 8-neighbour cells
+    pairs = []
+    for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        a = labels[max(-di, 0):n_lat - max(di, 0), max(-dj, 0):n_lon - max(dj, 0)]
+        b = labels[max(di, 0):n_lat + min(di, 0), max(dj, 0):n_lon + min(dj, 0)]
+        keep = (a >= 0) & (b >= 0) & (a != b)
+        pairs.append(np.stack([a[keep], b[keep]], axis=1))
+    pairs = np.concatenate(pairs)
+    pairs = np.unique(np.concatenate([pairs, pairs[:, ::-1]]), axis=0)
+    dist = haversine_km_array(centre_lat[pairs[:, 0]], centre_lon[pairs[:, 0]],
+                              centre_lat[pairs[:, 1]], centre_lon[pairs[:, 1]])
+
+    nodes = {
+        nid: {"lat": la, "lon": lo, "i": int(r0), "j": int(c0), "size": int(size)}
+        for nid, ((r0, c0, size), la, lo) in enumerate(zip(leaves, centre_lat.tolist(), centre_lon.tolist()))
+    }
+    adj = {}
+    for (a, b), d in zip(pairs.tolist(), dist.tolist()):
+        adj.setdefault(a, []).append((b, d))
+    return nodes, adj, labels
@@ -1,10 +1,9 @@
 from collections import defaultdict
+import numpy as np
 from src.utils.utils import haversine_km
 from .config import FINE_RES
-try:
-    from shapely.geometry import Point
-except Exception:
-    Point = None
+from .lattice_graph import LatticeGraph
+from .land_raster import rasterize_land_mask
 
 """
 This file generates a fine-resolution local patch of the navigation graph 
@@ -19,15 +18,16 @@ def generate_patch(lat_min, lat_max, lon_min,
     n_lat = int(round((lat_max - lat_min) / res)) + 1
     n_lon = int(round((lon_max - lon_min) / res)) + 1
 
+    water = _patch_water(lat_min, lon_min, n_lat, n_lon, res, land_mask)
+
     nodes = {}
     node_id = 0
     for i in range(n_lat):
         lat = lat_min + i * res
         for j in range(n_lon):
             lon = lon_min + j * res
-            if land_mask is not None and Point is not None:
-                if Point(lon, lat).within(land_mask):
-                    continue
+            if not water[i, j]:
+                continue
             key = f"r_{i}_{j}"
             nodes[key] = {"id": node_id, 
                           "i": i, "j": j, "lat": lat, "lon": lon}
@@ -52,3 +52,20 @@ def generate_patch(lat_min, lat_max, lon_min,
 
     return nodes, dict(adj)
 
+
+def generate_patch_lattice(lat_min, lat_max, lon_min,
+                           lon_max, res=FINE_RES, land_mask=None):
+    """Same patch as generate_patch, as an implicit LatticeGraph 
+    (node ids are i * n_lon + j; use .nodes for coordinates)."""
+    n_lat = int(round((lat_max - lat_min) / res)) + 1
+    n_lon = int(round((lon_max - lon_min) / res)) + 1
+
+    water = _patch_water(lat_min, lon_min, n_lat, n_lon, res, land_mask)
+    return LatticeGraph(lat_min, lon_min, res, water)
+
+
+def _patch_water(lat_min, lon_min, n_lat, n_lon, res, land_mask):
+    """Water raster of the patch (True = water), rasterized in one pass."""
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+    return rasterize_land_mask(land_mask, lats, lons)
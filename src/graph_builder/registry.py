@@ -0,0 +1,140 @@
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+from .config import NODES_FILE, NODE_STORE_DIR, PICKLE_FILE, CSR_DIR
+from .ocean_grid import load_nodes, load_graph_pickle, load_graph_csr
+from .shared_artifacts import ensure_mmap_artifacts
+
+"""
+Process-wide cache of loaded graph artifacts.
+
+Each artifact is loaded once per process and keyed by its path; the file's
+(mtime, size) signature (for a directory: of every file inside it) is
+re-checked on each lookup and a changed artifact is loaded again. Callers
+share one read-only instance: dicts are handed out behind MappingProxyType
+and array-backed graphs get their arrays flagged read-only.
+
+get_nodes() / get_adjacency() first make sure the memory-mapped formats
+exist (see shared_artifacts), so API workers share one copy of the graph.
+"""
+
+
+def artifact_signature(path):
+    """(mtime_ns, size) of a file, or of every file in a directory; None if missing."""
+    path = Path(path)
+    try:
+        if path.is_dir():
+            stats = [(p.name, p.stat()) for p in sorted(path.iterdir()) if p.is_file()]
+            return tuple((name, st.st_mtime_ns, st.st_size) for name, st in stats)
+        st = path.stat()
+    except FileNotFoundError:  # missing, or swapped out while we looked
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _is_mapped(obj):
+    return any(isinstance(v, np.memmap) for v in getattr(obj, "__dict__", {}).values())
+
+
+def _read_only(obj):
+    """Freeze a loaded artifact in place where that is cheap."""
+    if isinstance(obj, dict):
+        return MappingProxyType(obj)
+    for value in getattr(obj, "__dict__", {}).values():
+        if isinstance(value, np.ndarray) and value.flags.writeable:
+            value.flags.writeable = False
+    return obj
+
+
+class _Entry:
+    def __init__(self, value, signature, seconds):
+        self.value = value
+        self.signature = signature
+        self.load_seconds = seconds
+        self.loaded_at = time.time()
+        self.loads = 1
+        self.hits = 0
+        self.mmap = _is_mapped(value)
+
+
+class GraphRegistry:
+    """
+    registry.get(path, loader) -> shared instance of loader(path).
+    Thread-safe; concurrent first requests trigger a single load.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, loader):
+        key = (str(Path(path).resolve()), getattr(loader, "__name__", repr(loader)))
+        signature = artifact_signature(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.signature == signature:
+                entry.hits += 1
+                return entry.value
+
+            t0 = time.perf_counter()
+            value = _read_only(loader(path))
+            seconds = time.perf_counter() - t0
+            fresh = self._entries[key] = _Entry(value, signature, seconds)
+            if entry is not None:
+                fresh.loads += entry.loads
+                fresh.hits = entry.hits
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        """Per-artifact load metrics: {path: {loader, load_seconds, loads, hits, loaded_at, mmap}}."""
+        with self._lock:
+            return {
+                path: {"loader": loader, "load_seconds": e.load_seconds, "loads": e.loads,
+                       "hits": e.hits, "loaded_at": e.loaded_at, "mmap": e.mmap}
+                for (path, loader), e in self._entries.items()
+            }
+
+
+registry = GraphRegistry()
+_converted = False
+
+
+def _ensure_shared():
+    global _converted
+    if not _converted:
+        ensure_mmap_artifacts()
+        _converted = True
+
+
+def nodes_source():
+    """(path, loader) of the node table: columnar store if built, else the JSON file."""
+    return (NODE_STORE_DIR, load_nodes) if NODE_STORE_DIR.is_dir() else (NODES_FILE, load_nodes)
+
+
+def adjacency_source():
+    """(path, loader) of the adjacency: CSR graph if built, else the legacy pickle."""
+    return (CSR_DIR, load_graph_csr) if Path(CSR_DIR).is_dir() else (PICKLE_FILE, load_graph_pickle)
+
+
+def get_nodes():
+    """Shared node table."""
+    _ensure_shared()
+    return registry.get(*nodes_source())
+
+
+def get_adjacency():
+    """Shared adjacency."""
+    _ensure_shared()
+    return registry.get(*adjacency_source())
+
+
+def graph_metrics():
+    return registry.metrics()
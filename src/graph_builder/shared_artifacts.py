@@ -0,0 +1,169 @@
+import json
+import os
+import pickle
+import shutil
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking, so conversions and swaps are not serialised
+    fcntl = None
+
+from .config import OUTPUT_DIR, NODES_FILE, NODE_STORE_DIR, PICKLE_FILE, CSR_DIR
+from .csr_graph import CSRGraph, save_graph_csr
+from .node_store import save_node_store
+
+"""
+One copy of the graph for every API worker process.
+
+The columnar node store and the CSR graph are .npy files opened with
+mmap_mode="r": every worker maps the same file pages, which the OS page
+cache holds once, so an extra worker costs page-table entries rather than
+a private copy of the graph. The landmark tables and the contraction
+hierarchy are memory-mapped the same way and read in place (the hierarchy
+through memoryviews). Tables derived at run time are per process: the
+lattice row weights (n_lat x 8) and the JPS neighbour masks (one byte per
+cell) are built by each worker that uses them.
+
+Deployments that only have the legacy nodes JSON / adjacency pickle are
+converted to those formats once. The first worker to start takes an
+exclusive file lock and writes the arrays into a temporary directory that
+is renamed into place; the others wait on the lock and then just map the
+result. Rebuilds (publish_*) swap their directories under the same lock.
+The swap is two renames, so a reader that does not take the lock can find
+the directory missing for that instant; the hot-swap watcher only takes a
+signature that is stable across two polls.
+"""
+
+LOCK_FILE = OUTPUT_DIR / ".shared_artifacts.lock"
+
+
+@contextmanager
+def _exclusive(lock_path):
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _publish(target, write, replace=False, lock_file=None):
+    """
+    Run write(tmp_dir) and rename the result to `target`.
+    Without replace an existing target wins (another process converted first).
+    replace=True swaps out an existing target with two renames, target -> old
+    and tmp -> target, holding lock_file (if given) for the renames; if the
+    second rename fails the old directory is put back and the error raised. Processes that still map the old files keep reading the old
+    inodes until they drop them.
+    """
+    target = Path(target)
+    tmp = target.with_name(f".{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    write(tmp)
+    if not replace:
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # another process published first
+            shutil.rmtree(tmp, ignore_errors=True)
+        return
+
+    old = None
+    with _exclusive(lock_file) if lock_file is not None else nullcontext():
+        if target.is_dir():
+            old = target.with_name(f".{target.name}.old-{os.getpid()}")
+            shutil.rmtree(old, ignore_errors=True)
+            os.rename(target, old)
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            if old is not None:
+                os.rename(old, target)
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def _lock_for(path):
+    # next to the artifact; for the default paths this is LOCK_FILE
+    return Path(path).parent / LOCK_FILE.name
+
+
+def publish_node_store(nodes, path=NODE_STORE_DIR, lock_file=None):
+    """
+    save_node_store into a fresh directory and swap it in under the artifact
+    lock, so ensure_mmap_artifacts never converts into the gap between renames.
+    """
+    _publish(path, lambda tmp: save_node_store(nodes, tmp), replace=True,
+             lock_file=lock_file or _lock_for(path))
+
+
+def publish_graph_csr(indptr, indices, weights, path=CSR_DIR, lock_file=None):
+    """save_graph_csr into a fresh directory and swap it in under the artifact lock."""
+    _publish(path, lambda tmp: save_graph_csr(indptr, indices, weights, tmp), replace=True,
+             lock_file=lock_file or _lock_for(path))
+
+
+def _nodes_json_to_store(json_path, store_dir):
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    data.sort(key=lambda d: d["id"])
+    if [d["id"] for d in data] != list(range(len(data))):
+        return False  # NodeStore needs dense ids 0..n-1
+    columns = {
+        "lat": [d["lat"] for d in data],
+        "lon": [d["lon"] for d in data],
+    }
+    # grid indices only if every node has them; never make up a (0, 0) cell
+    if all(d.get("i") is not None and d.get("j") is not None for d in data):
+        columns["i"] = [d["i"] for d in data]
+        columns["j"] = [d["j"] for d in data]
+    _publish(store_dir, lambda tmp: save_node_store(columns, tmp))
+    return True
+
+
+def _pickle_to_csr(pickle_path, csr_dir, num_nodes=None):
+    with open(pickle_path, "rb") as f:
+        adj = pickle.load(f)
+    if not all(isinstance(n, (int, np.integer)) for n in adj):
+        return False
+    csr = CSRGraph.from_dict(adj, num_nodes)
+    _publish(csr_dir, lambda tmp: save_graph_csr(csr.indptr, csr.indices, csr.weights, tmp))
+    return True
+
+
+def ensure_mmap_artifacts(nodes_file=NODES_FILE, node_store_dir=NODE_STORE_DIR,
+                          pickle_file=PICKLE_FILE, csr_dir=CSR_DIR, lock_file=LOCK_FILE):
+    """
+    Make sure the memory-mappable node store and CSR graph exist, converting
+    the legacy JSON / pickle once across all processes. Returns the list of
+    artifacts written by this call.
+    """
+    node_store_dir, csr_dir = Path(node_store_dir), Path(csr_dir)
+    need_nodes = not node_store_dir.is_dir() and Path(nodes_file).is_file()
+    need_csr = not csr_dir.is_dir() and Path(pickle_file).is_file()
+    if not (need_nodes or need_csr):
+        return []
+
+    written = []
+    with _exclusive(lock_file):
+        # re-check: another worker may have converted while we waited
+        if not node_store_dir.is_dir() and Path(nodes_file).is_file():
+            if _nodes_json_to_store(nodes_file, node_store_dir):
+                written.append(node_store_dir)
+        if not csr_dir.is_dir() and Path(pickle_file).is_file():
+            num_nodes = None
+            if node_store_dir.is_dir():
+                num_nodes = len(np.load(node_store_dir / "lat.npy", mmap_mode="r"))
+            if _pickle_to_csr(pickle_file, csr_dir, num_nodes):
+                written.append(csr_dir)
+    return written
@@ -0,0 +1,239 @@
+import json
+from bisect import bisect_right
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .config import LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, FINE_RES, LAND_MASK_PATH, TILED_FINE_DIR, TILE_CACHE_MAX_BYTES
+from .build_graph import estimate_node_counts, neighbour_table, load_land_mask
+from .land_raster import rasterize_land_mask
+from .tiled_build import split_tiles
+
+"""
+Out-of-core graph: the grid is split into tiles and every tile is written
+as its own file holding the tile's nodes and their outgoing edges. Node ids
+are tile-major (all nodes of tile 0, then tile 1, ...), so the tile of a
+node is a bisect over the per-tile id bases.
+
+At query time TiledGraph pages tiles in on demand through an LRU cache with
+a byte ceiling, which keeps a full-region FINE_RES graph (~70M nodes)
+within a fixed RAM budget.
+
+Layout of a tiled graph directory:
+  manifest.json     grid parameters, tile bounds and per-tile node counts
+  tile_00000.npz    water (tile raster), lat, lon, i, j, indptr, indices, weights
+"""
+
+
+def _tile_ids(water, base):
+    ids = np.full(water.shape, -1, dtype=np.int64)
+    ids[water] = base + np.arange(int(water.sum()), dtype=np.int64)
+    return ids
+
+
+def write_tiled_graph(path, lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX,
+                      res=FINE_RES, land_mask=None, tile_size=256):
+    """Build the grid graph tile by tile and write it to directory `path`."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    n_lat, n_lon, _ = estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res)
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+    tiles = split_tiles(n_lat, n_lon, tile_size)
+    row_bounds = sorted({(r0, r1) for r0, r1, _, _ in tiles})
+    col_bounds = sorted({(c0, c1) for _, _, c0, c1 in tiles})
+
+    # pass 1: water rasters -> per-tile node counts -> tile-major id bases
+    water_parts = [rasterize_land_mask(land_mask, lats[r0:r1], lons[c0:c1])
+                   for r0, r1, c0, c1 in tiles]
+    counts = [int(w.sum()) for w in water_parts]
+    bases = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    id_cache = {}
+
+    def ids_of(k):
+        if k not in id_cache:
+            id_cache[k] = _tile_ids(water_parts[k], bases[k])
+        return id_cache[k]
+
+    # pass 2: edges of each tile, with a one-cell halo of global ids
+    row_starts = [r0 for r0, _ in row_bounds]
+    col_starts = [c0 for c0, _ in col_bounds]
+    for k, (r0, r1, c0, c1) in enumerate(tiles):
+        w0, w1 = max(r0 - 1, 0), min(r1 + 1, n_lat)
+        v0, v1 = max(c0 - 1, 0), min(c1 + 1, n_lon)
+        window = np.full((w1 - w0, v1 - v0), -1, dtype=np.int64)
+        for ri in range(bisect_right(row_starts, w0) - 1, bisect_right(row_starts, w1 - 1)):
+            for ci in range(bisect_right(col_starts, v0) - 1, bisect_right(col_starts, v1 - 1)):
+                t = ri * len(col_bounds) + ci
+                tr0, tr1, tc0, tc1 = tiles[t]
+                a0, a1 = max(tr0, w0), min(tr1, w1)
+                b0, b1 = max(tc0, v0), min(tc1, v1)
+                window[a0 - w0:a1 - w0, b0 - v0:b1 - v0] = ids_of(t)[a0 - tr0:a1 - tr0, b0 - tc0:b1 - tc0]
+
+        node_i, node_j = np.nonzero(water_parts[k])
+        nbr, dist = neighbour_table(window, lats[w0:w1], lons[v0:v1],
+                                    node_i + (r0 - w0), node_j + (c0 - v0))
+        valid = nbr >= 0
+        indptr = np.zeros(len(node_i) + 1, dtype=np.int64)
+        np.cumsum(valid.sum(axis=1), out=indptr[1:])
+        np.savez(path / f"tile_{k:05d}.npz",
+                 water=water_parts[k],
+                 lat=lats[r0 + node_i], lon=lons[c0 + node_j],
+                 i=(r0 + node_i).astype(np.int32), j=(c0 + node_j).astype(np.int32),
+                 indptr=indptr, indices=nbr[valid].astype(np.int64),
+                 weights=dist[valid].astype(np.float32))
+
+        # ids of tile rows above the halo are no longer needed
+        for old in [t for t in id_cache if tiles[t][1] < r0 - 1]:
+            del id_cache[old]
+
+    manifest = {
+        "lat_min": lat_min, "lon_min": lon_min, "res": res,
+        "n_lat": n_lat, "n_lon": n_lon,
+        "tiles": tiles, "counts": counts,
+    }
+    with open(path / "manifest.json", "w") as f:
+        json.dump(manifest, f)
+    print(f"Saved tiled graph ({int(bases[-1])} nodes, {len(tiles)} tiles) to {path}")
+
+
+class TiledGraph:
+    """
+    Disk-backed adjacency paging tiles through an LRU cache capped at max_bytes.
+    Dict-compatible: adj.get(node_id, []) -> [(neighbor_id, distance_km), ...];
+    `.nodes` is the matching node mapping. Counters are in stats().
+    """
+
+    def __init__(self, path, max_bytes=TILE_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        with open(self.path / "manifest.json") as f:
+            self.manifest = json.load(f)
+        self.tiles = [tuple(t) for t in self.manifest["tiles"]]
+        self.bases = np.concatenate([[0], np.cumsum(self.manifest["counts"])]).astype(np.int64).tolist()
+        self._row_starts = sorted({t[0] for t in self.tiles})
+        self._col_starts = sorted({t[2] for t in self.tiles})
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nodes = TiledNodes(self)
+
+    def _tile(self, k):
+        tile = self._cache.get(k)
+        if tile is not None:
+            self.hits += 1
+            self._cache.move_to_end(k)
+            return tile
+
+        self.misses += 1
+        with np.load(self.path / f"tile_{k:05d}.npz") as data:
+            tile = {name: data[name] for name in data.files}
+        tile["nbytes"] = sum(a.nbytes for a in tile.values())
+        self._cache[k] = tile
+        self._bytes += tile["nbytes"]
+        while self._bytes > self.max_bytes and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._bytes -= old["nbytes"]
+            self.evictions += 1
+        return tile
+
+    def locate(self, node_id):
+        """(tile, local index) of a node id, or None when out of range."""
+        if not 0 <= node_id < self.bases[-1]:
+            return None
+        k = bisect_right(self.bases, node_id) - 1
+        return self._tile(k), node_id - self.bases[k]
+
+    def node_id_at(self, i, j):
+        """Node id of grid cell (i, j), or None on land / outside the grid."""
+        m = self.manifest
+        if not (0 <= i < m["n_lat"] and 0 <= j < m["n_lon"]):
+            return None
+        k = ((bisect_right(self._row_starts, i) - 1) * len(self._col_starts)
+             + bisect_right(self._col_starts, j) - 1)
+        r0, _, c0, _ = self.tiles[k]
+        water = self._tile(k)["water"]
+        li, lj = i - r0, j - c0
+        if not water[li, lj]:
+            return None
+        rank = int(water[:li].sum() + water[li, :lj].sum())
+        return self.bases[k] + rank
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / total if total else 0.0,
+            "resident_tiles": len(self._cache),
+            "resident_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def get(self, node_id, default=None):
+        found = self.locate(node_id)
+        if found is None:
+            return default
+        tile, local = found
+        a, b = tile["indptr"][local], tile["indptr"][local + 1]
+        return list(zip(tile["indices"][a:b].tolist(), tile["weights"][a:b].tolist()))
+
+    def __getitem__(self, node_id):
+        neighbors = self.get(node_id)
+        if neighbors is None:
+            raise KeyError(node_id)
+        return neighbors
+
+    def __contains__(self, node_id):
+        return 0 <= node_id < self.bases[-1]
+
+    def __len__(self):
+        return self.bases[-1]
+
+    def __iter__(self):
+        return iter(range(self.bases[-1]))
+
+
+class TiledNodes:
+    """nodes[nid] -> {"lat", "lon", "i", "j"} paged through the same tile cache."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, node_id):
+        found = self.graph.locate(node_id)
+        if found is None:
+            raise KeyError(node_id)
+        tile, local = found
+        return {"lat": float(tile["lat"][local]), "lon": float(tile["lon"][local]),
+                "i": int(tile["i"][local]), "j": int(tile["j"][local])}
+
+    def get(self, node_id, default=None):
+        try:
+            return self[node_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, node_id):
+        return node_id in self.graph
+
+    def __len__(self):
+        return len(self.graph)
+
+    def __iter__(self):
+        return iter(self.graph)
+
+
+def main_generate_fine(tile_size=256):
+    """Write the full-region FINE_RES graph as a tiled, out-of-core graph."""
+    land_mask = load_land_mask(LAND_MASK_PATH) if LAND_MASK_PATH else None
+    write_tiled_graph(TILED_FINE_DIR, res=FINE_RES, land_mask=land_mask, tile_size=tile_size)
+
+
+if __name__ == "__main__":
+    main_generate_fine()
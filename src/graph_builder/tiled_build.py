@@ -0,0 +1,273 @@
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.geometry import box
+
+from .config import LAT_MIN, LAT_MAX, LON_MIN, LON_MAX, COARSE_RES, TILE_CACHE_DISK_MAX_BYTES
+from .build_graph import estimate_node_counts, water_ids, neighbour_table
+from .land_raster import rasterize_land_mask
+
+"""
+Parallel tiled graph build.
+
+The LAT/LON bounding box is split into tiles which are processed in a
+process pool in two passes:
+  1. land-mask rasterization per tile (the expensive part),
+  2. node ids + 8-neighbour edges per tile, using a one-cell halo of the
+     assembled id raster so edges crossing tile seams are emitted from both sides.
+Per-tile edge lists are then stitched into one CSR by global node id, which
+gives exactly the graph of build_graph.generate_coarse_arrays regardless of
+tile size or worker count.
+
+With a cache_dir, pass 1 is incremental: each tile's water raster is stored
+under a content address, the hash of (global cell indices of the tile,
+sub-cell offset of the bounding box, resolution, land mask clipped to the
+tile). Integer indices rather than float coordinates keep the key stable
+when the bounding box moves by whole cells: that changes the bits of
+lat_min + k * res, not the cell. A bbox that is off the lattice by a
+fraction of a cell samples other points, and its offset (in nanodegrees)
+gives it its own keys. A new coastline file or a moved restricted polygon
+only changes the keys of the tiles it touches, so only those are
+re-rasterized; everything else is read back from the cache. Tile
+boundaries are anchored to the global lattice (multiples of tile_size cells
+from 0°/0°), so changing the bounding box also keeps interior tiles cached.
+The cache directory is pruned to TILE_CACHE_DISK_MAX_BYTES after each
+build, least recently used tiles first.
+"""
+
+_WORKER_LAND_MASK = None
+
+
+def _init_worker(land_mask):
+    global _WORKER_LAND_MASK
+    _WORKER_LAND_MASK = land_mask
+
+
+def split_tiles(n_lat, n_lon, tile_size, row_origin=0, col_origin=0):
+    """
+    Row-major list of (r0, r1, c0, c1) grid-index tiles covering the grid.
+    Tile boundaries fall where (index + origin) is a multiple of tile_size.
+    """
+    def bounds(n, origin):
+        first = (-origin) % tile_size or tile_size
+        cuts = [0] + list(range(first, n, tile_size)) + [n]
+        return list(zip(cuts[:-1], cuts[1:]))
+
+    return [
+        (r0, r1, c0, c1)
+        for r0, r1 in bounds(n_lat, row_origin)
+        for c0, c1 in bounds(n_lon, col_origin)
+    ]
+
+
+def grid_shift(origin, index, res):
+    """
+    Sub-cell offset of a bounding box from the global lattice, in integer
+    nanodegrees: 0 when `origin` sits on a multiple of res (float noise
+    included), so only a genuinely shifted grid changes the cache keys.
+    """
+    return int(round((origin - index * res) * 1e9))
+
+
+def tile_cache_key(cells, res, clipped_mask, shift=(0, 0)):
+    """
+    Content address of a tile's water raster; cells = global (i0, i1, j0, j1),
+    shift = (lat, lon) grid_shift of the bounding box the cells are sampled on.
+    """
+    h = hashlib.sha256()
+    h.update(("%d|%d|%d|%d|%d|%d|" % (tuple(cells) + tuple(shift)) + f"{res!r}|").encode())
+    if clipped_mask is not None and not clipped_mask.is_empty:
+        h.update(shapely.to_wkb(shapely.normalize(clipped_mask)))
+    return h.hexdigest()[:32]
+
+
+def _clip_to_tile(land_mask, cells, res, shift=(0, 0)):
+    """Land mask restricted to the tile, padded by half a cell so no cell centre sits on the cut."""
+    if land_mask is None:
+        return None
+    i0, i1, j0, j1 = cells
+    dlat, dlon = shift[0] * 1e-9, shift[1] * 1e-9
+    # from the integer cells, so the same tile always gets the same box
+    return land_mask.intersection(box((j0 - 0.5) * res + dlon, (i0 - 0.5) * res + dlat,
+                                      (j1 - 0.5) * res + dlon, (i1 - 0.5) * res + dlat))
+
+
+def _tile_water(task):
+    """Water raster of one tile and whether it had to be rasterized (False = cache hit)."""
+    lats, lons, cells, shift, res, cache_dir, force = task
+    if cache_dir is None:
+        return rasterize_land_mask(_WORKER_LAND_MASK, lats, lons), True
+
+    clipped = _clip_to_tile(_WORKER_LAND_MASK, cells, res, shift)
+    cache_file = Path(cache_dir) / f"tile_{tile_cache_key(cells, res, clipped, shift)}.npy"
+    shape = (len(lats), len(lons))
+    if cache_file.exists() and not force:
+        packed = np.load(cache_file)
+        os.utime(cache_file)  # mark as recently used for prune_tile_cache
+        return np.unpackbits(packed, count=shape[0] * shape[1]).astype(bool).reshape(shape), False
+
+    water = rasterize_land_mask(clipped, lats, lons)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(f".{os.getpid()}.tmp.npy")
+    np.save(tmp, np.packbits(water.ravel()))
+    tmp.replace(cache_file)
+    return water, True
+
+
+def prune_tile_cache(cache_dir, max_bytes=TILE_CACHE_DISK_MAX_BYTES, keep_since=None):
+    """
+    Delete the least recently used tiles until the cache fits in max_bytes.
+    Tiles used at or after keep_since (a time.time() value) are never deleted.
+    Returns the number of files removed.
+    """
+    entries = []
+    for f in Path(cache_dir).glob("tile_*.npy"):
+        try:
+            st = f.stat()
+        except FileNotFoundError:  # pruned by a concurrent build
+            continue
+        entries.append((st.st_mtime, st.st_size, f))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for mtime, size, f in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes or (keep_since is not None and mtime >= keep_since):
+            break
+        f.unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed
+
+
+def _tile_edges(task):
+    """Edges of the nodes inside one tile; the id window carries a one-cell halo."""
+    ids_win, lats_win, lons_win, (a0, a1, b0, b1) = task
+    node_i, node_j = np.nonzero(ids_win[a0:a1, b0:b1] >= 0)
+    node_i += a0
+    node_j += b0
+    nbr, dist = neighbour_table(ids_win, lats_win, lons_win, node_i, node_j)
+    valid = nbr >= 0
+    return ids_win[node_i, node_j], valid.sum(axis=1), nbr[valid], dist[valid]
+
+
+def _halo_window(tile, n_lat, n_lon):
+    r0, r1, c0, c1 = tile
+    w0, w1 = max(r0 - 1, 0), min(r1 + 1, n_lat)
+    v0, v1 = max(c0 - 1, 0), min(c1 + 1, n_lon)
+    return (w0, w1, v0, v1), (r0 - w0, r1 - w0, c0 - v0, c1 - v0)
+
+
+def stitch_tile_edges(num_nodes, parts):
+    """
+    Merge per-tile (src_ids, counts, indices, weights) into one CSR.
+    Every node belongs to exactly one tile, so placing each tile's rows at
+    indptr[src] is deterministic and keeps each node's neighbour order.
+    """
+    counts = np.zeros(num_nodes, dtype=np.int64)
+    for src, cnt, _, _ in parts:
+        counts[src] = cnt
+    indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    weights = np.empty(indptr[-1], dtype=np.float64)
+    for src, cnt, nbr, dist in parts:
+        if len(nbr) == 0:
+            continue
+        local_start = np.repeat(np.cumsum(cnt) - cnt, cnt)
+        pos = np.repeat(indptr[src], cnt) + (np.arange(len(nbr)) - local_start)
+        indices[pos] = nbr
+        weights[pos] = dist
+    return {"indptr": indptr, "indices": indices, "weights": weights}
+
+
+def tiled_water_raster(lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX,
+                       res=COARSE_RES, land_mask=None, tile_size=512, workers=None,
+                       cache_dir=None, force=False, stats=None,
+                       cache_max_bytes=TILE_CACHE_DISK_MAX_BYTES):
+    """
+    Pass 1 alone: the (n_lat, n_lon) water raster, rasterized tile by tile
+    across the pool and through the tile cache when cache_dir is given.
+    """
+    n_lat, n_lon, _ = estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res)
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+    row_origin, col_origin = int(round(lat_min / res)), int(round(lon_min / res))
+    # a bbox off the global lattice samples different points: keep its tiles apart
+    shift = (grid_shift(lat_min, row_origin, res), grid_shift(lon_min, col_origin, res))
+    tiles = split_tiles(n_lat, n_lon, tile_size, row_origin, col_origin)
+    water_tasks = [(lats[r0:r1], lons[c0:c1],
+                    (row_origin + r0, row_origin + r1, col_origin + c0, col_origin + c1),
+                    shift, res, cache_dir, force)
+                   for r0, r1, c0, c1 in tiles]
+    started = time.time()
+
+    if workers == 1:
+        _init_worker(land_mask)
+        water_parts = [_tile_water(t) for t in water_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(land_mask,)) as pool:
+            water_parts = list(pool.map(_tile_water, water_tasks))
+
+    if stats is not None:
+        rebuilt = sum(1 for _, fresh in water_parts if fresh)
+        stats.update({"tiles": len(tiles), "rebuilt": rebuilt, "cached": len(tiles) - rebuilt})
+    if cache_dir is not None:
+        prune_tile_cache(cache_dir, cache_max_bytes, keep_since=started - 1.0)
+    return _assemble(water_parts, tiles, n_lat, n_lon)
+
+
+def generate_tiled_arrays(lat_min=LAT_MIN, lat_max=LAT_MAX, lon_min=LON_MIN, lon_max=LON_MAX,
+                          res=COARSE_RES, land_mask=None, tile_size=512, workers=None,
+                          cache_dir=None, force=False, stats=None, water=None):
+    """
+    Tiled, multi-process version of generate_coarse_arrays; same (nodes, edges) output.
+    workers=1 runs the tiles in-process, None uses one process per CPU core.
+    cache_dir enables the content-addressed tile cache (force=True ignores hits).
+    If a `stats` dict is given it is filled with tile / rebuilt / cached counts.
+    A precomputed `water` raster (e.g. from land_raster.cached_water_raster)
+    skips pass 1 and only builds the edges.
+    """
+    n_lat, n_lon, _ = estimate_node_counts(lat_min, lat_max, lon_min, lon_max, res)
+    lats = lat_min + np.arange(n_lat) * res
+    lons = lon_min + np.arange(n_lon) * res
+    if water is None:
+        water = tiled_water_raster(lat_min, lat_max, lon_min, lon_max, res, land_mask,
+                                   tile_size, workers, cache_dir, force, stats)
+    tiles = split_tiles(n_lat, n_lon, tile_size,
+                        int(round(lat_min / res)), int(round(lon_min / res)))
+
+    edge_tasks = _edge_tasks(water_ids(water), lats, lons, tiles)
+    if workers == 1:
+        parts = [_tile_edges(t) for t in edge_tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_tile_edges, edge_tasks))
+
+    node_i, node_j = np.nonzero(water)
+    nodes = {
+        "lat": lats[node_i],
+        "lon": lons[node_j],
+        "i": node_i.astype(np.int32),
+        "j": node_j.astype(np.int32),
+    }
+    return nodes, stitch_tile_edges(len(node_i), parts)
+
+
+def _assemble(water_parts, tiles, n_lat, n_lon):
+    water = np.empty((n_lat, n_lon), dtype=bool)
+    for (r0, r1, c0, c1), (part, _) in zip(tiles, water_parts):
+        water[r0:r1, c0:c1] = part
+    return water
+
+
+def _edge_tasks(ids, lats, lons, tiles):
+    n_lat, n_lon = ids.shape
+    for tile in tiles:
+        (w0, w1, v0, v1), interior = _halo_window(tile, n_lat, n_lon)
+        yield ids[w0:w1, v0:v1], lats[w0:w1], lons[v0:v1], interior
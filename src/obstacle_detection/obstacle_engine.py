@@ -1,11 +1,19 @@
+import itertools
+
 from src.obstacle_detection.obstacle_rules import ObstacleRules
 from src.obstacle_detection.inference import obstacle_checker_ml
+from src.pathfinding.reroute import _is_blocked_by_checker
+
+_engine_ids = itertools.count(1)
 
 
 class ObstacleEngine:
     """
     Combines rule-based and ML-based obstacle detection.
     Can be plugged directly into the rerouting engine.
+
+    `layer_version` changes whenever the rules or the ML checker are replaced
+    through the setters below, so cached routes can be keyed on it.
     """
 
     def __init__(self, land_mask=None, restricted_polygons=None,
@@ -15,6 +23,26 @@ class ObstacleEngine:
             restricted_polygons=restricted_polygons
         )
         self.ml_checker = ml_checker
+        self.uid = next(_engine_ids)
+        self._ml_version = 0
+
+    @property
+    def layer_version(self):
+        """(engine uid, rules version, ml version): equal only if nothing changed."""
+        return (self.uid, self.rules.version, self._ml_version)
+
+    def set_land_mask(self, land_mask):
+        self.rules.set_land_mask(land_mask)
+
+    def set_restricted_zones(self, polygons):
+        self.rules.set_restricted_zones(polygons)
+
+    def add_restricted_zone(self, polygon):
+        self.rules.add_restricted_zone(polygon)
+
+    def set_ml_checker(self, ml_checker):
+        self.ml_checker = ml_checker
+        self._ml_version += 1
 
     def obstacle_checker(self, lat, lon):
         """
@@ -30,9 +58,24 @@ class ObstacleEngine:
         # ML detection
         return self.ml_checker(lat, lon)
 
+    def obstacle_checker_batch(self, lats, lons, threshold_km=1.0):
+        """
+        Batched obstacle_checker for paired lists of lats/lons -> list of bools.
+        The static rules run vectorised; the ML checker only sees points the
+        rules left open, and its answer is read like reroute reads a checker:
+        a bool, or obstacle coordinates that block within threshold_km.
+        """
+        blocked = self.rules.rule_based_batch(lats, lons)
+        return [bool(b) or _is_blocked_by_checker(lat, lon, self.ml_checker, threshold_km)
+                for b, lat, lon in zip(blocked, lats, lons)]
+
     # -------------------------------------------------------------
     # NEW: Alias method so Navigator and reroute() can call uniformly
     # -------------------------------------------------------------
     def is_obstacle(self, lat, lon):
         """Alias wrapper for obstacle_checker() for compatibility."""
         return self.obstacle_checker(lat, lon)
+
+    def is_obstacle_batch(self, lats, lons, threshold_km=1.0):
+        """Alias wrapper for obstacle_checker_batch()."""
+        return self.obstacle_checker_batch(lats, lons, threshold_km)
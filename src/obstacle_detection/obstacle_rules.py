@@ -1,3 +1,5 @@
+import numpy as np
+import shapely
 from shapely.geometry import Point
 
 
@@ -5,6 +7,19 @@ class ObstacleRules:
     def __init__(self, land_mask=None, restricted_polygons=None):
         self.land_mask = land_mask
         self.restricted_polygons = restricted_polygons or []
+        self.version = 0   # bumped by the setters below
+
+    def set_land_mask(self, land_mask):
+        self.land_mask = land_mask
+        self.version += 1
+
+    def set_restricted_zones(self, polygons):
+        self.restricted_polygons = list(polygons or [])
+        self.version += 1
+
+    def add_restricted_zone(self, polygon):
+        self.restricted_polygons.append(polygon)
+        self.version += 1
 
     def is_land(self, lat, lon):
         if self.land_mask is None:
@@ -24,3 +39,18 @@ class ObstacleRules:
         if self.is_restricted_zone(lat, lon):
             return True
         return False
+
+    def rule_based_batch(self, lats, lons):
+        """
+        Vectorised rule_based_checker: boolean array for paired lats/lons.
+        One shapely.contains_xy call per polygon instead of one Point per query.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        blocked = np.zeros(lats.shape, dtype=bool)
+        polygons = list(self.restricted_polygons)
+        if self.land_mask is not None:
+            polygons.insert(0, self.land_mask)
+        for poly in polygons:
+            blocked |= shapely.contains_xy(poly, lons, lats)
+        return blocked
@@ -0,0 +1,143 @@
+import heapq
+import time
+from math import inf
+
+from src.pathfinding.astar import reconstruct_path
+from src.utils.utils import haversine_km
+
+"""
+Bounded-suboptimal and anytime A*.
+
+Weighted A* orders the open set by g + eps * h. With a consistent heuristic
+(the great-circle distance is one) the first route it finds costs at most
+eps times the optimum, and it usually expands far fewer nodes than A*.
+
+ARA* (Likhachev, Gordon & Thrun, NIPS 2003) runs weighted A* with a falling
+eps and reuses the search effort between rounds: nodes whose g improves
+after they were expanded go to an INCONS list instead of being re-expanded,
+and are merged back into the open set for the next round. After each round
+
+    bound = min(eps, cost / min over OPEN and INCONS of (g + h))
+
+is a proven suboptimality factor for the current route. The search stops at
+bound 1 (optimal) or when the deadline passes; the best route so far and its
+bound are returned.
+"""
+
+# check the clock every this many expansions
+_CLOCK_EVERY = 256
+
+
+def _great_circle(nodes, goal_id):
+    goal = nodes[goal_id]
+
+    def h(node_id):
+        node = nodes[node_id]
+        return haversine_km(node["lat"], node["lon"], goal["lat"], goal["lon"])
+    return h
+
+
+def weighted_astar(start_id, goal_id, nodes, adj, epsilon=1.5, heuristic=None):
+    """
+    A* with f = g + epsilon * h. Returns (path, total_cost_km); the cost is at
+    most epsilon times the optimum.
+    """
+    path, cost, _ = ara_star(start_id, goal_id, nodes, adj, epsilon=epsilon,
+                             step=0.0, heuristic=heuristic)
+    return path, cost
+
+
+def ara_star(start_id, goal_id, nodes, adj, epsilon=2.5, step=0.5,
+             time_budget=None, heuristic=None, stats=None):
+    """
+    Anytime Repairing A*.
+    Returns (path, total_cost_km, bound) where cost <= bound * optimum.
+
+    epsilon: inflation of the first round (>= 1)
+    step: eps decrease per round; 0 stops after the first round
+    time_budget: seconds; once the first route is found the search stops
+                 at the deadline and returns the best route so far
+    stats: optional dict, receives rounds, expanded and epsilon (last round's eps)
+    """
+    if epsilon < 1.0:
+        raise ValueError("epsilon must be >= 1")
+    if heuristic is None:
+        heuristic = _great_circle(nodes, goal_id)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+
+    h_cache = {}
+
+    def h(node_id):
+        v = h_cache.get(node_id)
+        if v is None:
+            v = h_cache[node_id] = heuristic(node_id)
+        return v
+
+    g_score = {start_id: 0.0}
+    came_from = {}
+    open_nodes = {start_id}
+    incons = set()
+    closed = set()
+    expanded = 0
+    rounds = 0
+    best = (None, inf, inf)
+    eps = epsilon
+
+    while True:
+        rounds += 1
+        # (re)build the open heap for the current eps from OPEN and INCONS
+        open_nodes |= incons
+        incons = set()
+        closed = set()
+        open_set = [(g_score[n] + eps * h(n), g_score[n], n) for n in open_nodes]
+        heapq.heapify(open_set)
+
+        timed_out = False
+        while open_set:
+            f, g, current = open_set[0]
+            if current not in open_nodes or g != g_score[current]:
+                heapq.heappop(open_set)
+                continue
+            if g_score.get(goal_id, inf) <= f:
+                break
+            heapq.heappop(open_set)
+            open_nodes.discard(current)
+            closed.add(current)
+            expanded += 1
+            if (deadline is not None and best[0] is not None
+                    and expanded % _CLOCK_EVERY == 0 and time.monotonic() >= deadline):
+                timed_out = True
+                break
+
+            for neighbor, dist in adj.get(current, []):
+                tentative_g = g + dist
+                if tentative_g < g_score.get(neighbor, inf):
+                    g_score[neighbor] = tentative_g
+                    came_from[neighbor] = current
+                    if neighbor in closed:
+                        incons.add(neighbor)
+                    else:
+                        open_nodes.add(neighbor)
+                        heapq.heappush(open_set, (tentative_g + eps * h(neighbor),
+                                                  tentative_g, neighbor))
+
+        if timed_out:
+            break
+        cost = g_score.get(goal_id, inf)
+        if cost == inf:
+            break  # no route at all
+
+        frontier = min((g_score[n] + h(n) for n in open_nodes | incons), default=inf)
+        bound = max(1.0, min(eps, cost / frontier)) if frontier > 0 else eps
+        if cost < best[1] or bound < best[2]:
+            best = (reconstruct_path(came_from, goal_id), cost, bound)
+
+        if bound <= 1.0 or step <= 0:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        eps = max(1.0, min(eps - step, bound))
+
+    if stats is not None:
+        stats.update(rounds=rounds, expanded=expanded, epsilon=eps)
+    return best
@@ -0,0 +1,151 @@
+import heapq
+from array import array
+from math import asin, inf, sqrt
+
+import numpy as np
+
+from src.graph_builder.csr_graph import CSRGraph
+from src.graph_builder.node_store import NodeStore
+from src.utils.utils import EARTH_RADIUS_KM
+
+"""
+High-throughput A* over dense integer node ids.
+
+Scores, parents and closed flags live in preallocated typed arrays sized to
+the graph and are reused between queries: every query bumps a generation
+number, and a slot is only trusted if its stamp equals the current
+generation, so nothing has to be cleared between searches.
+CSR arrays are read through memoryviews (zero-copy, also for mmap-ed files),
+and the heuristic is the great-circle distance computed from precomputed
+unit-sphere coordinates: one sqrt + asin per node instead of a full haversine.
+"""
+
+# slightly under 2R so float32 edge weights can never make the heuristic overshoot
+_H_SCALE = 2.0 * EARTH_RADIUS_KM * (1.0 - 1e-6)
+# points sit just inside the unit sphere, so half a chord is always < 1 for asin()
+_SHRINK = 1.0 - 1e-9
+
+
+def unit_vectors(lat, lon, radius=1.0):
+    """(x, y, z) float64 arrays of points on a sphere (unit sphere by default)."""
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    lam = np.radians(np.asarray(lon, dtype=np.float64))
+    return (radius * np.cos(phi) * np.cos(lam), radius * np.cos(phi) * np.sin(lam),
+            radius * np.sin(phi))
+
+
+def _typed(code, values):
+    out = array(code)
+    out.frombytes(np.ascontiguousarray(values).tobytes())
+    return out
+
+
+class ArrayAStar:
+    """
+    Reusable A* searcher bound to one graph.
+
+      searcher = ArrayAStar.from_graph(nodes, adj)
+      path, dist = searcher.search(start_id, goal_id)
+
+    `blocked` (optional, per query) is any container of node ids to skip.
+    """
+
+    def __init__(self, lat, lon, indptr, indices, weights):
+        n = len(indptr) - 1
+        self.num_nodes = n
+        x, y, z = unit_vectors(lat, lon, _SHRINK)
+        self._x = _typed("d", x)
+        self._y = _typed("d", y)
+        self._z = _typed("d", z)
+        self._indptr = memoryview(np.ascontiguousarray(indptr))
+        self._indices = memoryview(np.ascontiguousarray(indices))
+        self._weights = memoryview(np.ascontiguousarray(weights))
+
+        self._g = array("d", bytes(8 * n))
+        self._parent = array("q", bytes(8 * n))
+        self._seen = array("I", bytes(4 * n))    # generation in which g/parent were set
+        self._closed = array("I", bytes(4 * n))  # generation in which the node was expanded
+        self.generation = 0
+        self.last_expanded = 0
+
+    @classmethod
+    def from_graph(cls, nodes, adj):
+        """Build from a NodeStore/CSRGraph pair, or convert legacy dicts with ids 0..n-1."""
+        if not isinstance(nodes, NodeStore):
+            nodes = NodeStore.from_dict(nodes)
+        if not isinstance(adj, CSRGraph):
+            adj = CSRGraph.from_dict(adj, num_nodes=len(nodes))
+        return cls(nodes.lat, nodes.lon, adj.indptr, adj.indices, adj.weights)
+
+    def heuristic(self, node_id, goal_id):
+        x, y, z = self._x, self._y, self._z
+        dx = x[node_id] - x[goal_id]
+        dy = y[node_id] - y[goal_id]
+        dz = z[node_id] - z[goal_id]
+        return _H_SCALE * asin(sqrt(dx * dx + dy * dy + dz * dz) * 0.5)
+
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation >= 0xFFFFFFFF:
+            # stamps wrap: clear once every 4 billion queries
+            n = self.num_nodes
+            self._seen = array("I", bytes(4 * n))
+            self._closed = array("I", bytes(4 * n))
+            self.generation = 1
+        return self.generation
+
+    def search(self, start_id, goal_id, blocked=None):
+        """Returns (path, total_cost_km) like astar.astar; (None, inf) if unreachable."""
+        gen = self._next_generation()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        indptr, indices, weights = self._indptr, self._indices, self._weights
+        x, y, z = self._x, self._y, self._z
+        tx, ty, tz = x[goal_id], y[goal_id], z[goal_id]
+        scale = _H_SCALE
+        push, pop = heapq.heappush, heapq.heappop
+
+        g[start_id] = 0.0
+        parent[start_id] = -1
+        seen[start_id] = gen
+        open_set = [(self.heuristic(start_id, goal_id), start_id)]
+        expanded = 0
+
+        while open_set:
+            _, current = pop(open_set)
+            if closed[current] == gen:
+                continue
+            if current == goal_id:
+                self.last_expanded = expanded
+                return self._reconstruct(goal_id), g[goal_id]
+            closed[current] = gen
+            expanded += 1
+
+            g_cur = g[current]
+            for k in range(indptr[current], indptr[current + 1]):
+                nb = indices[k]
+                tentative = g_cur + weights[k]
+                # closed nodes already hold their final (smaller) g
+                if seen[nb] == gen and tentative >= g[nb]:
+                    continue
+                if blocked is not None and nb in blocked:
+                    continue
+                g[nb] = tentative
+                parent[nb] = current
+                seen[nb] = gen
+                dx, dy, dz = x[nb] - tx, y[nb] - ty, z[nb] - tz
+                push(open_set, (tentative + scale * asin(sqrt(dx * dx + dy * dy + dz * dz) * 0.5), nb))
+
+        self.last_expanded = expanded
+        return None, inf
+
+    def _reconstruct(self, goal_id):
+        parent = self._parent
+        path = [goal_id]
+        while parent[path[-1]] != -1:
+            path.append(parent[path[-1]])
+        return path[::-1]
+
+
+def astar_array(start_id, goal_id, nodes, adj):
+    """One-shot convenience wrapper; keep an ArrayAStar around to reuse its buffers."""
+    return ArrayAStar.from_graph(nodes, adj).search(start_id, goal_id)
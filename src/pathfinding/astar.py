@@ -4,14 +4,23 @@ from math import inf
 from src.utils.utils import haversine_km
 
 
-def astar(start_id, goal_id, nodes, adj):
+def astar(start_id, goal_id, nodes, adj, heuristic=None, node_filter=None):
     """
     A* pathfinding on the ocean navigation graph.
     Returns (path, total_cost_km).
     
     nodes: {id: {"lat": ..., "lon": ...}}
     adj:   {id: [(neighbor_id, distance_km), ...]}
+    heuristic: optional h(node_id) lower bound to the goal (e.g. landmarks.LandmarkTable);
+               defaults to the great-circle distance
+    node_filter: optional f(node_id) -> bool; neighbours it rejects are never opened
     """
+    if heuristic is None:
+        goal = nodes[goal_id]
+
+        def heuristic(node_id):
+            return haversine_km(nodes[node_id]["lat"], nodes[node_id]["lon"],
+                                goal["lat"], goal["lon"])
 
     # Min-heap priority queue: (estimated_total_cost, node_id)
     open_set = [(0, start_id)]
@@ -20,12 +29,7 @@ def astar(start_id, goal_id, nodes, adj):
     g_score = {start_id: 0}
 
     # f(n) = g(n) + h(n)
-    f_score = {
-        start_id: haversine_km(
-            nodes[start_id]["lat"], nodes[start_id]["lon"],
-            nodes[goal_id]["lat"], nodes[goal_id]["lon"]
-        )
-    }
+    f_score = {start_id: heuristic(start_id)}
 
     visited = set()
 
@@ -41,6 +45,8 @@ def astar(start_id, goal_id, nodes, adj):
         visited.add(current)
 
         for neighbor, dist in adj.get(current, []):
+            if node_filter is not None and not node_filter(neighbor):
+                continue
             tentative_g = g_score[current] + dist
 
             if tentative_g < g_score.get(neighbor, inf):
@@ -48,11 +54,7 @@ def astar(start_id, goal_id, nodes, adj):
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g
 
-                heuristic = haversine_km(
-                    nodes[neighbor]["lat"], nodes[neighbor]["lon"],
-                    nodes[goal_id]["lat"], nodes[goal_id]["lon"],
-                )
-                f_score[neighbor] = tentative_g + heuristic
+                f_score[neighbor] = tentative_g + heuristic(neighbor)
 
                 heapq.heappush(open_set, (f_score[neighbor], neighbor))
 
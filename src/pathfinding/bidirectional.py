@@ -0,0 +1,85 @@
+import heapq
+from math import inf
+from src.utils.utils import haversine_km
+
+
+def bidirectional_dijkstra(start_id, goal_id, adj, reverse_adj=None, stats=None):
+    """
+    Dijkstra from both ends at once.
+    reverse_adj defaults to adj (the ocean graphs are undirected).
+    Stops once top_forward + top_backward >= best meeting distance.
+    Returns (path, total_cost_km).
+    """
+    return _bidirectional(start_id, goal_id, adj, reverse_adj or adj,
+                          lambda n: 0.0, stats)
+
+
+def bidirectional_astar(start_id, goal_id, nodes, adj, reverse_adj=None, stats=None):
+    """
+    Bidirectional A* with average potentials:
+      p(v) = (h(v, goal) - h(start, v)) / 2
+    The forward search uses p, the backward search -p, which keeps both
+    reduced edge costs non-negative and consistent with each other, so the
+    plain bidirectional Dijkstra stopping rule stays exact.
+    Returns (path, total_cost_km).
+    """
+    s, t = nodes[start_id], nodes[goal_id]
+
+    def potential(n):
+        v = nodes[n]
+        return 0.5 * (haversine_km(v["lat"], v["lon"], t["lat"], t["lon"])
+                      - haversine_km(s["lat"], s["lon"], v["lat"], v["lon"]))
+
+    return _bidirectional(start_id, goal_id, adj, reverse_adj or adj, potential, stats)
+
+
+def _bidirectional(start_id, goal_id, adj, reverse_adj, potential, stats):
+    if start_id == goal_id:
+        return [start_id], 0
+
+    # index 0 = forward from start, 1 = backward from goal
+    dist = ({start_id: 0}, {goal_id: 0})
+    came_from = ({}, {})
+    visited = (set(), set())
+    graphs = (adj, reverse_adj)
+    sign = (1.0, -1.0)
+    pq = ([(potential(start_id), start_id)], [(-potential(goal_id), goal_id)])
+
+    best, meet = inf, None
+    expanded = 0
+
+    while pq[0] and pq[1]:
+        if pq[0][0][0] + pq[1][0][0] >= best:
+            break
+
+        side = 0 if len(pq[0]) <= len(pq[1]) else 1
+        _, current = heapq.heappop(pq[side])
+        if current in visited[side]:
+            continue
+        visited[side].add(current)
+        expanded += 1
+
+        d_cur = dist[side][current]
+        other = dist[1 - side]
+        for neighbor, edge_cost in graphs[side].get(current, []):
+            new_cost = d_cur + edge_cost
+            if new_cost < dist[side].get(neighbor, inf):
+                dist[side][neighbor] = new_cost
+                came_from[side][neighbor] = current
+                heapq.heappush(pq[side], (new_cost + sign[side] * potential(neighbor), neighbor))
+            if neighbor in other and dist[side][neighbor] + other[neighbor] < best:
+                best = dist[side][neighbor] + other[neighbor]
+                meet = neighbor
+
+    if stats is not None:
+        stats["expanded"] = expanded
+    if meet is None:
+        return None, inf
+
+    path = [meet]
+    while path[-1] in came_from[0]:
+        path.append(came_from[0][path[-1]])
+    path.reverse()
+    while path[-1] in came_from[1]:
+        path.append(came_from[1][path[-1]])
+    return path, best
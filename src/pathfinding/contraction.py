@@ -0,0 +1,482 @@
+import heapq
+from math import inf
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_array
+
+from src.graph_builder.config import CH_DIR
+from src.utils.utils import haversine_km
+
+"""
+Contraction Hierarchies for fast static shortest-path queries.
+
+Preprocessing works on flat edge arrays and contracts the graph in rounds:
+each round takes every node whose priority (edge difference + contracted
+neighbours + level) is lowest among its neighbours, so the batch is
+independent. Priorities are updated lazily: a node whose neighbourhood
+changed is only re-evaluated when it is about to be contracted.
+Contracting v adds a shortcut u-w for every pair of remaining neighbours
+unless a bounded witness search (paths of at most three edges) finds a
+path u -> w avoiding v that is no longer. Nodes whose degree grows past
+max_degree stay uncontracted: that core keeps all its edges and is
+searched by A* at query time. Each node keeps only its edges to
+higher-ranked nodes; a query is a bidirectional Dijkstra over those upward
+edges, and shortcuts are unpacked through their middle node back to grid
+node ids.
+
+The ocean graphs are undirected, so one upward graph serves both
+directions. Stored as a directory of .npy files (CH_DIR, next to the graph
+artifacts):
+  rank.npy                      int32   contraction order of every node
+  up_indptr / up_indices.npy    CSR of upward edges (core edges in both directions)
+  up_weights.npy                float64 edge / shortcut length in km
+  up_middle.npy                 int32   contracted middle node, -1 for original edges
+  core_rank.npy                         first rank of the uncontracted core
+"""
+
+CH_ARRAYS = ("rank", "up_indptr", "up_indices", "up_weights", "up_middle", "core_rank")
+_EPS = 1e-9
+# witness search depth when contracting, and the cheaper one for priorities
+_WITNESS_HOPS = 3
+_PRIORITY_HOPS = 2
+
+
+def _edge_arrays(adj, num_nodes):
+    """Every edge of adj in both directions as (src, dst, weight, middle) arrays, sorted by (src, dst)."""
+    if hasattr(adj, "indptr"):
+        src = np.repeat(np.arange(adj.num_nodes, dtype=np.int64), np.diff(adj.indptr))
+        dst = np.asarray(adj.indices, dtype=np.int64)
+        weight = np.asarray(adj.weights, dtype=np.float64)
+    else:
+        # dict weights stay float64 (CSRGraph.from_dict would round them to float32)
+        flat = [(u, w, d) for u, neighbors in adj.items() for w, d in neighbors]
+        src = np.array([e[0] for e in flat], dtype=np.int64)
+        dst = np.array([e[1] for e in flat], dtype=np.int64)
+        weight = np.array([e[2] for e in flat], dtype=np.float64)
+    keep = src != dst
+    src, dst, weight = src[keep], dst[keep], weight[keep]
+    src, dst, weight = np.concatenate([src, dst]), np.concatenate([dst, src]), np.concatenate([weight, weight])
+    src, dst, weight, middle = _shortest(src, dst, weight, np.full(len(src), -1, dtype=np.int64), num_nodes)
+    return src, dst, weight, middle
+
+
+def _shortest(src, dst, weight, middle, num_nodes):
+    """Keep the shortest of parallel edges, sorted by (src, dst)."""
+    key = src * num_nodes + dst
+    order = np.lexsort((weight, key))
+    key = key[order]
+    first = np.ones(len(key), dtype=bool)
+    first[1:] = key[1:] != key[:-1]
+    order = order[first]
+    return src[order], dst[order], weight[order], middle[order]
+
+
+def _merge(edges, added, num_nodes):
+    """Add edges to the sorted edge arrays; of parallel edges the shorter wins, the old one on ties."""
+    src, dst, weight, middle = edges
+    added = _shortest(*added, num_nodes)
+    key = src * num_nodes + dst
+    new_key = added[0] * num_nodes + added[1]
+    pos = np.searchsorted(key, new_key)
+    found = np.zeros(len(pos), dtype=bool)
+    inside = pos < len(key)
+    found[inside] = key[pos[inside]] == new_key[inside]
+    better = found.copy()
+    better[found] = added[2][found] < weight[pos[found]]
+    weight[pos[better]] = added[2][better]
+    middle[pos[better]] = added[3][better]
+    at = pos[~found]
+    return tuple(np.insert(old, at, new[~found]) for old, new in zip(edges, added))
+
+
+def _segments(indptr, nodes):
+    """(owner, edge) of the CSR edges of every node in nodes, grouped by owner."""
+    deg = indptr[nodes + 1] - indptr[nodes]
+    owner = np.repeat(np.arange(len(nodes)), deg)
+    edge = indptr[nodes][owner] + np.arange(len(owner)) - np.repeat(np.cumsum(deg) - deg, deg)
+    return owner, edge
+
+
+def _lookup(matrix, rows, cols):
+    """Weight of the entries (rows, cols) of a sparse matrix, inf where there is none."""
+    if not len(rows):
+        return np.zeros(0)
+    found = matrix[rows, cols]
+    return np.where(found > 0, found, inf)
+
+
+def _group_min(values, group):
+    """Minimum of values per run of equal (sorted) group ids: (ids, minima)."""
+    start = np.flatnonzero(np.diff(group, prepend=-1))
+    return group[start], np.minimum.reduceat(values, start)
+
+
+def _witness_shortcuts(vs, matrix, indptr, dst, weight, excluded, hops):
+    """
+    Bounded witness search for contracting each node of vs: (v, u, w, length)
+    of the neighbour pairs u, w that need a shortcut because no path of at
+    most `hops` edges avoiding v and the excluded nodes is as short as
+    u -> v -> w. Every neighbour u grows one ball of hops - 1 edges, cut off
+    at its longest detour through v, that all its pairs share; a pair closes
+    it with the edges into w. A missed witness only costs a superfluous shortcut,
+    never a wrong distance.
+    """
+    n = len(indptr) - 1
+    deg = indptr[vs + 1] - indptr[vs]
+    owner, edge = _segments(indptr, vs)
+    if not len(edge):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0)
+    v, u, cost = vs[owner], dst[edge], weight[edge]
+    _, longest = _group_min(-cost, owner)
+    bound = cost - longest[np.cumsum(np.diff(owner, prepend=-1) != 0) - 1] + _EPS
+
+    parts = []
+    source, node, dist = np.arange(len(edge)), u, np.zeros(len(edge))
+    for _ in range(hops - 1):
+        grow, step = _segments(indptr, node)
+        source, node, dist = source[grow], dst[step], dist[grow] + weight[step]
+        keep = (dist < bound[source]) & (node != v[source]) & ~excluded[node]
+        source, node, dist = source[keep], node[keep], dist[keep]
+        parts.append((source, node, dist))
+    source, node, dist = (np.concatenate(c) for c in zip(*parts))
+    key = source * n + node
+    order = np.argsort(key)
+    key, near = _group_min(dist[order], key[order])
+    ball = csr_array((near, key % n, np.searchsorted(key // n, np.arange(len(edge) + 1))),
+                     shape=(len(edge), n))
+
+    # every pair of slots a < b around the same v
+    slot = np.arange(len(edge)) - (np.cumsum(deg) - deg)[owner]
+    partners = deg[owner] - slot - 1
+    a = np.repeat(np.arange(len(edge)), partners)
+    b = a + 1 + np.arange(len(a)) - np.repeat(np.cumsum(partners) - partners, partners)
+    w, length = u[b], cost[a] + cost[b]
+    best = np.minimum(_lookup(matrix, u[a], w), _lookup(ball, a, w))
+    grow, step = _segments(indptr, w)
+    if len(grow):
+        via = _lookup(ball, a[grow], dst[step]) + weight[step]
+        pair, shortest = _group_min(via, grow)
+        best[pair] = np.minimum(best[pair], shortest)
+    need = best > length + _EPS
+    return v[a][need], u[a][need], w[need], length[need]
+
+
+def _shortcuts(vs, matrix, indptr, dst, weight, excluded, hops, budget=1 << 21):
+    """(v, u, w, length) of the shortcuts needed to contract each node of vs, in chunks."""
+    deg = indptr[vs + 1] - indptr[vs]
+    found = [_witness_shortcuts(vs[part], matrix, indptr, dst, weight, excluded, hops)
+             for part in _chunks(deg ** hops + 1, budget)]
+    if not found:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0)
+    return tuple(np.concatenate(col) for col in zip(*found))
+
+
+def _chunks(cost, budget):
+    """Split range(len(cost)) into consecutive slices whose summed cost stays near budget."""
+    bounds = np.searchsorted(np.cumsum(cost), np.arange(budget, cost.sum() + budget, budget))
+    start = 0
+    for end in np.unique(np.append(bounds + 1, len(cost))):
+        end = min(int(end), len(cost))
+        if end > start:
+            yield slice(start, end)
+            start = end
+
+
+def _neighbor_min(values, indptr, dst):
+    """Smallest value among the neighbours of every node (int64 max without neighbours)."""
+    low = np.full(len(indptr) - 1, np.iinfo(np.int64).max)
+    has = np.flatnonzero(indptr[1:] > indptr[:-1])
+    if len(has):
+        low[has] = np.minimum.reduceat(values[dst], indptr[has])
+    return low
+
+
+def build_contraction_hierarchy(adj, num_nodes=None, max_degree=24, verbose=False):
+    """
+    Contract the graph. adj: any {id: [(neighbor_id, dist_km), ...]} mapping with
+    integer ids (dict, CSRGraph, ...). Nodes that would be contracted with more
+    than max_degree remaining neighbours form the core. Returns a ContractionHierarchy.
+    """
+    if num_nodes is None:
+        num_nodes = max(adj.keys(), default=-1) + 1
+    n = num_nodes
+    edges = _edge_arrays(adj, n)
+
+    # random tie-break, so equal priorities do not sweep the lattice row by row
+    tie = np.random.default_rng(0).permutation(n).astype(np.int64)
+    rank = np.full(n, -1, dtype=np.int64)
+    priority = np.zeros(n, dtype=np.int64)
+    contracted = np.zeros(n, dtype=np.int64)
+    level = np.zeros(n, dtype=np.int64)
+    stale = np.ones(n, dtype=bool)
+    never = np.zeros(n, dtype=bool)
+    up = []
+    order = 0
+
+    while order < n:
+        src, dst, weight, middle = edges
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        matrix = csr_array((weight, dst, indptr), shape=(n, n))
+        degree = np.diff(indptr)
+        candidate = (rank < 0) & (degree <= max_degree)
+        if not candidate.any():
+            break
+        while True:
+            key = np.where(candidate, priority * n + tie, np.iinfo(np.int64).max)
+            batch = candidate & (key <= _neighbor_min(key, indptr, dst))
+            # lazy updates: only re-evaluate stale nodes about to be contracted
+            todo = np.flatnonzero(batch & stale)
+            if not len(todo):
+                break
+            v = _shortcuts(todo, matrix, indptr, dst, weight, never, _PRIORITY_HOPS)[0]
+            added = np.bincount(v, minlength=n)[todo]
+            priority[todo] = added - degree[todo] + contracted[todo] + level[todo]
+            stale[todo] = False
+
+        vs = np.flatnonzero(batch)
+        rank[vs] = order + np.arange(len(vs))
+        order += len(vs)
+        v, u, w, length = _shortcuts(vs, matrix, indptr, dst, weight, batch, _WITNESS_HOPS)
+        outgoing = batch[src]
+        up.append((src[outgoing], dst[outgoing], weight[outgoing], middle[outgoing]))
+        neighbors = dst[outgoing]
+        np.add.at(contracted, neighbors, 1)
+        np.maximum.at(level, neighbors, level[src[outgoing]] + 1)
+        stale[neighbors] = True
+
+        keep = ~(outgoing | batch[dst])
+        edges = _merge(tuple(e[keep] for e in edges),
+                       (np.concatenate([u, w]), np.concatenate([w, u]),
+                        np.concatenate([length, length]), np.concatenate([v, v])), n)
+        if verbose:
+            print(f"contracted {order}/{n} nodes, {len(edges[0])} edges left")
+
+    # the core keeps its remaining edges, in both directions
+    core_rank = order
+    core = np.flatnonzero(rank < 0)
+    rank[core] = order + np.arange(len(core))
+    up.append(edges)
+    if verbose:
+        print(f"core of {len(core)} nodes")
+    src, dst, weight, middle = (np.concatenate(col) for col in zip(*up))
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return ContractionHierarchy(
+        rank.astype(np.int32),
+        indptr,
+        dst[order].astype(np.int32),
+        weight[order],
+        middle[order].astype(np.int32),
+        core_rank,
+    )
+
+
+class ContractionHierarchy:
+    """Upward CSR graph plus the query / path-unpacking engine."""
+
+    def __init__(self, rank, up_indptr, up_indices, up_weights, up_middle, core_rank=None):
+        self.rank = rank
+        self.up_indptr = up_indptr
+        self.up_indices = up_indices
+        self.up_weights = up_weights
+        self.up_middle = up_middle
+        # nodes ranked from core_rank up were left uncontracted
+        self.core_rank = len(rank) if core_rank is None else int(core_rank)
+        # memoryviews: zero-copy reads, also of memory-mapped files
+        self._rank = memoryview(np.ascontiguousarray(rank))
+        self._indptr = memoryview(np.ascontiguousarray(up_indptr))
+        self._indices = memoryview(np.ascontiguousarray(up_indices))
+        self._weights = memoryview(np.ascontiguousarray(up_weights))
+        self._middle = memoryview(np.ascontiguousarray(up_middle))
+        self.last_settled = 0
+
+    @property
+    def num_nodes(self):
+        return len(self.rank)
+
+    def _upward(self, node_id):
+        a, b = self._indptr[node_id], self._indptr[node_id + 1]
+        return zip(self._indices[a:b], self._weights[a:b], self._middle[a:b])
+
+    def _edges(self, node_id):
+        a, b = self._indptr[node_id], self._indptr[node_id + 1]
+        return list(zip(self._indices[a:b].tolist(), self._weights[a:b].tolist()))
+
+    def query(self, start_id, goal_id, nodes=None):
+        """
+        Shortest path between two grid node ids. Returns (path, total_cost_km).
+        nodes: optional {id: {"lat": ..., "lon": ...}}; with it the search
+        through the uncontracted core is an A* towards the goal.
+        """
+        if start_id == goal_id:
+            return [start_id], 0
+        dist = ({start_id: 0.0}, {goal_id: 0.0})
+        parent = ({}, {})
+        pq = ([(0.0, start_id)], [(0.0, goal_id)])
+        best, meet = inf, None
+        settled = 0
+        rank, core = self._rank, self.core_rank
+
+        while pq[0] or pq[1]:
+            # search the side with the smaller top; stop when neither can improve
+            side = 0 if pq[0] and (not pq[1] or pq[0][0][0] <= pq[1][0][0]) else 1
+            d, u = heapq.heappop(pq[side])
+            if d >= best:
+                if not pq[1 - side] or pq[1 - side][0][0] >= best:
+                    break
+                pq[side].clear()
+                continue
+            if d > dist[side][u]:
+                continue
+            settled += 1
+            other = dist[1 - side].get(u)
+            if other is not None and d + other < best:
+                best, meet = d + other, u
+            if rank[u] >= core:
+                continue
+            seen = dist[side]
+            upward = self._edges(u)
+            # stall-on-demand: a higher node already offers a shorter way to u
+            if any(seen.get(w, inf) + c < d for w, c in upward):
+                continue
+            for w, c in upward:
+                nd = d + c
+                if nd < seen.get(w, inf):
+                    seen[w] = nd
+                    parent[side][w] = u
+                    heapq.heappush(pq[side], (nd, w))
+
+        if core < self.num_nodes:
+            best, meet, core_settled = self._core_search(dist, parent[0], best, meet, goal_id, nodes)
+            settled += core_settled
+        self.last_settled = settled
+        if meet is None:
+            return None, inf
+
+        forward = [meet]
+        while forward[-1] in parent[0]:
+            forward.append(parent[0][forward[-1]])
+        forward.reverse()
+        backward = [meet]
+        while backward[-1] in parent[1]:
+            backward.append(parent[1][backward[-1]])
+
+        ch_path = forward + backward[1:]
+        path = [ch_path[0]]
+        for a, b in zip(ch_path, ch_path[1:]):
+            self._unpack(a, b, path)
+        return path, best
+
+    def _core_search(self, dist, parent, best, meet, goal_id, nodes):
+        """
+        Continue the forward search inside the core from the core nodes it
+        reached, until no core path can beat `best`; the backward search's
+        distances close a path wherever it reached the core too.
+        """
+        rank, core = self._rank, self.core_rank
+        forward, backward = dist
+        if nodes is None:
+            def heuristic(node_id):
+                return 0.0
+        else:
+            goal = nodes[goal_id]
+
+            def heuristic(node_id):
+                return haversine_km(nodes[node_id]["lat"], nodes[node_id]["lon"], goal["lat"], goal["lon"])
+
+        g = {u: d for u, d in forward.items() if rank[u] >= core}
+        pq = [(d + heuristic(u), d, u) for u, d in g.items() if d < best]
+        heapq.heapify(pq)
+        settled = 0
+        while pq:
+            f, d, u = heapq.heappop(pq)
+            if f >= best:
+                break
+            if d > g[u]:
+                continue
+            settled += 1
+            other = backward.get(u)
+            if other is not None and d + other < best:
+                best, meet = d + other, u
+            for w, c in self._edges(u):
+                nd = d + c
+                if nd < g.get(w, inf):
+                    g[w] = nd
+                    parent[w] = u
+                    heapq.heappush(pq, (nd + heuristic(w), nd, w))
+        return best, meet, settled
+
+    def _edge_middle(self, a, b):
+        low, high = (a, b) if self._rank[a] < self._rank[b] else (b, a)
+        best_w, best_m = inf, -1
+        for w, c, m in self._upward(low):
+            if w == high and c < best_w:
+                best_w, best_m = c, m
+        return best_m
+
+    def _unpack(self, a, b, path):
+        """Append the original nodes of CH edge a -> b (excluding a) to path."""
+        stack = [(a, b)]
+        while stack:
+            u, w = stack.pop()
+            m = self._edge_middle(u, w)
+            if m < 0:
+                path.append(w)
+            else:
+                stack.append((m, w))
+                stack.append((u, m))
+
+
+def save_contraction_hierarchy(ch, path=CH_DIR):
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name in CH_ARRAYS:
+        np.save(path / f"{name}.npy", getattr(ch, name))
+    print(f"Saved contraction hierarchy ({ch.num_nodes} nodes, {len(ch.up_indices)} upward edges) to {path}")
+
+
+def load_contraction_hierarchy(path=CH_DIR):
+    path = Path(path)
+    if not path.is_dir():
+        raise RuntimeError(f"No contraction hierarchy at {path}. Run src.pathfinding.contraction first.")
+    # hierarchies saved before the core existed have no core_rank.npy: fully contracted
+    return ContractionHierarchy(*[np.load(path / f"{name}.npy", mmap_mode="r") for name in CH_ARRAYS
+                                  if name != "core_rank" or (path / f"{name}.npy").exists()])
+
+
+def _default_hierarchy():
+    from src.graph_builder.registry import registry
+    if not Path(CH_DIR).is_dir():
+        raise ValueError("ch not built: run src.pathfinding.contraction first")
+    # the registry reloads the hierarchy when the files on disk change
+    return registry.get(CH_DIR, load_contraction_hierarchy)
+
+
+def ch_search(start_id, goal_id, nodes, adj, hierarchy=None):
+    """
+    find_path-compatible entry using the persisted hierarchy of the coarse graph.
+    The hierarchy is static: it ignores `adj`, so it must not be used on modified graphs.
+    Raises ValueError when no hierarchy is built or it was built for another graph.
+    """
+    if hierarchy is None:
+        hierarchy = _default_hierarchy()
+    if hierarchy.num_nodes != len(adj):
+        raise ValueError(f"ch is stale: built for {hierarchy.num_nodes} nodes, graph has {len(adj)}")
+    return hierarchy.query(start_id, goal_id, nodes)
+
+
+def main_build_ch():
+    """Preprocess the coarse graph written by build_graph and store the hierarchy in CH_DIR."""
+    from src.graph_builder.ocean_grid import load_graph_csr
+    adj = load_graph_csr()
+    ch = build_contraction_hierarchy(adj, num_nodes=adj.num_nodes, verbose=True)
+    save_contraction_hierarchy(ch, CH_DIR)
+
+
+if __name__ == "__main__":
+    main_build_ch()
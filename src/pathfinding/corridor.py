@@ -0,0 +1,75 @@
+from math import inf
+
+from src.pathfinding.astar import astar
+from src.utils.utils import haversine_km
+
+"""
+Corridor-bounded A* around the great-circle line.
+
+Every edge is at least as long as the great-circle distance between its
+end points, so a route of cost C only visits nodes n with
+
+    d(start, n) + d(n, goal) <= C          (d = great-circle distance)
+
+i.e. it stays inside an ellipse with the two end points as foci. A* is run
+with a node filter that keeps only nodes inside the ellipse for a bound B
+a little above the direct distance. If it finds a route of cost C <= B, every
+cheaper route lies inside the same ellipse, so the result is optimal. If the
+route costs more than B (it was squeezed by the corridor) the search is
+repeated with B = C, which is then exact; if nothing is found the bound is
+widened geometrically. Once a round rejects no node at all the corridor
+covers the whole reachable graph and the answer is final.
+"""
+
+# float slack so nodes exactly on the ellipse are not lost to rounding
+_EPS = 1e-9
+
+
+def corridor_astar(start_id, goal_id, nodes, adj, slack=0.1, margin_km=50.0,
+                   widen=2.0, max_rounds=8, heuristic=None, stats=None):
+    """
+    A* restricted to an adaptive ellipse around the great circle.
+    Returns (path, total_cost_km), optimal like plain A*.
+
+    slack / margin_km: the first bound is max(direct * (1 + slack), direct + margin_km)
+    widen: factor applied to the bound after a round that found no route
+    max_rounds: after this many rounds the corridor is dropped
+    stats: optional dict, receives rounds, bound_km and touched (nodes tested)
+    """
+    s, g = nodes[start_id], nodes[goal_id]
+    direct = haversine_km(s["lat"], s["lon"], g["lat"], g["lon"])
+    bound = max(direct * (1.0 + slack), direct + margin_km)
+
+    detour = {}   # node -> d(start, n) + d(n, goal), shared by every round
+
+    def ellipse(node_id):
+        d = detour.get(node_id)
+        if d is None:
+            n = nodes[node_id]
+            d = detour[node_id] = (haversine_km(s["lat"], s["lon"], n["lat"], n["lon"])
+                                   + haversine_km(n["lat"], n["lon"], g["lat"], g["lon"]))
+        return d
+
+    rounds, path, cost = 0, None, inf
+    while True:
+        rounds += 1
+        limit = bound * (1.0 + _EPS)
+        rejected = []
+
+        def inside(node_id):
+            if ellipse(node_id) <= limit:
+                return True
+            rejected.append(node_id)
+            return False
+
+        node_filter = inside if rounds <= max_rounds else None
+        path, cost = astar(start_id, goal_id, nodes, adj,
+                           heuristic=heuristic, node_filter=node_filter)
+        if node_filter is None or not rejected or (path is not None and cost <= limit):
+            break
+        # squeezed by the corridor: B = cost is exact; nothing found: widen
+        bound = cost if path is not None else bound * widen
+
+    if stats is not None:
+        stats.update(rounds=rounds, bound_km=bound, touched=len(detour))
+    return path, cost
@@ -0,0 +1,159 @@
+import heapq
+from math import inf
+
+from src.utils.utils import haversine_km
+
+"""
+D* Lite incremental planner.
+
+The planner searches backwards from the goal, so g(s) is the cost from s to
+the goal and stays valid while the ship (the search start) moves. Blocking
+or unblocking nodes only re-opens the vertices next to them; the next plan()
+repairs the affected part of the shortest-path tree instead of searching
+from scratch. The graph is treated as undirected (adj is symmetric), so
+predecessors and successors are both adj.get(node).
+
+Reference: Koenig & Likhachev, "D* Lite", AAAI 2002.
+"""
+
+
+class DStarLite:
+    """
+    Keeps search state for one voyage.
+
+      planner = DStarLite(start_id, goal_id, nodes, adj)
+      path, dist = planner.plan()
+      planner.move_to(current_id)
+      planner.block(node_ids)      # or unblock(node_ids)
+      path, dist = planner.plan()  # repairs only what changed
+    """
+
+    def __init__(self, start_id, goal_id, nodes, adj):
+        self.nodes = nodes
+        self.adj = adj
+        self.start = start_id
+        self.goal = goal_id
+        self.blocked = set()
+        self.km = 0.0
+        self.g = {}
+        self.rhs = {goal_id: 0.0}
+        self._queue = []
+        self._keys = {}
+        self.expanded = 0        # total vertex expansions over the voyage
+        self.last_expanded = 0   # expansions of the most recent plan()
+        self._push(goal_id, self._key(goal_id))
+
+    # --- helpers -------------------------------------------------------
+
+    def _h(self, a, b):
+        na, nb = self.nodes[a], self.nodes[b]
+        return haversine_km(na["lat"], na["lon"], nb["lat"], nb["lon"])
+
+    def _key(self, s):
+        m = min(self.g.get(s, inf), self.rhs.get(s, inf))
+        return (m + self._h(self.start, s) + self.km, m)
+
+    def _push(self, s, key):
+        self._keys[s] = key
+        heapq.heappush(self._queue, (key, s))
+
+    def _top(self):
+        # drop stale heap entries (removed or re-keyed vertices)
+        while self._queue:
+            key, s = self._queue[0]
+            if self._keys.get(s) == key:
+                return key, s
+            heapq.heappop(self._queue)
+        return (inf, inf), None
+
+    def _neighbors(self, s):
+        if s in self.blocked:
+            return []
+        return [(n, d) for n, d in self.adj.get(s, []) if n not in self.blocked]
+
+    def _update_vertex(self, s):
+        if s != self.goal:
+            self.rhs[s] = min((d + self.g.get(n, inf) for n, d in self._neighbors(s)), default=inf)
+        self._keys.pop(s, None)
+        if self.g.get(s, inf) != self.rhs.get(s, inf):
+            self._push(s, self._key(s))
+
+    def _compute_shortest_path(self):
+        expanded = 0
+        while True:
+            k_old, u = self._top()
+            start_g, start_rhs = self.g.get(self.start, inf), self.rhs.get(self.start, inf)
+            if u is None or (k_old >= self._key(self.start) and start_rhs == start_g):
+                break
+            k_new = self._key(u)
+            if k_old < k_new:
+                self._push(u, k_new)
+                continue
+            heapq.heappop(self._queue)
+            del self._keys[u]
+            expanded += 1
+            if self.g.get(u, inf) > self.rhs.get(u, inf):
+                self.g[u] = self.rhs[u]
+                for n, _ in self._neighbors(u):
+                    self._update_vertex(n)
+            else:
+                self.g[u] = inf
+                self._update_vertex(u)
+                for n, _ in self.adj.get(u, []):
+                    self._update_vertex(n)
+        self.last_expanded = expanded
+        self.expanded += expanded
+
+    # --- public API ----------------------------------------------------
+
+    def plan(self):
+        """Repair the search tree and return (path, cost_km) from the current start."""
+        self._compute_shortest_path()
+        cost = self.g.get(self.start, inf)
+        if cost == inf or self.start in self.blocked:
+            return None, inf
+
+        path = [self.start]
+        seen = {self.start}
+        s = self.start
+        while s != self.goal:
+            s = min(self._neighbors(s), key=lambda nd: nd[1] + self.g.get(nd[0], inf))[0]
+            if s in seen:  # inconsistent tree; should not happen
+                return None, inf
+            seen.add(s)
+            path.append(s)
+        return path, cost
+
+    def move_to(self, node_id):
+        """The ship advanced to node_id; keeps the queue keys valid (km offset)."""
+        if node_id != self.start:
+            self.km += self._h(self.start, node_id)
+            self.start = node_id
+
+    def block(self, node_ids):
+        """Mark nodes impassable. Returns True if anything changed."""
+        return self._set_blocked(set(node_ids) - self.blocked, blocked=True)
+
+    def unblock(self, node_ids):
+        """Make previously blocked nodes passable again."""
+        return self._set_blocked(set(node_ids) & self.blocked, blocked=False)
+
+    def _set_blocked(self, changed, blocked):
+        if not changed:
+            return False
+        if blocked:
+            self.blocked |= changed
+        else:
+            self.blocked -= changed
+        touched = set(changed)
+        for s in changed:
+            touched.update(n for n, _ in self.adj.get(s, []))
+        for s in touched:
+            if blocked and s in changed and s != self.goal:
+                self.rhs[s] = inf
+                self._keys.pop(s, None)
+                if self.g.get(s, inf) != inf:
+                    self._push(s, self._key(s))
+            else:
+                self._update_vertex(s)
+        return True
@@ -0,0 +1,283 @@
+import heapq
+import weakref
+from math import inf
+
+import numpy as np
+
+from src.graph_builder.config import NEIGHBOR_OFFSETS
+from src.graph_builder.lattice_graph import LatticeGraph
+from src.pathfinding.overlay import BlockedOverlay
+from src.utils.utils import haversine_km
+
+"""
+Jump Point Search on the implicit 8-connected LatticeGraph.
+
+Classic JPS prunes with the uniform-grid rules ("diagonal first, then
+straight"), which are only exact when a move costs the same on every row.
+On the ocean lattice an east-west step shrinks with cos(latitude), so the
+cheapest of two reordered paths depends on the row and the classic rules
+can return a longer route.
+
+This variant derives the pruning rules from the real row weights instead.
+A search state is (node, incoming direction). A move p -> n -> n' is pruned
+only if some path of at most two edges from p to n' that avoids n, stays
+inside the 3x3 block around n and uses only water is STRICTLY cheaper.
+Splicing that detour into a route through p -> n -> n' would make it
+shorter, so an optimal route never uses a pruned move, and searching only
+the unpruned moves still finds the optimal cost.
+
+The surviving moves for (row, incoming direction, 3x3 water pattern) are
+cached. When a state's only surviving move is straight ahead, the search
+steps on without touching the heap (a jump). Jump end points are memoised
+per lattice and reused across queries, in the spirit of JPS+ (up to
+_MAX_JUMPS entries; a full memo is cleared and refilled).
+
+Blocked nodes of a BlockedOverlay are applied per query without copying
+the lattice: the neighbour masks of the cells around them are overridden,
+and jumps are walked afresh (not memoised) while any node is blocked.
+
+Far from the poles the natural successor sets are larger than on a uniform
+grid (e.g. heading east north of the equator also keeps south-east), so
+fewer states are skipped than with classic JPS.
+"""
+
+_OFFSETS = [tuple(d) for d in NEIGHBOR_OFFSETS]
+_ALL = -1  # incoming direction of the start state: every move allowed
+# row weights come from the vectorised haversine; keep h a hair under them
+_H_SHRINK = 1.0 - 1e-9
+# memoised jumps per searcher; the memo is dropped and refilled beyond this
+_MAX_JUMPS = 1 << 20
+
+
+def neighbour_masks(water):
+    """uint8 raster: bit d set where the NEIGHBOR_OFFSETS[d] neighbour is water."""
+    water = np.asarray(water, dtype=bool)
+    padded = np.pad(water, 1)
+    n_lat, n_lon = water.shape
+    masks = np.zeros(water.shape, dtype=np.uint8)
+    for d, (di, dj) in enumerate(_OFFSETS):
+        masks |= padded[1 + di:1 + di + n_lat, 1 + dj:1 + dj + n_lon].astype(np.uint8) << d
+    return masks
+
+
+class JumpPointSearch:
+    """Cost-aware JPS bound to one LatticeGraph. Reuse it across queries."""
+
+    def __init__(self, lattice):
+        self.lattice = lattice
+        self.n_lat, self.n_lon = lattice.n_lat, lattice.n_lon
+        self._w = lattice.row_weights.tolist()
+        # one byte per cell; a memoryview reads Python ints without a list copy
+        self._masks = memoryview(neighbour_masks(lattice.water_mask()).ravel())
+        self._transitions = {}
+        self._jumps = {}
+        self.last_expanded = 0
+
+    # --- local pruning -------------------------------------------------
+
+    def _blocked_masks(self, blocked):
+        """
+        {cell: neighbour mask} for the cells next to blocked nodes, with the
+        bits towards blocked cells cleared; blocked cells get an empty mask.
+        """
+        n_lat, n_lon = self.n_lat, self.n_lon
+        out = {}
+        for b in blocked:
+            bi, bj = divmod(b, n_lon)
+            if not (0 <= bi < n_lat and 0 <= bj < n_lon):
+                continue
+            for d, (di, dj) in enumerate(_OFFSETS):
+                ci, cj = bi - di, bj - dj
+                if 0 <= ci < n_lat and 0 <= cj < n_lon:
+                    c = ci * n_lon + cj
+                    out[c] = out.get(c, self._masks[c]) & ~(1 << d)
+        for b in blocked:
+            if 0 <= b < n_lat * n_lon:
+                out[b] = 0
+        return out
+
+    def _moves(self, i, j, k, overrides=None):
+        """Directions worth taking from cell (i, j) entered via direction k."""
+        c = i * self.n_lon + j
+        mask = self._masks[c] if not overrides else overrides.get(c, self._masks[c])
+        key = (i, k, mask)
+        moves = self._transitions.get(key)
+        if moves is None:
+            moves = self._transitions[key] = self._unpruned(i, k, mask)
+        return moves
+
+    def _unpruned(self, i, k, mask):
+        out = [d for d in range(8) if mask >> d & 1]
+        if k == _ALL:
+            return tuple(out)
+
+        w = self._w
+        # cells relative to n = (0, 0); p is where we came from (row i - di)
+        pi, pj = -_OFFSETS[k][0], -_OFFSETS[k][1]
+        water = {(0, 0)} | {_OFFSETS[d] for d in out}
+        keep = []
+        for d in out:
+            mi, mj = _OFFSETS[d]
+            if (mi, mj) == (pi, pj):
+                continue
+            via_n = w[i + pi][k] + w[i][d]
+            best = inf
+            for (xi, xj) in water:
+                if (xi, xj) == (0, 0):
+                    continue
+                step = (xi - pi, xj - pj)
+                if (xi, xj) == (mi, mj):
+                    if step in _OFFSETS:
+                        best = min(best, w[i + pi][_OFFSETS.index(step)])
+                    continue
+                hop = (mi - xi, mj - xj)
+                if step in _OFFSETS and hop in _OFFSETS:
+                    best = min(best, w[i + pi][_OFFSETS.index(step)] + w[i + xi][_OFFSETS.index(hop)])
+            if best >= via_n:
+                keep.append(d)
+        return tuple(keep)
+
+    # --- jumping -------------------------------------------------------
+
+    def _jump(self, i, j, d, overrides=None):
+        """
+        Walk from (i, j) in direction d while the only unpruned move is straight on.
+        Returns (end_i, end_j, steps, cost, dead_end). The memo only holds
+        jumps over the unblocked lattice; with overrides the walk is redone.
+        """
+        key = (i * self.n_lon + j, d)
+        if not overrides:
+            hit = self._jumps.get(key)
+            if hit is not None:
+                return hit
+
+        di, dj = _OFFSETS[d]
+        w = self._w
+        steps, cost = 0, 0.0
+        while True:
+            cost += w[i][d]
+            i, j = i + di, j + dj
+            steps += 1
+            moves = self._moves(i, j, d, overrides)
+            if moves != (d,):
+                break
+        hit = (i, j, steps, cost, not moves)
+        if not overrides:
+            if len(self._jumps) >= _MAX_JUMPS:
+                self._jumps.clear()
+            self._jumps[key] = hit
+        return hit
+
+    def _ray_cost(self, i, d, steps):
+        di = _OFFSETS[d][0]
+        return sum(self._w[i + t * di][d] for t in range(steps))
+
+    # --- search --------------------------------------------------------
+
+    def search(self, start_id, goal_id, blocked=()):
+        """
+        Optimal path between two lattice node ids. Returns (path, total_cost_km).
+        `blocked` node ids are treated as land for this query only.
+        """
+        g_lat = self.lattice
+        if not g_lat.is_water(start_id) or not g_lat.is_water(goal_id):
+            return None, inf
+        if start_id in blocked or goal_id in blocked:
+            return None, inf
+        overrides = self._blocked_masks(blocked) if blocked else None
+        if start_id == goal_id:
+            return [start_id], 0.0
+
+        n_lon = self.n_lon
+        gi, gj = divmod(goal_id, n_lon)
+        glat, glon = g_lat.lat_min + gi * g_lat.res, g_lat.lon_min + gj * g_lat.res
+
+        def h(i, j):
+            return haversine_km(g_lat.lat_min + i * g_lat.res, g_lat.lon_min + j * g_lat.res,
+                                glat, glon) * _H_SHRINK
+
+        si, sj = divmod(start_id, n_lon)
+        start = (start_id, _ALL)
+        g_score = {start: 0.0}
+        came_from = {}
+        expanded = {}
+        open_set = [(h(si, sj), 0.0, start_id, _ALL)]
+        self.last_expanded = 0
+
+        while open_set:
+            _, g, node, k = heapq.heappop(open_set)
+            if g > g_score[(node, k)]:
+                continue
+            if node == goal_id:
+                self.last_expanded = len(expanded)
+                return self._unwind(came_from, (node, k)), g
+
+            i, j = divmod(node, n_lon)
+            # a node only needs each outgoing direction once: later pops have larger g
+            done = expanded.get(node, 0)
+            moves = [d for d in self._moves(i, j, k, overrides) if not done >> d & 1]
+            if not moves:
+                continue
+            for d in moves:
+                done |= 1 << d
+            expanded[node] = done
+
+            for d in moves:
+                ei, ej, steps, cost, dead_end = self._jump(i, j, d, overrides)
+                # stop early if the goal lies on the ray
+                di, dj = _OFFSETS[d]
+                t = (gi - i) * di if di else (gj - j) * dj
+                if 0 < t <= steps and (i + t * di, j + t * dj) == (gi, gj):
+                    ei, ej = gi, gj
+                    cost = self._ray_cost(i, d, t)
+                elif dead_end:
+                    continue
+                nxt = (ei * n_lon + ej, d)
+                ng = g + cost
+                if ng < g_score.get(nxt, inf):
+                    g_score[nxt] = ng
+                    came_from[nxt] = (node, k)
+                    heapq.heappush(open_set, (ng + h(ei, ej), ng, nxt[0], d))
+
+        self.last_expanded = len(expanded)
+        return None, inf
+
+    def _unwind(self, came_from, state):
+        """Expand the chain of jump points back into every lattice node."""
+        n_lon = self.n_lon
+        jumps = [state[0]]
+        while state in came_from:
+            state = came_from[state]
+            jumps.append(state[0])
+        jumps.reverse()
+
+        path = [jumps[0]]
+        for a, b in zip(jumps, jumps[1:]):
+            ai, aj = divmod(a, n_lon)
+            bi, bj = divmod(b, n_lon)
+            steps = max(abs(bi - ai), abs(bj - aj))
+            di, dj = (bi - ai) // steps, (bj - aj) // steps
+            path.extend((ai + t * di) * n_lon + aj + t * dj for t in range(1, steps + 1))
+        return path
+
+
+_searchers = weakref.WeakKeyDictionary()
+
+
+def jps(start_id, goal_id, nodes, adj):
+    """
+    find_path-compatible entry. `adj` must be a LatticeGraph, optionally under
+    BlockedOverlays; one searcher and its transition/jump caches are kept per
+    lattice, and blocked nodes are applied per query.
+    """
+    blocked = ()
+    if isinstance(adj, BlockedOverlay):
+        if any(layer.blocked_edges for layer in adj.layers):
+            raise ValueError("jps cannot skip single blocked edges; use astar")
+        blocked, adj = adj.all_blocked(), adj.graph
+    if not isinstance(adj, LatticeGraph):
+        raise ValueError("jps needs a LatticeGraph (see build_graph.generate_coarse_lattice)")
+    searcher = _searchers.get(adj)
+    if searcher is None:
+        searcher = _searchers[adj] = JumpPointSearch(adj)
+    return searcher.search(start_id, goal_id, blocked)
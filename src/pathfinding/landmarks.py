@@ -0,0 +1,155 @@
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+
+from src.graph_builder.config import LANDMARK_DIR
+from src.graph_builder.csr_graph import CSRGraph
+from src.pathfinding.astar import astar
+from src.utils.utils import haversine_km
+
+"""
+ALT (A*, Landmarks, Triangle inequality) heuristic.
+
+For a landmark L and an undirected graph, d(v, t) >= |d(L, t) - d(L, v)|.
+The max over a handful of landmarks placed on the edges of the ocean is a
+much tighter lower bound than the great-circle distance when the route has
+to go around land. Blocking nodes later only makes graph distances longer,
+so tables built on the full graph stay admissible for rerouting.
+
+On disk (LANDMARK_DIR, memory-mapped on load):
+  landmarks.npy   int32   (K,)            landmark node ids
+  distances.npy   float32 (n_nodes, K)    one-to-all distances, inf if unreachable
+"""
+
+# rounding a distance x to float32 moves it by at most eps/2 * x (absolute, so it
+# matters most for a small difference of two large distances); the bound
+# subtracts that error for both table entries so it never exceeds the true distance
+_HALF_EPS32 = float(np.finfo(np.float32).eps) / 2.0
+
+
+def _as_csr(adj, num_nodes=None):
+    if not isinstance(adj, CSRGraph):
+        adj = CSRGraph.from_dict(adj, num_nodes)
+    n = adj.num_nodes
+    return csr_matrix((np.asarray(adj.weights, dtype=np.float64),
+                       np.asarray(adj.indices), np.asarray(adj.indptr)), shape=(n, n))
+
+
+def select_landmarks(adj, k=16, seed_node=None, num_nodes=None):
+    """
+    Farthest-point landmark selection. Starting from the node farthest from
+    seed_node, each new landmark maximises its graph distance to the ones
+    already chosen. Returns (landmark_ids, distances[n_nodes, K]).
+    """
+    matrix = _as_csr(adj, num_nodes)
+    n = matrix.shape[0]
+    if seed_node is None:
+        seed_node = int(np.argmax(np.diff(matrix.indptr) > 0))
+
+    seed_dist = csgraph_dijkstra(matrix, directed=False, indices=seed_node)
+    reachable = np.isfinite(seed_dist)
+    landmarks = [int(np.argmax(np.where(reachable, seed_dist, -1)))]
+    columns = []
+    nearest = np.full(n, np.inf)
+    while True:
+        d = csgraph_dijkstra(matrix, directed=False, indices=landmarks[-1])
+        columns.append(d)
+        nearest = np.minimum(nearest, d)
+        if len(landmarks) == k:
+            break
+        candidate = int(np.argmax(np.where(reachable, nearest, -1)))
+        if nearest[candidate] == 0:
+            break  # fewer reachable nodes than requested landmarks
+        landmarks.append(candidate)
+
+    return np.array(landmarks, dtype=np.int32), np.stack(columns, axis=1).astype(np.float32)
+
+
+class LandmarkTable:
+    """Landmark distance table with the ALT lower bound."""
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks
+        self.distances = distances
+        self._half_eps = 0.0 if distances.dtype == np.float64 else _HALF_EPS32
+
+    def lower_bound(self, node_id, goal_id):
+        """max_L |d(L, goal) - d(L, node)|; inf when the two are disconnected."""
+        return _alt_bound(np.asarray(self.distances[goal_id], dtype=np.float64), self.distances[node_id],
+                          self._half_eps)
+
+    def heuristic(self, goal_id, nodes=None):
+        """
+        h(node_id) for astar: the ALT bound, combined with the great-circle
+        distance when node coordinates are given.
+        """
+        goal_row = np.asarray(self.distances[goal_id], dtype=np.float64)
+        rows, half_eps = self.distances, self._half_eps
+        if nodes is None:
+            return lambda node_id: _alt_bound(goal_row, rows[node_id], half_eps)
+
+        glat, glon = nodes[goal_id]["lat"], nodes[goal_id]["lon"]
+
+        def h(node_id):
+            node = nodes[node_id]
+            return max(_alt_bound(goal_row, rows[node_id], half_eps),
+                       haversine_km(node["lat"], node["lon"], glat, glon))
+
+        return h
+
+
+def _alt_bound(goal_row, row, half_eps=_HALF_EPS32):
+    # a landmark reached from only one side means no path (inf); from neither
+    # side (nan) it says nothing, which fmax skips
+    row = np.asarray(row, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        diff = np.abs(goal_row - row)
+        slack = half_eps * (goal_row + row)
+        bound = np.fmax.reduce(np.where(np.isinf(diff), diff, diff - slack))
+    return 0.0 if np.isnan(bound) else max(float(bound), 0.0)
+
+
+def save_landmarks(table, path=LANDMARK_DIR):
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / "landmarks.npy", table.landmarks)
+    np.save(path / "distances.npy", table.distances)
+    print(f"Saved {len(table.landmarks)} landmarks for {len(table.distances)} nodes to {path}")
+
+
+def load_landmarks(path=LANDMARK_DIR, mmap=True):
+    path = Path(path)
+    if not path.is_dir():
+        raise RuntimeError(f"No landmark tables at {path}. Run src.pathfinding.landmarks first.")
+    mode = "r" if mmap else None
+    return LandmarkTable(np.load(path / "landmarks.npy", mmap_mode=mode),
+                         np.load(path / "distances.npy", mmap_mode=mode))
+
+
+def _default_table():
+    from src.graph_builder.registry import registry
+    if not Path(LANDMARK_DIR).is_dir():
+        raise ValueError("alt not built: run src.pathfinding.landmarks first")
+    # the registry reloads the tables when the files on disk change
+    return registry.get(LANDMARK_DIR, load_landmarks)
+
+
+def alt_search(start_id, goal_id, nodes, adj, table=None):
+    """A* with the ALT heuristic. Valid on graphs with blocked nodes as well."""
+    if table is None:
+        table = _default_table()
+    return astar(start_id, goal_id, nodes, adj, heuristic=table.heuristic(goal_id, nodes))
+
+
+def main_build_landmarks(k=16):
+    """Select landmarks on the coarse CSR graph and store their distance tables."""
+    from src.graph_builder.ocean_grid import load_graph_csr
+    adj = load_graph_csr()
+    landmarks, distances = select_landmarks(adj, k=k)
+    save_landmarks(LandmarkTable(landmarks, distances), LANDMARK_DIR)
+
+
+if __name__ == "__main__":
+    main_build_landmarks()
@@ -0,0 +1,118 @@
+"""
+Blocked-node overlays for rerouting.
+
+A BlockedOverlay is a read-only view of any adjacency mapping (dict,
+CSRGraph, LatticeGraph, ...) with a set of nodes taken out. Nothing is
+copied: blocked nodes are filtered when the pathfinder expands a node, so
+a reroute costs O(degree) per expansion instead of an O(E) graph rebuild.
+
+Overlays stack, e.g. static no-go zones under per-voyage obstacles:
+    zones = BlockedOverlay(adj, restricted_ids)
+    voyage = BlockedOverlay(zones, obstacle_ids)
+Single edges can be taken out as well (block_edges), e.g. when only the
+crossing between two nodes is flagged and both nodes must stay usable.
+Every overlay carries a version that bumps on block()/unblock(); `stamp`
+collects the versions of the whole stack so caches can tell when a view
+has changed.
+"""
+
+
+class BlockedOverlay:
+    """Adjacency view of `base` without the nodes in `blocked`."""
+
+    def __init__(self, base, blocked=()):
+        self.base = base
+        self.blocked = set(blocked)
+        self.blocked_edges = set()   # frozenset({a, b}) per undirected edge
+        self.version = 0
+
+    # --- blocking ------------------------------------------------------
+
+    def block(self, node_ids):
+        """Block more nodes. Returns True if the view changed."""
+        new = set(node_ids) - self.blocked
+        if new:
+            self.blocked |= new
+            self.version += 1
+        return bool(new)
+
+    def unblock(self, node_ids):
+        """Unblock nodes blocked by this layer (lower layers are untouched)."""
+        gone = set(node_ids) & self.blocked
+        if gone:
+            self.blocked -= gone
+            self.version += 1
+        return bool(gone)
+
+    def block_edges(self, edges):
+        """Block undirected (a, b) edges. Returns True if the view changed."""
+        new = {frozenset(e) for e in edges} - self.blocked_edges
+        if new:
+            self.blocked_edges |= new
+            self.version += 1
+        return bool(new)
+
+    def is_blocked(self, node_id):
+        """True if this layer or any layer below blocks node_id."""
+        if node_id in self.blocked:
+            return True
+        return isinstance(self.base, BlockedOverlay) and self.base.is_blocked(node_id)
+
+    @property
+    def layers(self):
+        """Overlays from this one down to the graph, top first."""
+        layer, out = self, []
+        while isinstance(layer, BlockedOverlay):
+            out.append(layer)
+            layer = layer.base
+        return out
+
+    @property
+    def graph(self):
+        """The underlying (non-overlay) adjacency."""
+        return self.layers[-1].base
+
+    @property
+    def stamp(self):
+        """Versions of the whole stack; changes whenever any layer changes."""
+        return tuple(layer.version for layer in self.layers)
+
+    def all_blocked(self):
+        """Union of the blocked sets of every layer."""
+        return set().union(*(layer.blocked for layer in self.layers))
+
+    # --- dict-compatible interface -------------------------------------
+
+    def get(self, node_id, default=None):
+        if node_id in self.blocked:
+            return default
+        neighbors = self.base.get(node_id)
+        if neighbors is None:
+            return default
+        blocked = self.blocked
+        if self.blocked_edges:
+            edges = self.blocked_edges
+            return [(n, d) for n, d in neighbors
+                    if n not in blocked and frozenset((node_id, n)) not in edges]
+        return [(n, d) for n, d in neighbors if n not in blocked]
+
+    def __getitem__(self, node_id):
+        neighbors = self.get(node_id)
+        if neighbors is None:
+            raise KeyError(node_id)
+        return neighbors
+
+    def __contains__(self, node_id):
+        return node_id not in self.blocked and node_id in self.base
+
+    def __len__(self):
+        return len(self.base) - sum(1 for n in self.blocked if n in self.base)
+
+    def __iter__(self):
+        return (n for n in self.base if n not in self.blocked)
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return ((n, self[n]) for n in self)
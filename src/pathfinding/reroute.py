@@ -1,4 +1,5 @@
-from src.pathfinding.astar import astar
+from src.pathfinding.search import find_path, DEFAULT_ALGORITHM, STATIC_ALGORITHMS, LATTICE_ALGORITHMS
+from src.pathfinding.overlay import BlockedOverlay
 from src.utils.utils import haversine_km
 
 
@@ -38,58 +39,143 @@ def is_path_blocked(path, obstacle_checker, threshold_km=1.0):
     return False
 
 
-def reroute(start_id, goal_id, nodes, adj, obstacle_checker, threshold_km=1.0):
+class _CheckerMemo:
     """
-    Computes A* path. If path is blocked by obstacles, automatically reroutes.
-    Returns:
-      (path_ids, distance_km, status_message)
-    """
-    # Initial A* route
-    path, dist = astar(start_id, goal_id, nodes, adj)
-    if path is None:
-        return None, float("inf"), "No route found"
-
-    # Convert node_ids → coordinate dicts
-    path_coords = [
-        {"lat": nodes[n]["lat"], "lon": nodes[n]["lon"], "id": n}
-        for n in path
-    ]
-
-    # If no obstacle → return normal result
-    if not is_path_blocked(path_coords, obstacle_checker, threshold_km):
-        return path, dist, "OK"
+    Per-reroute memo around an obstacle_checker.
 
-    # Else: remove blocked nodes from adjacency
-    modified_adj = _remove_obstacle_nodes(adj, path_coords, 
-                                          obstacle_checker, threshold_km)
-
-    # Re-run A*
-    new_path, new_dist = astar(start_id, goal_id, nodes, modified_adj)
-
-    if new_path is None:
-        return None, float("inf"), "Reroute failed"
-
-    return new_path, new_dist, "REROUTED"
+    Points are answered at most once per reroute. When the checker is a bound
+    method of an object with obstacle_checker_batch (ObstacleEngine), all
+    unseen points of a query go out in one batched call; plain callables are
+    asked point by point through _is_blocked_by_checker.
+    """
 
+    def __init__(self, obstacle_checker, threshold_km=1.0):
+        self.checker = obstacle_checker
+        self.threshold_km = threshold_km
+        owner = getattr(obstacle_checker, "__self__", None)
+        self.batch = getattr(owner, "obstacle_checker_batch", None)
+        self.cache = {}
+        self.calls = 0       # checker invocations (a batch counts once)
+        self.points = 0      # distinct points sent to the checker
+
+    def check(self, points):
+        """points: list of (lat, lon) -> list of bools."""
+        todo = list(dict.fromkeys(p for p in points if p not in self.cache))
+        if todo:
+            if self.batch is not None:
+                self.calls += 1
+                flags = self.batch([p[0] for p in todo], [p[1] for p in todo],
+                                   threshold_km=self.threshold_km)
+            else:
+                self.calls += len(todo)
+                flags = [_is_blocked_by_checker(lat, lon, self.checker, self.threshold_km)
+                         for lat, lon in todo]
+            self.cache.update(zip(todo, (bool(f) for f in flags)))
+            self.points += len(todo)
+        return [self.cache[p] for p in points]
+
+
+def _coord(nodes, n):
+    node = nodes[n]
+    return (node["lat"], node["lon"])
+
+
+def _offending_nodes(path, nodes, memo, protected=()):
+    """
+    Validate the whole path in one query: every node plus every edge midpoint.
+    Returns (nodes to block, edges to block). A flagged edge blames its far
+    endpoint, or the near one if the far one is protected; an edge between
+    two protected nodes (start and goal) is blocked itself.
+    """
+    points = [_coord(nodes, n) for n in path]
+    points += [((a[0] + b[0]) / 2.0, (a[1] + b[1]) / 2.0)
+               for a, b in zip(points, points[1:])]
+    flags = memo.check(points)
+    node_flags, edge_flags = flags[:len(path)], flags[len(path):]
+
+    bad = {n for n, f in zip(path, node_flags) if f}
+    bad_edges = set()
+    for k, f in enumerate(edge_flags):
+        if not f:
+            continue
+        a, b = path[k], path[k + 1]
+        if b not in protected:
+            bad.add(b)
+        elif a not in protected:
+            bad.add(a)
+        else:
+            bad_edges.add((a, b))
+    return bad, bad_edges
 
-def _remove_obstacle_nodes(adj, path_nodes, 
-                           obstacle_checker, threshold_km=1.0):
-    """Produce a modified adjacency dict with blocked nodes removed."""
-    blocked_ids = []
 
-    # Find nodes that intersect or fall within obstacle threshold
-    for p in path_nodes:
-        if _is_blocked_by_checker(p["lat"], p["lon"], 
-                                  obstacle_checker, threshold_km):
-            blocked_ids.append(p["id"])
+def _grow_region(seeds, nodes, adj, memo, protected, limit):
+    """
+    Breadth-first flood from the flagged nodes over neighbours that are also
+    flagged, one batched query per ring, so the next search steers around
+    the whole obstacle instead of probing it one node at a time.
+    """
+    region = set(seeds)
+    frontier = list(seeds)
+    while frontier and len(region) < limit:
+        ring = list(dict.fromkeys(
+            m for n in frontier for m, _ in adj.get(n, [])
+            if m not in region and m not in protected and m in nodes))
+        if not ring:
+            break
+        flags = memo.check([_coord(nodes, m) for m in ring])
+        frontier = [m for m, f in zip(ring, flags) if f][:limit - len(region)]
+        region.update(frontier)
+    return region
+
+
+def reroute(start_id, goal_id, nodes, adj, obstacle_checker, threshold_km=1.0,
+            algorithm=DEFAULT_ALGORITHM, max_iterations=10, max_region_nodes=256,
+            stats=None, tables=None):
+    """
+    Computes a path (A* by default, see search.ALGORITHMS) that the obstacle
+    checker accepts end to end.
 
-    # Build modified adjacency without those nodes
-    new_adj = {}
-    for node, neighbors in adj.items():
-        if node in blocked_ids:
-            continue
-        new_adj[node] = [
-            (n, d) for n, d in neighbors if n not in blocked_ids
-        ]
+    Each iteration validates the whole candidate path (nodes and edge
+    midpoints) in one memoised query, blocks the offending region on an
+    overlay and searches again, until the path is clean or max_iterations
+    searches have run.
 
-    return new_adj
+    Returns:
+      (path_ids, distance_km, status_message)
+    If `stats` is a dict it receives iterations, checker_calls,
+    checked_points and blocked. `tables` is passed on to find_path.
+    """
+    memo = _CheckerMemo(obstacle_checker, threshold_km)
+    view = BlockedOverlay(adj)
+    endpoints = {start_id, goal_id}
+    result = (None, float("inf"), "Reroute failed")
+    iterations = 0
+
+    while iterations < max_iterations:
+        iterations += 1
+        path, dist = find_path(start_id, goal_id, nodes, view, algorithm, tables)
+        if path is None:
+            result = (None, float("inf"),
+                      "No route found" if iterations == 1 else "Reroute failed")
+            break
+
+        bad, bad_edges = _offending_nodes(path, nodes, memo, endpoints)
+        if not bad and not bad_edges:
+            result = (path, dist, "OK" if iterations == 1 else "REROUTED")
+            break
+        if bad & endpoints:
+            # the ship cannot route around its own start or goal
+            break
+
+        if bad:
+            view.block(_grow_region(bad, nodes, view, memo, endpoints, max_region_nodes))
+        if bad_edges:
+            view.block_edges(bad_edges)
+        # preprocessed searches cannot see the blocked nodes, jps not single edges
+        if algorithm in STATIC_ALGORITHMS or (bad_edges and algorithm in LATTICE_ALGORITHMS):
+            algorithm = DEFAULT_ALGORITHM
+
+    if stats is not None:
+        stats.update(iterations=iterations, checker_calls=memo.calls,
+                     checked_points=memo.points, blocked=len(view.blocked))
+    return result
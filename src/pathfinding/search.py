@@ -0,0 +1,63 @@
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.bidirectional import bidirectional_astar, bidirectional_dijkstra
+from src.pathfinding.contraction import ch_search
+from src.pathfinding.landmarks import alt_search
+from src.pathfinding.jps import jps
+from src.pathfinding.corridor import corridor_astar
+
+"""
+Single entry point for picking a pathfinding algorithm per query.
+Every entry takes (start_id, goal_id, nodes, adj) and returns (path, total_cost_km).
+STATIC_ALGORITHMS answer from preprocessed data and ignore `adj`, so they are
+only valid on the unmodified coarse graph. LATTICE_ALGORITHMS need a
+LatticeGraph adjacency; the API serves the CSR graph, so it only offers
+API_ALGORITHMS. EXPERIMENTAL_ALGORITHMS stay callable through find_path but
+are not offered by the API until they are benchmarked on the coarse graph.
+"""
+
+ALGORITHMS = {
+    "astar": astar,
+    "dijkstra": lambda start_id, goal_id, nodes, adj: dijkstra(start_id, goal_id, adj),
+    "bidirectional_astar": bidirectional_astar,
+    "bidirectional_dijkstra": lambda start_id, goal_id, nodes, adj: bidirectional_dijkstra(start_id, goal_id, adj),
+    "alt": lambda start_id, goal_id, nodes, adj, table=None: alt_search(start_id, goal_id, nodes, adj, table),
+    "jps": jps,
+    "corridor": lambda start_id, goal_id, nodes, adj: corridor_astar(start_id, goal_id, nodes, adj),
+    "ch": ch_search,
+}
+
+STATIC_ALGORITHMS = {"ch"}
+
+LATTICE_ALGORITHMS = {"jps"}
+
+# algorithms that read a preprocessed table built for one graph version
+TABLE_ALGORITHMS = {"ch", "alt"}
+
+EXPERIMENTAL_ALGORITHMS = {"ch"}
+
+API_ALGORITHMS = sorted(set(ALGORITHMS) - LATTICE_ALGORITHMS - EXPERIMENTAL_ALGORITHMS)
+
+DEFAULT_ALGORITHM = "astar"
+
+
+def find_path(start_id, goal_id, nodes, adj, algorithm=DEFAULT_ALGORITHM, tables=None):
+    """
+    Run the named algorithm. Raises ValueError for an unknown name.
+
+    tables: {algorithm: preprocessed table} of the graph version being
+    searched (GraphSnapshot.tables). When given, TABLE_ALGORITHMS only use
+    these and raise ValueError if theirs is missing; None loads the tables
+    on disk.
+    """
+    try:
+        search = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm {algorithm!r}; choose one of {sorted(ALGORITHMS)}")
+    if tables is None or algorithm not in TABLE_ALGORITHMS:
+        return search(start_id, goal_id, nodes, adj)
+    table = tables.get(algorithm)
+    if table is None:
+        raise ValueError(f"{algorithm!r} is not available: its tables are not built "
+                         f"or older than the current graph")
+    return search(start_id, goal_id, nodes, adj, table)
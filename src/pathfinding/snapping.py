@@ -0,0 +1,177 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.graph_builder.lattice_graph import LatticeNodes
+from src.graph_builder.node_store import NodeStore
+from src.utils.utils import coord_to_grid_index, haversine_km_array
+
+"""
+Nearest-node snapping index, built once per node table.
+
+Graph nodes sit on a regular lat/lon grid, so the nearest node of a query
+is almost always the one in the rounded grid cell: coord_to_grid_index plus
+a dense cell -> node id table gives it in O(1). The 3x3 block around the
+cell is compared by haversine so that the cos(latitude) shrink of a degree
+of longitude cannot pick the wrong neighbour.
+
+When the rounded cell is land (or outside the grid) the nearest water node
+can be any distance away; those queries go to a KD-tree on unit vectors,
+where the chord distance orders points exactly like the great-circle one.
+Node tables without grid indices use the KD-tree for everything.
+
+The 3x3 block is exact while a 1.5-cell step in longitude is longer than
+the cell half-diagonal, i.e. below about 69 degrees latitude; queries
+further poleward use the KD-tree as well.
+"""
+
+_GRID_MAX_LAT = 69.0
+_BLOCK = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)]
+
+
+def _unit_vectors(lat, lon):
+    phi, lam = np.radians(lat), np.radians(lon)
+    return np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+
+
+def _node_columns(nodes):
+    """(ids, lat, lon, i, j) arrays for any supported node mapping; i/j may be None."""
+    if isinstance(nodes, NodeStore):
+        ids = np.arange(len(nodes))
+        return ids, np.asarray(nodes.lat, dtype=np.float64), np.asarray(nodes.lon, dtype=np.float64), \
+            None if nodes.i is None else np.asarray(nodes.i), None if nodes.j is None else np.asarray(nodes.j)
+    if isinstance(nodes, LatticeNodes):
+        g = nodes.lattice
+        ids = np.fromiter(iter(g), dtype=np.int64)
+        i, j = np.divmod(ids, g.n_lon)
+        return ids, g.lat_min + i * g.res, g.lon_min + j * g.res, i, j
+
+    items = list(nodes.items())
+    ids = np.array([n for n, _ in items])
+    lat = np.array([v["lat"] for _, v in items], dtype=np.float64)
+    lon = np.array([v["lon"] for _, v in items], dtype=np.float64)
+    if items and all(v.get("i") is not None for _, v in items):
+        return ids, lat, lon, np.array([v["i"] for _, v in items]), np.array([v["j"] for _, v in items])
+    return ids, lat, lon, None, None
+
+
+class SnapIndex:
+    """
+    index = SnapIndex.from_nodes(nodes)
+    node_id, dist_km = index.snap(lat, lon)
+    ids, dists = index.snap_many(lats, lons)
+    """
+
+    def __init__(self, ids, lat, lon, i=None, j=None):
+        self.ids = np.asarray(ids)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self._tree = None
+        self.cells = None   # (n_i, n_j) table of row numbers into ids, -1 for land
+        if i is not None and len(self.ids):
+            self._build_grid(np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64))
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        return cls(*_node_columns(nodes))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _build_grid(self, i, j):
+        span = max(int(i.max() - i.min()), int(j.max() - j.min()))
+        if span == 0:
+            return
+        if i.max() > i.min():
+            res = (self.lat[i.argmax()] - self.lat[i.argmin()]) / float(i.max() - i.min())
+        else:
+            res = (self.lon[j.argmax()] - self.lon[j.argmin()]) / float(j.max() - j.min())
+        lat_min = float(self.lat[0] - i[0] * res)
+        lon_min = float(self.lon[0] - j[0] * res)
+        # only trust the grid if every node really sits on it
+        if not (np.allclose(lat_min + i * res, self.lat, atol=1e-6)
+                and np.allclose(lon_min + j * res, self.lon, atol=1e-6)) or i.min() < 0 or j.min() < 0:
+            return
+        cells = np.full((int(i.max()) + 1, int(j.max()) + 1), -1, dtype=np.int64)
+        cells[i, j] = np.arange(len(i))
+        self.lat_min, self.lon_min, self.res = lat_min, lon_min, res
+        self.cells = cells
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            self._tree = cKDTree(_unit_vectors(self.lat, self.lon))
+        return self._tree
+
+    # --- single query --------------------------------------------------
+
+    def snap(self, lat, lon):
+        """Nearest node to (lat, lon) -> (node_id, distance_km); (None, inf) if empty."""
+        if not len(self.ids):
+            return None, float("inf")
+        rows = self._grid_candidates(lat, lon)
+        if rows is None:
+            _, rows = self.tree.query(_unit_vectors(lat, lon)[0])
+            rows = [rows]
+        dists = haversine_km_array(lat, lon, self.lat[rows], self.lon[rows])
+        k = int(np.argmin(dists))
+        return self._id(rows[k]), float(dists[k])
+
+    def _grid_candidates(self, lat, lon):
+        if self.cells is None:
+            return None
+        if abs(lat) >= _GRID_MAX_LAT:
+            return None
+        i, j = coord_to_grid_index(self.lat_min, self.lon_min, lat, lon, self.res)
+        n_i, n_j = self.cells.shape
+        if not (0 <= i < n_i and 0 <= j < n_j) or self.cells[i, j] < 0:
+            return None
+        rows = [self.cells[i + di, j + dj] for di, dj in _BLOCK
+                if 0 <= i + di < n_i and 0 <= j + dj < n_j]
+        return [r for r in rows if r >= 0]
+
+    def _id(self, row):
+        nid = self.ids[row]
+        return nid.item() if hasattr(nid, "item") else nid
+
+    # --- batch ---------------------------------------------------------
+
+    def snap_many(self, lats, lons):
+        """Vectorised snap: (node_ids array, distances_km array) for paired lats/lons."""
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        rows = np.full(len(lats), -1, dtype=np.int64)
+        dists = np.full(len(lats), np.inf)
+        if not len(self.ids) or not len(lats):
+            return self.ids[:0].copy(), dists
+
+        todo = np.ones(len(lats), dtype=bool)
+        if self.cells is not None:
+            n_i, n_j = self.cells.shape
+            ii = np.rint((lats - self.lat_min) / self.res).astype(np.int64)
+            jj = np.rint((lons - self.lon_min) / self.res).astype(np.int64)
+            inside = (ii >= 0) & (ii < n_i) & (jj >= 0) & (jj < n_j) & (np.abs(lats) < _GRID_MAX_LAT)
+            hit = np.zeros(len(lats), dtype=bool)
+            hit[inside] = self.cells[ii[inside], jj[inside]] >= 0
+            q = np.flatnonzero(hit)
+            if len(q):
+                # (len(q), 9) candidate rows from the 3x3 block, -1 where missing
+                bi = ii[q, None] + np.array([d[0] for d in _BLOCK])
+                bj = jj[q, None] + np.array([d[1] for d in _BLOCK])
+                ok = (bi >= 0) & (bi < n_i) & (bj >= 0) & (bj < n_j)
+                cand = np.full(bi.shape, -1, dtype=np.int64)
+                cand[ok] = self.cells[bi[ok], bj[ok]]
+                d = haversine_km_array(lats[q, None], lons[q, None],
+                                       self.lat[cand], self.lon[cand])
+                d[cand < 0] = np.inf
+                k = np.argmin(d, axis=1)
+                rows[q] = cand[np.arange(len(q)), k]
+                dists[q] = d[np.arange(len(q)), k]
+                todo[q] = False
+
+        rest = np.flatnonzero(todo)
+        if len(rest):
+            _, r = self.tree.query(_unit_vectors(lats[rest], lons[rest]))
+            rows[rest] = r
+            dists[rest] = haversine_km_array(lats[rest], lons[rest], self.lat[r], self.lon[r])
+        return self.ids[rows], dists
+
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 EARTH_RADIUS_KM=6371.0088
 
@@ -10,6 +11,14 @@ def haversine_km(lat1,lon1,lat2,lon2):
     a = math.sin(dphi/2.0)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(dlambda/2.0)**2
     return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
 
+def haversine_km_array(lat1,lon1,lat2,lon2):
+    '''vectorized haversine_km over NumPy arrays (broadcasts like any ufunc)'''
+    phi1,phi2=np.radians(lat1),np.radians(lat2)
+    dphi=np.radians(np.subtract(lat2,lat1))
+    dlambda=np.radians(np.subtract(lon2,lon1))
+    a=np.sin(dphi/2.0)**2+np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2.0)**2
+    return 2*EARTH_RADIUS_KM*np.arcsin(np.sqrt(a))
+
 def grid_index_to_coord(lat_min, lon_min, i, j, res): 
     '''Convert a grid cell index (i, j) into its real latitude & longitude.'''
     lat = lat_min + i * res
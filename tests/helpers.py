@@ -0,0 +1,28 @@
+"""Small graph helpers shared by the pathfinding tests."""
+
+
+class CountingAdj(dict):
+    """Adjacency dict that counts node expansions (get calls)."""
+    calls = 0
+
+    def get(self, key, default=None):
+        self.calls += 1
+        return super().get(key, default)
+
+
+def grid_graph(lat_max=10.5, lon_max=70.5, res=0.05):
+    """Open-water coarse grid from (10.0, 70.0): ({id: node}, adj)."""
+    from src.graph_builder.build_graph import generate_coarse_grid
+    nodes_dict, adj = generate_coarse_grid(10.0, lat_max, 70.0, lon_max, res, land_mask=None)
+    return {v["id"]: v for v in nodes_dict.values()}, adj
+
+
+def node_at(nodes, i, j):
+    """Id of the grid node in row i, column j."""
+    return next(n for n, v in nodes.items() if v["i"] == i and v["j"] == j)
+
+
+def without(adj, blocked):
+    """Copy of a dict adjacency with the blocked nodes removed."""
+    return {n: [(m, d) for m, d in nb if m not in blocked]
+            for n, nb in adj.items() if n not in blocked}
@@ -0,0 +1,74 @@
+import random
+
+from shapely.geometry import box
+from shapely.ops import unary_union
+
+from src.graph_builder.build_graph import generate_coarse_arrays, arrays_to_dicts
+from src.pathfinding.anytime import weighted_astar, ara_star
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.utils import find_nearest_node
+
+from helpers import CountingAdj
+
+
+def _graph():
+    land = unary_union([box(70.9, 10.4, 71.0, 11.6), box(70.3, 11.5, 71.0, 11.6),
+                        box(70.3, 10.4, 71.0, 10.5), box(71.8, 10.2, 71.9, 11.8)])
+    nodes_arr, edges = generate_coarse_arrays(10.0, 12.0, 70.0, 72.5, 0.05, land_mask=land)
+    nodes_dict, adj = arrays_to_dicts(nodes_arr, edges)
+    return {v["id"]: v for v in nodes_dict.values()}, adj
+
+
+def _cost(path, adj):
+    return sum(dict(adj[a])[b] for a, b in zip(path, path[1:]))
+
+
+def test_weighted_astar_is_bounded_and_cheaper():
+    nodes, adj = _graph()
+    start, _ = find_nearest_node(11.0, 70.8, nodes)
+    goal, _ = find_nearest_node(11.0, 72.3, nodes)
+    _, optimum = dijkstra(start, goal, adj)
+
+    plain = CountingAdj(adj)
+    astar(start, goal, nodes, plain)
+    counting = CountingAdj(adj)
+    path, cost = weighted_astar(start, goal, nodes, counting, epsilon=2.0)
+
+    assert path[0] == start and path[-1] == goal
+    assert _cost(path, adj) <= cost + 1e-6
+    assert optimum - 1e-6 <= cost <= 2.0 * optimum
+    assert counting.calls < plain.calls
+
+
+def test_ara_star_reaches_optimum_and_reports_bound():
+    nodes, adj = _graph()
+    rng = random.Random(3)
+    ids = list(nodes)
+    for _ in range(8):
+        start, goal = rng.choice(ids), rng.choice(ids)
+        _, optimum = dijkstra(start, goal, adj)
+        stats = {}
+        path, cost, bound = ara_star(start, goal, nodes, adj, epsilon=3.0, stats=stats)
+        if path is None:
+            assert optimum == float("inf")
+            continue
+        assert abs(cost - optimum) < 1e-6
+        assert bound == 1.0
+
+
+def test_ara_star_deadline_keeps_bounded_route():
+    nodes, adj = _graph()
+    start, _ = find_nearest_node(11.0, 70.8, nodes)
+    goal, _ = find_nearest_node(11.0, 72.3, nodes)
+    _, optimum = dijkstra(start, goal, adj)
+
+    # zero budget: only the first (eps-inflated) round runs
+    stats = {}
+    path, cost, bound = ara_star(start, goal, nodes, adj, epsilon=3.0,
+                                 time_budget=0.0, stats=stats)
+    assert path is not None and stats["rounds"] == 1
+    assert 1.0 <= bound <= 3.0
+    assert optimum - 1e-6 <= cost <= bound * optimum + 1e-6
+
+    print("\n✔ Anytime A* tests passed")
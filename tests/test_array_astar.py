@@ -0,0 +1,48 @@
+from math import inf
+
+from shapely.geometry import Polygon
+
+from src.graph_builder.build_graph import generate_coarse_arrays, arrays_to_dicts
+from src.graph_builder.csr_graph import CSRGraph
+from src.graph_builder.node_store import NodeStore
+from src.pathfinding.array_astar import ArrayAStar
+from src.pathfinding.astar import astar
+
+
+def test_array_astar_matches_astar():
+    land = Polygon([(70.1, 10.1), (70.5, 10.1), (70.3, 10.6)])
+    nodes_arr, edges = generate_coarse_arrays(10.0, 11.0, 70.0, 71.0, 0.05, land_mask=land)
+    nodes_dict, adj = arrays_to_dicts(nodes_arr, edges)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+
+    searcher = ArrayAStar.from_graph(
+        NodeStore(nodes_arr["lat"], nodes_arr["lon"]),
+        CSRGraph(edges["indptr"], edges["indices"], edges["weights"])
+    )
+
+    # several queries reuse the same buffers
+    last = len(nodes) - 1
+    for start, goal in [(0, last), (last, 0), (5, 300), (0, 0)]:
+        path, dist = searcher.search(start, goal)
+        _, expected = astar(start, goal, nodes, adj)
+        assert path[0] == start and path[-1] == goal
+        assert abs(dist - expected) < 1e-9
+    assert searcher.generation == 4
+
+    # dict input is converted, blocked nodes are skipped
+    from_dicts = ArrayAStar.from_graph(nodes, adj)
+    path, _ = from_dicts.search(0, last)
+    detour, _ = from_dicts.search(0, last, blocked={path[len(path) // 2]})
+    assert path[len(path) // 2] not in detour
+
+    print("\n✔ Array A* test passed")
+
+
+def test_array_astar_unreachable():
+    searcher = ArrayAStar.from_graph(
+        {0: {"lat": 0.0, "lon": 0.0}, 1: {"lat": 0.0, "lon": 0.05}, 2: {"lat": 1.0, "lon": 1.0}},
+        {0: [(1, 5.56)], 1: [(0, 5.56)]}
+    )
+
+    assert searcher.search(0, 2) == (None, inf)
+    assert searcher.search(0, 1)[0] == [0, 1]
@@ -0,0 +1,71 @@
+import random
+
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.bidirectional import bidirectional_astar, bidirectional_dijkstra
+from src.pathfinding.search import find_path
+
+from helpers import CountingAdj
+
+
+def _graph_with_rocks(seed):
+    nodes_dict, adj = generate_coarse_grid(10.0, 11.0, 70.0, 71.0, 0.05, land_mask=None)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+    rng = random.Random(seed)
+    rocks = set(rng.sample(sorted(nodes), 90))
+    adj = {n: [(m, d) for m, d in nb if m not in rocks]
+           for n, nb in adj.items() if n not in rocks}
+    water = [n for n in nodes if n not in rocks]
+    return nodes, adj, water, rng
+
+
+def test_bidirectional_costs_match():
+    for seed in range(5):
+        nodes, adj, water, rng = _graph_with_rocks(seed)
+        for _ in range(10):
+            start, goal = rng.choice(water), rng.choice(water)
+            _, expected = dijkstra(start, goal, adj)
+
+            path, dist = bidirectional_dijkstra(start, goal, adj)
+            assert abs(dist - expected) < 1e-9
+            if path is not None:
+                assert path[0] == start and path[-1] == goal
+
+            path, dist = bidirectional_astar(start, goal, nodes, adj)
+            assert abs(dist - expected) < 1e-9
+            if path is not None:
+                cost = sum(dict(adj[a])[b] for a, b in zip(path, path[1:]))
+                assert abs(cost - dist) < 1e-9
+
+    print("\n✔ Bidirectional search test passed")
+
+
+def test_bidirectional_expands_fewer_nodes():
+    nodes_dict, adj = generate_coarse_grid(0.0, 6.0, 70.0, 76.0, 0.05, land_mask=None)
+    start, goal = nodes_dict["60_30"]["id"], nodes_dict["60_90"]["id"]
+
+    uni = CountingAdj(adj)
+    _, d_uni = dijkstra(start, goal, uni)
+    stats = {}
+    _, d_bi = bidirectional_dijkstra(start, goal, adj, stats=stats)
+
+    assert abs(d_uni - d_bi) < 1e-9
+    assert stats["expanded"] < 0.7 * uni.calls
+
+
+def test_find_path_selects_algorithm():
+    nodes, adj, water, _ = _graph_with_rocks(1)
+    start, goal = water[0], water[-1]
+
+    _, d_astar = find_path(start, goal, nodes, adj)
+    _, d_bi = find_path(start, goal, nodes, adj, "bidirectional_astar")
+    assert abs(d_astar - astar(start, goal, nodes, adj)[1]) < 1e-12
+    assert abs(d_astar - d_bi) < 1e-9
+
+    try:
+        find_path(start, goal, nodes, adj, "teleport")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown algorithm accepted")
@@ -0,0 +1,67 @@
+import random
+from math import inf
+
+from shapely.geometry import box
+from shapely.ops import unary_union
+
+from src.graph_builder.build_graph import generate_coarse_arrays, arrays_to_dicts, generate_coarse_lattice
+from src.pathfinding.corridor import corridor_astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.search import find_path
+from src.pathfinding.utils import find_nearest_node
+
+
+def _graph(land=None):
+    nodes_arr, edges = generate_coarse_arrays(10.0, 14.0, 70.0, 74.0, 0.05, land_mask=land)
+    nodes_dict, adj = arrays_to_dicts(nodes_arr, edges)
+    return {v["id"]: v for v in nodes_dict.values()}, adj
+
+
+def test_corridor_touches_small_fraction():
+    nodes, adj = _graph()
+    start, _ = find_nearest_node(11.0, 71.0, nodes)
+    goal, _ = find_nearest_node(11.5, 72.0, nodes)
+
+    stats = {}
+    path, dist = corridor_astar(start, goal, nodes, adj, stats=stats)
+    _, expected = dijkstra(start, goal, adj)
+
+    assert abs(dist - expected) < 1e-6
+    assert path[0] == start and path[-1] == goal
+    assert stats["rounds"] == 1
+    assert stats["touched"] < len(nodes) / 5
+
+
+def test_corridor_widens_around_land():
+    # a long wall across the great circle forces a detour far outside the first band
+    land = unary_union([box(71.9, 10.3, 72.1, 14.0)])
+    nodes, adj = _graph(land)
+    start, _ = find_nearest_node(12.0, 71.0, nodes)
+    goal, _ = find_nearest_node(12.0, 73.0, nodes)
+
+    stats = {}
+    path, dist = corridor_astar(start, goal, nodes, adj, stats=stats)
+    _, expected = dijkstra(start, goal, adj)
+    assert abs(dist - expected) < 1e-6
+    assert stats["rounds"] > 1
+
+    # fully walled off: no route, and the search still terminates
+    nodes, adj = _graph(unary_union([box(71.9, 9.0, 72.1, 15.0)]))
+    start, _ = find_nearest_node(12.0, 71.0, nodes)
+    goal, _ = find_nearest_node(12.0, 73.0, nodes)
+    assert corridor_astar(start, goal, nodes, adj) == (None, inf)
+
+
+def test_corridor_matches_dijkstra_on_lattice():
+    land = unary_union([box(70.9, 10.4, 71.0, 11.6), box(70.3, 11.5, 71.0, 11.6),
+                        box(70.3, 10.4, 71.0, 10.5), box(72.5, 12.0, 73.5, 12.4)])
+    lattice = generate_coarse_lattice(10.0, 14.0, 70.0, 74.0, 0.05, land_mask=land)
+    water = list(lattice)
+    rng = random.Random(7)
+    for _ in range(10):
+        start, goal = rng.choice(water), rng.choice(water)
+        _, expected = dijkstra(start, goal, lattice)
+        _, dist = find_path(start, goal, lattice.nodes, lattice, "corridor")
+        assert abs(dist - expected) < 1e-6
+
+    print("\n✔ Corridor A* tests passed")
@@ -0,0 +1,50 @@
+from src.graph_builder.build_graph import generate_coarse_arrays, arrays_to_dicts
+from src.graph_builder.csr_graph import CSRGraph, save_graph_csr
+from src.graph_builder.ocean_grid import load_graph_csr
+from src.graph_builder.config import COARSE_RES
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+
+
+def _small_graph():
+    return generate_coarse_arrays(
+        lat_min=10.0, lat_max=10.3, lon_min=70.0, lon_max=70.3,
+        res=COARSE_RES, land_mask=None
+    )
+
+
+def test_csr_roundtrip_and_search(tmp_path):
+    nodes_arr, edges = _small_graph()
+    save_graph_csr(edges["indptr"], edges["indices"], edges["weights"], tmp_path / "csr")
+
+    graph = load_graph_csr(tmp_path / "csr")
+    nodes_dict, adj = arrays_to_dicts(nodes_arr, edges)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+
+    # memory-mapped, not read into RAM
+    assert graph.indices.filename is not None
+    assert len(graph) == len(nodes)
+    assert [n for n, _ in graph.get(0)] == [n for n, _ in adj[0]]
+    assert graph.get(len(nodes)) is None
+
+    start, goal = 0, len(nodes) - 1
+    path_dict, dist_dict = astar(start, goal, nodes, adj)
+    path_csr, dist_csr = astar(start, goal, nodes, graph)
+    assert path_csr == path_dict
+    assert abs(dist_csr - dist_dict) < 1e-3
+
+    path_dj, dist_dj = dijkstra(start, goal, graph)
+    assert abs(dist_dj - dist_dict) < 1e-3
+
+    print("\n✔ CSR roundtrip test passed")
+
+
+def test_csr_from_dict():
+    nodes_arr, edges = _small_graph()
+    _, adj = arrays_to_dicts(nodes_arr, edges)
+
+    graph = CSRGraph.from_dict(adj)
+
+    assert (graph.indptr == edges["indptr"]).all()
+    assert (graph.indices == edges["indices"]).all()
+    assert dict(graph.items()).keys() == adj.keys()
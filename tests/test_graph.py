@@ -41,4 +41,34 @@ def test_small_coarse_grid():
     assert dist_km > 0, "Distance must be positive."
     assert dist_km < 20, f"Distance too large for coarse grid: {dist_km}"
 
-    print("\n✔ test_small_coarse_grid passed successfully!")
\ No newline at end of file
+    print("\n✔ test_small_coarse_grid passed successfully!")
+
+def test_coarse_arrays_match_dicts():
+    """Vectorized arrays and the legacy dict path describe the same graph."""
+    from src.graph_builder.build_graph import generate_coarse_arrays
+
+    nodes_arr, edges = generate_coarse_arrays(
+        lat_min=10.0, lat_max=10.2, lon_min=70.0, lon_max=70.2,
+        res=COARSE_RES, land_mask=None
+    )
+    nodes, adj = generate_coarse_grid(
+        lat_min=10.0, lat_max=10.2, lon_min=70.0, lon_max=70.2,
+        res=COARSE_RES, land_mask=None
+    )
+
+    assert len(nodes_arr["lat"]) == len(nodes) == 25
+    assert edges["indptr"][-1] == len(edges["indices"])
+
+    # corner node has 3 neighbours, interior node has 8
+    assert len(adj[0]) == 3
+    assert edges["indptr"][13] - edges["indptr"][12] == 8
+
+    v = nodes["2_2"]
+    a, b = edges["indptr"][v["id"]], edges["indptr"][v["id"] + 1]
+    assert [n for n, _ in adj[v["id"]]] == edges["indices"][a:b].tolist()
+    for (n, d), w in zip(adj[v["id"]], edges["weights"][a:b]):
+        other = nodes_arr["lat"][n], nodes_arr["lon"][n]
+        assert abs(d - haversine_km(v["lat"], v["lon"], *other)) < 1e-9
+        assert abs(d - w) < 1e-12
+
+    print("\n✔ test_coarse_arrays_match_dicts passed successfully!")
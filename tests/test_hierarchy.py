@@ -0,0 +1,43 @@
+from shapely.geometry import Polygon
+
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.graph_builder.hierarchy import build_hierarchical_graph
+from src.pathfinding.astar import astar
+from src.pathfinding.utils import find_nearest_node
+
+
+def test_fine_patch_stitched_into_coarse_grid():
+    nodes_dict, adj = generate_coarse_grid(10.0, 11.0, 70.0, 71.0, 0.05, land_mask=None)
+    coarse = {v["id"]: v for v in nodes_dict.values()}
+
+    # a rock too small for the coarse grid, resolved only by the fine patch
+    rock = Polygon([(70.445, 10.445), (70.475, 10.445), (70.475, 10.475), (70.445, 10.475)])
+    patch = (10.3, 10.6, 70.3, 70.6)
+    graph = build_hierarchical_graph(coarse, adj, [patch], res=0.01, land_mask=rock)
+
+    # 7 x 7 coarse nodes are replaced by 31 x 31 fine nodes minus the rock
+    assert len(graph.hidden) == 49
+    assert len(graph.nodes) == len(coarse) - 49 + 31 * 31 - 9
+    assert graph.get(nodes_dict["8_8"]["id"]) is None
+
+    start, _ = find_nearest_node(10.0, 70.0, graph.nodes)
+    goal, _ = find_nearest_node(10.45, 70.5, graph.nodes)
+    assert graph.nodes[start]["level"] == 0
+    assert graph.nodes[goal]["level"] == 1
+
+    path, dist = astar(start, goal, graph.nodes, graph)
+    assert path is not None
+    levels = [graph.nodes[n]["level"] for n in path]
+    # coarse first, then fine once the route enters the patch
+    assert levels == sorted(levels)
+    assert all(not rock.contains(_pt(graph.nodes[n])) for n in path)
+
+    _, coarse_dist = astar(0, nodes_dict["9_10"]["id"], coarse, adj)
+    assert abs(dist - coarse_dist) < 1.0
+
+    print("\n✔ Hierarchical graph test passed")
+
+
+def _pt(node):
+    from shapely.geometry import Point
+    return Point(node["lon"], node["lat"])
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from src.graph_builder import hot_swap, registry as registry_module
+from src.graph_builder.build_graph import generate_coarse_arrays
+from src.graph_builder.hot_swap import current_graph, GraphWatcher
+from src.graph_builder.registry import GraphRegistry
+from src.graph_builder.shared_artifacts import publish_node_store, publish_graph_csr
+from src.pathfinding.astar import astar
+from src.pathfinding.contraction import build_contraction_hierarchy, save_contraction_hierarchy
+from src.pathfinding.search import find_path
+
+
+def _publish(tmp_path, lat_max):
+    nodes, edges = generate_coarse_arrays(10.0, lat_max, 70.0, 70.5, 0.05, land_mask=None)
+    publish_node_store(nodes, tmp_path / "nodes")
+    publish_graph_csr(edges["indptr"], edges["indices"], edges["weights"], tmp_path / "csr")
+    return len(nodes["lat"])
+
+
+def _use_tmp_artifacts(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry_module, "NODE_STORE_DIR", tmp_path / "nodes")
+    monkeypatch.setattr(registry_module, "CSR_DIR", tmp_path / "csr")
+    monkeypatch.setattr(registry_module, "_converted", True)
+    monkeypatch.setattr(registry_module, "registry", GraphRegistry())
+    monkeypatch.setattr(hot_swap, "registry", registry_module.registry)
+    monkeypatch.setattr(hot_swap, "_current", None)
+    monkeypatch.setattr(hot_swap, "CH_DIR", tmp_path / "ch")
+    monkeypatch.setattr(hot_swap, "LANDMARK_DIR", tmp_path / "landmarks")
+
+
+def test_watcher_swaps_and_sessions_keep_old_version(tmp_path, monkeypatch):
+    _use_tmp_artifacts(tmp_path, monkeypatch)
+
+    n_old = _publish(tmp_path, 10.5)
+    old = current_graph()
+    assert old.version == 1 and len(old.nodes) == n_old
+    assert current_graph() is old
+
+    # nightly rebuild lands on disk
+    n_new = _publish(tmp_path, 10.8)
+    watcher = GraphWatcher(interval=0.01)
+    pending = watcher.poll()
+    assert pending is not None and current_graph() is old    # waits for a stable signature
+    assert watcher.poll(pending) is None and watcher.swaps == 1
+
+    new = current_graph()
+    assert new.version == 2 and len(new.nodes) == n_new
+    assert new.snap_index.snap(10.75, 70.25)[0] in new.nodes
+
+    # the in-flight session still routes on its own (old) version
+    path, dist = astar(0, n_old - 1, old.nodes, old.adj)
+    assert path[-1] == n_old - 1 and dist > 0
+    assert watcher.poll() is None                              # nothing new
+    watcher.start()
+    watcher.stop()
+    watcher.join(1.0)
+
+
+
+def test_snapshot_only_takes_tables_built_for_its_graph(tmp_path, monkeypatch):
+    _use_tmp_artifacts(tmp_path, monkeypatch)
+    _publish(tmp_path, 10.5)
+    graph = current_graph()
+    with pytest.raises(ValueError):
+        find_path(0, 1, graph.nodes, graph.adj, "ch", graph.tables)   # not built
+
+    save_contraction_hierarchy(build_contraction_hierarchy(graph.adj, graph.adj.num_nodes),
+                               tmp_path / "ch")
+    graph = hot_swap.swap_graph()
+    assert "ch" in graph.tables
+    expected = find_path(0, len(graph.nodes) - 1, graph.nodes, graph.adj, "dijkstra")
+    assert find_path(0, len(graph.nodes) - 1, graph.nodes, graph.adj, "ch", graph.tables)[1] \
+        == pytest.approx(expected[1])
+
+    # the graph is rebuilt, the hierarchy is not: ch is refused for the new version
+    time.sleep(0.01)
+    _publish(tmp_path, 10.8)
+    graph = hot_swap.swap_graph()
+    assert "ch" not in graph.tables
+    with pytest.raises(ValueError):
+        find_path(0, 1, graph.nodes, graph.adj, "ch", graph.tables)
+
+
+def test_watcher_survives_vanishing_artifacts(tmp_path, monkeypatch):
+    _use_tmp_artifacts(tmp_path, monkeypatch)
+    n_old = _publish(tmp_path, 10.5)
+    old = current_graph()
+    watcher = GraphWatcher(interval=0.01)
+
+    def renamed_away():
+        raise FileNotFoundError("nodes")
+
+    with monkeypatch.context() as m:
+        m.setattr(hot_swap, "_signature", renamed_away)
+        assert watcher.poll() is None and "FileNotFoundError" in watcher.last_error
+
+    # a rebuild caught between the node store and the CSR swap is not served
+    nodes, _ = generate_coarse_arrays(10.0, 10.8, 70.0, 70.5, 0.05, land_mask=None)
+    publish_node_store(nodes, tmp_path / "nodes")
+    pending = watcher.poll()
+    assert watcher.poll(pending) is None and watcher.swaps == 0
+    assert "out of sync" in watcher.last_error
+    assert current_graph() is old and len(old.nodes) == n_old
+
+    print("\n✔ Hot-swap tests passed")
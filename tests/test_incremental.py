@@ -0,0 +1,100 @@
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.incremental import DStarLite
+
+from helpers import grid_graph, node_at, without
+
+
+def _grid():
+    nodes, adj = grid_graph(13.0, 73.0)
+    return nodes, adj, node_at(nodes, 5, 5), node_at(nodes, 50, 55)
+
+
+def test_dstar_lite_matches_fresh_search():
+    nodes, adj, start, goal = _grid()
+
+    planner = DStarLite(start, goal, nodes, adj)
+    path, dist = planner.plan()
+    _, expected = dijkstra(start, goal, adj)
+    assert abs(dist - expected) < 1e-6
+    assert path[0] == start and path[-1] == goal
+
+    # sail a few steps, then a patch of obstacles shows up ahead of the ship
+    blocked = set()
+    for _ in range(4):
+        here = path[4]
+        planner.move_to(here)
+        ahead = nodes[path[8]]
+        new = {n for n, v in nodes.items()
+               if abs(v["lat"] - ahead["lat"]) < 0.2 and abs(v["lon"] - ahead["lon"]) < 0.2}
+        new -= {here, goal}
+        blocked |= new
+        planner.block(new)
+
+        path, dist = planner.plan()
+        _, expected = astar(here, goal, nodes, without(adj, blocked))
+        assert abs(dist - expected) < 1e-6
+        assert path[0] == here and path[-1] == goal
+        assert not blocked & set(path)
+
+        # repairing costs less than planning from scratch
+        fresh = DStarLite(here, goal, nodes, adj)
+        fresh.block(blocked)
+        fresh.plan()
+        assert planner.last_expanded < fresh.last_expanded
+
+    # obstacles clear again
+    planner.unblock(blocked)
+    path, dist = planner.plan()
+    _, expected = dijkstra(path[0], goal, adj)
+    assert abs(dist - expected) < 1e-6
+
+
+def test_dstar_lite_unreachable():
+    nodes, adj, start, goal = _grid()
+    planner = DStarLite(start, goal, nodes, adj)
+    # wall off the goal completely
+    ring = [m for m, _ in adj[goal]]
+    planner.block(ring)
+    assert planner.plan() == (None, float("inf"))
+
+    planner.unblock(ring[:1])
+    path, _ = planner.plan()
+    assert ring[0] in path
+
+    print("\n✔ D* Lite test passed")
+
+
+def test_navigator_replans_incrementally():
+    from src.core_engine.navigator import Navigator
+    from src.graph_builder.hot_swap import GraphSnapshot
+    from src.obstacle_detection.obstacle_engine import ObstacleEngine
+
+    nodes, adj, start, goal = _grid()
+    hazard = {"on": False}
+
+    def checker(lat, lon):
+        # a storm cell appears in the middle of the route once the voyage is under way
+        return hazard["on"] and 11.0 < lat < 11.6 and 70.6 < lon < 71.4
+
+    nav = Navigator.__new__(Navigator)
+    nav.graph = GraphSnapshot(nodes, adj, version=1, signature=None)
+    nav.nodes, nav.adj = nodes, adj
+    nav.obstacle_engine = ObstacleEngine(ml_checker=checker)
+    nav.threshold_km, nav.sleep = 1.5, 0
+
+    s, g = nodes[start], nodes[goal]
+    _, _, path, _, status = nav.compute_initial_route(s["lat"], s["lon"], g["lat"], g["lon"])
+    assert status == "OK"
+
+    hazard["on"] = True
+    new_path, new_dist, new_status = nav.replan(path[3])
+    assert new_status == "REROUTED"
+    assert new_path[0] == path[3] and new_path[-1] == goal
+    assert not any(checker(nodes[n]["lat"], nodes[n]["lon"]) for n in new_path)
+
+    # the storm passes: the planner unblocks and returns to the direct route
+    hazard["on"] = False
+    back, back_dist, back_status = nav.replan(path[3])
+    assert back_status == "OK" and back_dist < new_dist
+    assert not nav.planner.blocked
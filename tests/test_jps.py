@@ -0,0 +1,105 @@
+import random
+
+import pytest
+from shapely.geometry import box
+from shapely.ops import unary_union
+
+from src.graph_builder.build_graph import generate_coarse_lattice
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.jps import JumpPointSearch
+from src.pathfinding.search import find_path, API_ALGORITHMS
+from src.core_engine.get_path import get_shortest_path
+
+
+def _lattice(lat_min):
+    # a walled bay plus a breakwater; lat_min=-1 straddles the equator
+    land = unary_union([
+        box(70.9, lat_min + 0.4, 71.0, lat_min + 1.6),
+        box(70.3, lat_min + 1.5, 71.0, lat_min + 1.6),
+        box(70.3, lat_min + 0.4, 71.0, lat_min + 0.5),
+        box(71.4, lat_min - 0.1, 71.5, lat_min + 0.9),
+    ])
+    return generate_coarse_lattice(lat_min, lat_min + 2.0, 70.0, 72.0, 0.05, land_mask=land)
+
+
+def test_jps_matches_dijkstra():
+    for lat_min in (-1.0, 10.0, 45.0, -50.0):
+        lattice = _lattice(lat_min)
+        searcher = JumpPointSearch(lattice)
+        water = list(lattice)
+        rng = random.Random(int(lat_min))
+        for _ in range(12):
+            start, goal = rng.choice(water), rng.choice(water)
+            _, expected = dijkstra(start, goal, lattice)
+            path, dist = searcher.search(start, goal)
+            assert abs(dist - expected) < 1e-6
+            # every step is a real lattice edge and the lengths add up
+            assert path[0] == start and path[-1] == goal
+            total = sum(dict(lattice[a])[b] for a, b in zip(path, path[1:]))
+            assert abs(total - dist) < 1e-6
+
+
+def test_jps_registered_for_lattices_only():
+    lattice = _lattice(10.0)
+    water = list(lattice)
+    path, _ = find_path(water[0], water[-1], lattice.nodes, lattice, "jps")
+    assert path[0] == water[0] and path[-1] == water[-1]
+    assert find_path(water[0], water[0], lattice.nodes, lattice, "jps") == ([water[0]], 0.0)
+
+    with pytest.raises(ValueError):
+        find_path(0, 1, {}, {0: [(1, 1.0)]}, "jps")
+    # the API serves the CSR graph, so it does not offer jps
+    assert "jps" not in API_ALGORITHMS and "astar" in API_ALGORITHMS
+    with pytest.raises(ValueError):
+        get_shortest_path(10.0, 70.0, 10.5, 70.5, algorithm="jps")
+
+    print("\n✔ JPS test passed")
+
+
+def test_jump_memo_is_bounded(monkeypatch):
+    from src.pathfinding import jps as jps_module
+    monkeypatch.setattr(jps_module, "_MAX_JUMPS", 50)
+    lattice = _lattice(10.0)
+    searcher = JumpPointSearch(lattice)
+    water = list(lattice)
+    rng = random.Random(5)
+    for _ in range(10):
+        start, goal = rng.choice(water), rng.choice(water)
+        _, expected = dijkstra(start, goal, lattice)
+        assert abs(searcher.search(start, goal)[1] - expected) < 1e-6
+        assert len(searcher._jumps) <= 50
+
+
+def test_jps_on_overlay_keeps_one_searcher(monkeypatch):
+    from src.pathfinding import jps as jps_module
+    from src.pathfinding.overlay import BlockedOverlay
+
+    built = []
+
+    class Counting(JumpPointSearch):
+        def __init__(self, lattice):
+            built.append(lattice)
+            super().__init__(lattice)
+
+    monkeypatch.setattr(jps_module, "JumpPointSearch", Counting)
+    lattice = _lattice(10.0)
+    water = list(lattice)
+    rng = random.Random(9)
+    for _ in range(6):
+        view = BlockedOverlay(lattice, rng.sample(water, 60))
+        free = [n for n in water if n not in view.blocked]
+        start, goal = rng.choice(free), rng.choice(free)
+        _, expected = dijkstra(start, goal, view)
+        path, dist = find_path(start, goal, lattice.nodes, view, "jps")
+        assert abs(dist - expected) < 1e-6
+        assert path is None or not set(path) & view.blocked
+    assert built == [lattice]
+
+    # blocked endpoints, and the unblocked memo still answers plain queries
+    assert find_path(water[0], water[5], lattice.nodes, BlockedOverlay(lattice, [water[0]]), "jps")[0] is None
+    view = BlockedOverlay(lattice)
+    view.block_edges([(water[0], water[1])])
+    with pytest.raises(ValueError):
+        find_path(water[0], water[5], lattice.nodes, view, "jps")
+    _, expected = dijkstra(water[0], water[-1], lattice)
+    assert abs(find_path(water[0], water[-1], lattice.nodes, lattice, "jps")[1] - expected) < 1e-6
@@ -0,0 +1,77 @@
+import numpy as np
+from shapely import wkt
+from shapely.geometry import Point, Polygon, MultiPolygon
+
+from src.graph_builder.land_raster import rasterize_land_mask, cached_water_raster
+from src.graph_builder.build_graph import generate_coarse_grid
+
+
+def _land():
+    island = Polygon([(70.1, 10.1), (70.5, 10.1), (70.3, 10.6)])
+    atoll = Polygon([(70.6, 10.6), (70.9, 10.6), (70.9, 10.9), (70.6, 10.9)],
+                    holes=[[(70.7, 10.7), (70.8, 10.7), (70.8, 10.8), (70.7, 10.8)]])
+    return MultiPolygon([island, atoll])
+
+
+def test_raster_matches_point_within():
+    land = _land()
+    lats = 10.0 + np.arange(21) * 0.05
+    lons = 70.0 + np.arange(21) * 0.05
+
+    water = rasterize_land_mask(land, lats, lons)
+
+    expected = np.array([[not Point(lon, lat).within(land) for lon in lons] for lat in lats])
+    assert (water == expected).all()
+    assert not water.all() and water.any()
+
+    nodes, _ = generate_coarse_grid(10.0, 11.0, 70.0, 71.0, 0.05, land_mask=land)
+    assert len(nodes) == expected.sum()
+
+    print("\n✔ Land raster test passed")
+
+
+def test_water_raster_cache(tmp_path):
+    mask_file = tmp_path / "land.wkt"
+    mask_file.write_text(_land().wkt)
+    calls = []
+
+    def loader(path):
+        calls.append(path)
+        return wkt.loads(open(path).read())
+
+    args = (mask_file, 10.0, 11.0, 70.0, 71.0, 0.05, loader)
+    first = cached_water_raster(*args, cache_dir=tmp_path / "cache")
+    second = cached_water_raster(*args, cache_dir=tmp_path / "cache")
+    assert len(calls) == 1
+    assert (first == second).all()
+
+    # new mask content -> new cache entry
+    mask_file.write_text(Polygon([(70.0, 10.0), (70.2, 10.0), (70.2, 10.2)]).wkt)
+    third = cached_water_raster(*args, cache_dir=tmp_path / "cache")
+    assert len(calls) == 2
+    assert (third != first).any()
+
+
+def test_water_raster_cache_with_tiled_rasterize(tmp_path):
+    from src.graph_builder.config import COARSE_RES, CSR_DIR, NODE_STORE_DIR, graph_dirs
+    from src.graph_builder.tiled_build import tiled_water_raster
+
+    mask_file = tmp_path / "land.wkt"
+    mask_file.write_text(_land().wkt)
+    args = (mask_file, 10.0, 11.0, 70.0, 71.0, 0.05, lambda p: wkt.loads(open(p).read()))
+    stats = {}
+
+    def tiled(land):
+        return tiled_water_raster(10.0, 11.0, 70.0, 71.0, 0.05, land, tile_size=6,
+                                  workers=1, stats=stats)
+
+    water = cached_water_raster(*args, cache_dir=tmp_path / "cache", rasterize=tiled)
+    assert stats["tiles"] > 1
+    stats.clear()
+    again = cached_water_raster(*args, cache_dir=tmp_path / "cache", rasterize=tiled)
+    assert not stats and (again == water).all()
+    assert (water == cached_water_raster(*args, cache_dir=tmp_path / "other")).all()
+
+    # only the coarse build writes the directories the API serves
+    assert graph_dirs(COARSE_RES) == (NODE_STORE_DIR, CSR_DIR)
+    assert NODE_STORE_DIR not in graph_dirs(0.01) and CSR_DIR not in graph_dirs(0.01)
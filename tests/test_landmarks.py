@@ -0,0 +1,87 @@
+from math import inf
+
+from shapely.geometry import box
+from shapely.ops import unary_union
+
+from src.graph_builder.build_graph import generate_coarse_arrays, arrays_to_dicts
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.landmarks import (
+    select_landmarks, LandmarkTable, alt_search, save_landmarks, load_landmarks,
+)
+from src.pathfinding.utils import find_nearest_node
+
+from helpers import CountingAdj
+
+
+def _bay_graph():
+    # a bay open to the west: routes from inside to the east must sail around it
+    land = unary_union([
+        box(70.9, 10.4, 71.0, 11.6),
+        box(70.3, 11.5, 71.0, 11.6),
+        box(70.3, 10.4, 71.0, 10.5),
+    ])
+    nodes_arr, edges = generate_coarse_arrays(10.0, 12.0, 70.0, 72.0, 0.05, land_mask=land)
+    nodes_dict, adj = arrays_to_dicts(nodes_arr, edges)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+    start, _ = find_nearest_node(11.0, 70.8, nodes)
+    goal, _ = find_nearest_node(11.0, 71.6, nodes)
+    return nodes, adj, start, goal
+
+
+def test_alt_expands_fewer_nodes():
+    nodes, adj, start, goal = _bay_graph()
+    table = LandmarkTable(*select_landmarks(adj, k=8, num_nodes=len(nodes)))
+    _, expected = dijkstra(start, goal, adj)
+
+    plain = CountingAdj(adj)
+    _, dist = astar(start, goal, nodes, plain)
+    assert abs(dist - expected) < 1e-6
+
+    counting = CountingAdj(adj)
+    path, dist = alt_search(start, goal, nodes, counting, table=table)
+    assert abs(dist - expected) < 1e-6
+    assert path[0] == start and path[-1] == goal
+    assert counting.calls < plain.calls / 2
+
+
+def test_alt_valid_after_blocking(tmp_path):
+    nodes, adj, start, goal = _bay_graph()
+    save_landmarks(LandmarkTable(*select_landmarks(adj, k=6, num_nodes=len(nodes))), tmp_path / "lm")
+    table = load_landmarks(tmp_path / "lm")
+
+    # block the western part of the bay mouth after the tables were built
+    blocked = {n for n, v in nodes.items() if v["lon"] < 70.3 and 10.6 < v["lat"] < 11.4}
+    blocked_adj = {n: [(m, d) for m, d in nb if m not in blocked]
+                   for n, nb in adj.items() if n not in blocked}
+
+    _, expected = dijkstra(start, goal, blocked_adj)
+    _, dist = alt_search(start, goal, nodes, blocked_adj, table=table)
+    assert abs(dist - expected) < 1e-6
+
+    assert table.lower_bound(start, goal) <= expected
+
+
+def test_alt_disconnected():
+    adj = {0: [(1, 1.0)], 1: [(0, 1.0)], 2: []}
+    table = LandmarkTable(*select_landmarks(adj, k=2, num_nodes=3))
+    assert list(table.landmarks) == [1, 0]
+    assert table.lower_bound(0, 1) > 0.99
+    assert table.lower_bound(0, 2) == inf
+
+    print("\n✔ landmark heuristic test passed")
+
+
+def test_alt_bound_admissible_with_float32_rounding():
+    import numpy as np
+    rng = np.random.default_rng(0)
+    # long ocean distances whose differences are below the float32 spacing (~0.002 km)
+    exact = 20000.0 + rng.random((200, 8)) * 0.01
+    table = LandmarkTable(np.arange(8, dtype=np.int32), exact.astype(np.float32))
+    for goal in range(0, 200, 17):
+        for node in range(200):
+            true_bound = np.abs(exact[goal] - exact[node]).max()
+            assert table.lower_bound(node, goal) <= true_bound
+
+    exact64 = LandmarkTable(np.arange(8, dtype=np.int32), exact)
+    assert exact64.lower_bound(5, 0) == np.abs(exact[0] - exact[5]).max()
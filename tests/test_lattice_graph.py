@@ -0,0 +1,62 @@
+from shapely.geometry import Polygon
+
+from src.graph_builder.build_graph import generate_coarse_grid, generate_coarse_lattice
+from src.graph_builder.refine_patch import generate_patch, generate_patch_lattice
+from src.graph_builder.config import COARSE_RES, FINE_RES
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.reroute import reroute
+
+
+def test_lattice_matches_explicit_graph():
+    bbox = dict(lat_min=10.0, lat_max=10.3, lon_min=70.0, lon_max=70.3, res=COARSE_RES)
+    nodes_dict, adj = generate_coarse_grid(**bbox, land_mask=None)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+    lattice = generate_coarse_lattice(**bbox, land_mask=None)
+
+    # 7 x 7 cells -> 49 bits packed into 7 bytes
+    assert lattice.bits.nbytes == 7
+    assert len(lattice.nodes) == len(nodes)
+
+    # explicit ids are row-major over water cells, same as the lattice without land
+    for nid, neighbors in adj.items():
+        implicit = lattice.get(nid)
+        assert [n for n, _ in implicit] == [n for n, _ in neighbors]
+        for (_, a), (_, b) in zip(implicit, neighbors):
+            assert abs(a - b) < 1e-9
+
+    _, d_explicit = astar(0, 48, nodes, adj)
+    _, d_lattice = astar(0, 48, lattice.nodes, lattice)
+    _, d_dijkstra = dijkstra(0, 48, lattice)
+    assert abs(d_explicit - d_lattice) < 1e-9
+    assert abs(d_dijkstra - d_lattice) < 1e-9
+
+    print("\n✔ Lattice graph test passed")
+
+
+def test_patch_lattice_with_land():
+    land = Polygon([(70.015, 10.015), (70.035, 10.015), (70.035, 10.035), (70.015, 10.035)])
+    bbox = dict(lat_min=10.0, lat_max=10.05, lon_min=70.0, lon_max=70.05, res=FINE_RES)
+
+    nodes, adj = generate_patch(**bbox, land_mask=land)
+    lattice = generate_patch_lattice(**bbox, land_mask=land)
+
+    assert len(lattice.nodes) == len(nodes) == 36 - 4
+    land_cell = lattice.node_id(2, 2)
+    assert land_cell not in lattice.nodes
+    assert lattice.get(land_cell) is None
+    assert all(n != land_cell for n, _ in lattice.get(lattice.node_id(1, 1)))
+
+
+def test_reroute_on_lattice():
+    lattice = generate_coarse_lattice(lat_min=10.0, lat_max=10.1, lon_min=70.0,
+                                      lon_max=70.1, res=COARSE_RES, land_mask=None)
+
+    def checker(lat, lon):
+        return abs(lat - 10.05) < 1e-6 and abs(lon - 70.05) < 1e-6
+
+    path, dist, status = reroute(0, 8, lattice.nodes, lattice, checker)
+
+    assert status == "REROUTED"
+    assert lattice.node_id(1, 1) not in path
+    assert dist > 0
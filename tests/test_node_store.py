@@ -0,0 +1,36 @@
+from src.graph_builder.build_graph import generate_coarse_arrays, node_arrays_to_dicts
+from src.graph_builder.node_store import NodeStore, save_node_store
+from src.graph_builder.ocean_grid import load_nodes
+from src.graph_builder.config import COARSE_RES
+from src.pathfinding.utils import find_nearest_node, nodes_to_coordinates
+
+
+def test_node_store_roundtrip(tmp_path):
+    nodes_arr, _ = generate_coarse_arrays(
+        lat_min=10.0, lat_max=10.2, lon_min=70.0, lon_max=70.2,
+        res=COARSE_RES, land_mask=None
+    )
+    save_node_store(nodes_arr, tmp_path / "nodes")
+
+    nodes = load_nodes(tmp_path / "nodes")
+    legacy = {v["id"]: v for v in node_arrays_to_dicts(nodes_arr).values()}
+
+    assert isinstance(nodes, NodeStore)
+    assert len(nodes) == len(legacy)
+    for nid, v in legacy.items():
+        assert nodes[nid] == {"lat": v["lat"], "lon": v["lon"], "i": v["i"], "j": v["j"]}
+
+    assert 25 not in nodes and "0" not in nodes
+    assert nodes_to_coordinates([0, 6], nodes) == [(10.0, 70.0), (10.05, 70.05)]
+    assert find_nearest_node(10.06, 70.04, nodes)[0] == 6
+
+    print("\n✔ Node store test passed")
+
+
+def test_node_store_from_dict():
+    legacy = {0: {"lat": 1.0, "lon": 2.0, "i": 0, "j": 0},
+              1: {"lat": 1.5, "lon": 2.5, "i": 1, "j": 1}}
+
+    nodes = NodeStore.from_dict(legacy)
+
+    assert dict(nodes.items()) == legacy
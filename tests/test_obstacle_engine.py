@@ -27,3 +27,29 @@ def test_ml_checker_stub():
     engine = ObstacleEngine(ml_checker=fake_ml)
 
     assert engine.obstacle_checker(10, 20) is True
+
+
+def test_batch_matches_single_point():
+    land = Polygon([(20, 10), (21, 10), (21, 11), (20, 11)])
+    zone = Polygon([(70, 10), (71, 10), (71, 11), (70, 11)])
+    engine = ObstacleEngine(land_mask=land, restricted_polygons=[zone])
+
+    lats = [10.5, 12.0, 10.5, 15.0, 10.0]
+    lons = [20.5, 25.0, 70.5, 75.0, 20.5]
+    expected = [engine.obstacle_checker(lat, lon) for lat, lon in zip(lats, lons)]
+    assert engine.obstacle_checker_batch(lats, lons) == expected
+    assert engine.obstacle_checker_batch([], []) == []
+
+
+def test_batch_ml_checker_uses_threshold():
+    # ML checker reporting obstacle positions instead of a bool
+    def ml(lat, lon):
+        return [(10.0, 70.0)]
+
+    engine = ObstacleEngine(ml_checker=ml)
+    lats, lons = [10.0, 10.005, 10.5], [70.0, 70.0, 70.0]
+    assert engine.obstacle_checker_batch(lats, lons) == [True, True, False]
+    assert engine.obstacle_checker_batch(lats, lons, threshold_km=0.1) == [True, False, False]
+
+    engine.set_ml_checker(lambda lat, lon: [])
+    assert engine.obstacle_checker_batch(lats, lons) == [False, False, False]
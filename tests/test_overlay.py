@@ -0,0 +1,72 @@
+import copy
+
+from src.graph_builder.build_graph import generate_coarse_lattice
+from src.graph_builder.csr_graph import CSRGraph
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+from src.pathfinding.overlay import BlockedOverlay
+from src.pathfinding.reroute import reroute
+from src.pathfinding.search import find_path
+
+from helpers import grid_graph, without
+
+
+def test_overlay_matches_filtered_graph():
+    nodes, adj = grid_graph()
+    original = copy.deepcopy(adj)
+    wall = {n for n, v in nodes.items() if abs(v["lon"] - 70.25) < 1e-9 and v["lat"] < 10.4}
+
+    for base in (adj, CSRGraph.from_dict(adj)):
+        view = BlockedOverlay(base, wall)
+        _, expected = dijkstra(0, len(nodes) - 1, without(adj, wall))
+        path, dist = astar(0, len(nodes) - 1, nodes, view)
+        assert abs(dist - expected) < 1e-4
+        assert not wall & set(path)
+        assert len(view) == len(nodes) - len(wall)
+        assert next(iter(wall)) not in view
+
+    # the base graph is never touched
+    assert adj == original
+
+
+def test_overlays_compose_and_version():
+    nodes, adj = grid_graph()
+    zones = BlockedOverlay(adj, {12, 13})
+    voyage = BlockedOverlay(zones, {40})
+
+    assert voyage.is_blocked(12) and voyage.is_blocked(40)
+    assert voyage.all_blocked() == {12, 13, 40}
+    assert voyage.graph is adj
+    assert all(n not in (12, 13, 40) for n, _ in voyage.get(23))
+    assert voyage.get(12) is None and zones.get(40) is not None
+
+    stamp = voyage.stamp
+    assert not voyage.block([40])          # already blocked: no new version
+    assert voyage.stamp == stamp
+    zones.block([14])
+    assert voyage.stamp != stamp and voyage.is_blocked(14)
+    voyage.unblock([40])
+    assert not voyage.is_blocked(40)
+
+
+def test_reroute_uses_overlay():
+    nodes, adj = grid_graph()
+
+    def checker(lat, lon):
+        return 10.12 < lat < 10.38 and 70.12 < lon < 70.38
+
+    original = copy.deepcopy(adj)
+    path, _, status = reroute(0, len(nodes) - 1, nodes, adj, checker)
+    assert status == "REROUTED"
+    assert not any(checker(nodes[n]["lat"], nodes[n]["lon"]) for n in path)
+    assert adj == original
+    view = BlockedOverlay(adj, {n for n, v in nodes.items() if checker(v["lat"], v["lon"])})
+
+    # jps works on an overlay over a lattice
+    lattice = generate_coarse_lattice(10.0, 10.5, 70.0, 70.5, 0.05, land_mask=None)
+    lview = BlockedOverlay(lattice, view.blocked)
+    _, expected = dijkstra(0, len(nodes) - 1, lview)
+    _, dist = find_path(0, len(nodes) - 1, lattice.nodes, lview, "jps")
+    assert abs(dist - expected) < 1e-6
+
+    print("\n✔ Blocked overlay test passed")
@@ -0,0 +1,39 @@
+from shapely.geometry import Point, Polygon
+
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.graph_builder.quadtree import generate_quadtree_graph
+from src.pathfinding.astar import astar
+from src.pathfinding.utils import find_nearest_node
+
+
+def test_quadtree_merges_open_water():
+    island = Point(75.0, 5.0).buffer(0.6)
+    zone = Polygon([(72.0, 2.0), (72.5, 2.0), (72.5, 2.5), (72.0, 2.5)])
+    bbox = dict(lat_min=0.0, lat_max=10.0, lon_min=70.0, lon_max=80.0, res=0.05)
+
+    nodes, adj, labels = generate_quadtree_graph(**bbox, land_mask=island,
+                                                 restricted_polygons=[zone])
+    grid_nodes, grid_adj = generate_coarse_grid(**bbox, land_mask=island)
+
+    assert len(nodes) * 10 < len(grid_nodes)
+
+    # no leaf covers land or the restricted zone
+    for v in nodes.values():
+        assert not island.contains(Point(v["lon"], v["lat"]))
+    assert labels[int(round(5.0 / 0.05)), int(round(5.0 / 0.05))] == -1
+    assert labels[int(round(2.25 / 0.05)), int(round(2.25 / 0.05))] == -1
+
+    # route around the island, close to the full-resolution optimum
+    start = labels[int(round(5.0 / 0.05)), 0]
+    goal = labels[int(round(5.0 / 0.05)), -1]
+    path, dist = astar(start, goal, nodes, adj)
+    assert path is not None
+
+    # same endpoints on the full grid
+    g = {v["id"]: v for v in grid_nodes.values()}
+    s, _ = find_nearest_node(nodes[start]["lat"], nodes[start]["lon"], g)
+    t, _ = find_nearest_node(nodes[goal]["lat"], nodes[goal]["lon"], g)
+    _, grid_dist = astar(s, t, g, grid_adj)
+    assert abs(dist - grid_dist) / grid_dist < 0.05
+
+    print("\n✔ Quadtree graph test passed")
@@ -0,0 +1,60 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.graph_builder.csr_graph import CSRGraph, save_graph_csr
+from src.graph_builder.ocean_grid import load_graph_pickle, load_graph_csr
+from src.graph_builder.registry import GraphRegistry
+
+
+def _adj():
+    _, adj = generate_coarse_grid(10.0, 10.2, 70.0, 70.2, 0.05, land_mask=None)
+    return adj
+
+
+def test_registry_loads_once_and_reloads_on_change(tmp_path):
+    path = tmp_path / "graph.pkl"
+    with open(path, "wb") as f:
+        pickle.dump(_adj(), f)
+
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return load_graph_pickle(p)
+
+    registry = GraphRegistry()
+    first = registry.get(path, loader)
+    assert registry.get(path, loader) is first
+    assert len(calls) == 1
+
+    # shared instance is read-only
+    with pytest.raises(TypeError):
+        first[0] = []
+
+    # a rebuilt artifact (new mtime/size) is picked up on the next lookup
+    with open(path, "wb") as f:
+        pickle.dump({0: []}, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    second = registry.get(path, loader)
+    assert second is not first and len(second) == 1
+
+    (m,) = registry.metrics().values()
+    assert m["loads"] == 2 and m["hits"] == 1 and m["load_seconds"] >= 0
+
+
+def test_registry_freezes_arrays(tmp_path):
+    csr = CSRGraph.from_dict(_adj())
+    save_graph_csr(csr.indptr, csr.indices, csr.weights, tmp_path / "csr")
+
+    registry = GraphRegistry()
+    graph = registry.get(tmp_path / "csr", lambda p: load_graph_csr(p, mmap=False))
+    assert isinstance(graph, CSRGraph)
+    with pytest.raises(ValueError):
+        graph.weights[0] = np.float32(0.0)
+
+    print("\n✔ Graph registry tests passed")
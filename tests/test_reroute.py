@@ -2,6 +2,8 @@ from src.graph_builder.build_graph import generate_coarse_grid
 from src.pathfinding.reroute import reroute
 from src.graph_builder.config import COARSE_RES
 
+from helpers import grid_graph
+
 
 def fake_obstacle_checker(lat, lon):
     # Block only a narrow band (NOT the whole row)
@@ -34,3 +36,82 @@ def test_reroute():
     assert dist > 0
 
     print("\n✔ Reroute test passed")
+
+
+def test_reroute_loop_clears_region():
+    nodes, adj = grid_graph()
+    seen = []
+
+    def checker(lat, lon):
+        seen.append((lat, lon))
+        return 10.12 < lat < 10.38 and 70.12 < lon < 70.38
+
+    stats = {}
+    path, dist, status = reroute(0, len(nodes) - 1, nodes, adj, checker, stats=stats)
+
+    assert status == "REROUTED"
+    assert not any(checker(nodes[n]["lat"], nodes[n]["lon"]) for n in path)
+    assert stats["iterations"] >= 2 and stats["blocked"] > 0
+    # memoised: every point reaches the checker at most once
+    assert len(seen) - len(path) == stats["checker_calls"] == len(set(seen[:stats["checker_calls"]]))
+
+
+def test_reroute_checks_edges():
+    nodes, adj = grid_graph(lat_max=10.3, lon_max=70.3)
+
+    def at(lat, lon):
+        return next(n for n, v in nodes.items()
+                    if abs(v["lat"] - lat) < 1e-9 and abs(v["lon"] - lon) < 1e-9)
+
+    # a thin wall between grid columns: no node is flagged, only crossing edges
+    def checker(lat, lon):
+        return abs(lon - 70.125) < 1e-6 and lat > 10.07
+
+    start, goal = at(10.2, 70.0), at(10.2, 70.3)
+
+    path, _, status = reroute(start, goal, nodes, adj, checker)
+    assert status == "REROUTED"
+    mids = [((nodes[a]["lat"] + nodes[b]["lat"]) / 2, (nodes[a]["lon"] + nodes[b]["lon"]) / 2)
+            for a, b in zip(path, path[1:])]
+    assert not any(checker(lat, lon) for lat, lon in mids)
+
+
+def test_reroute_blocks_edge_between_endpoints():
+    nodes, adj = grid_graph(lat_max=10.3, lon_max=70.3)
+    start = next(n for n, v in nodes.items() if abs(v["lat"] - 10.1) < 1e-9 and abs(v["lon"] - 70.1) < 1e-9)
+    goal = next(n for n, v in nodes.items() if abs(v["lat"] - 10.1) < 1e-9 and abs(v["lon"] - 70.15) < 1e-9)
+
+    # only the direct start-goal crossing is flagged; both ends are protected
+    def checker(lat, lon):
+        return abs(lat - 10.1) < 1e-9 and abs(lon - 70.125) < 1e-9
+
+    path, _, status = reroute(start, goal, nodes, adj, checker)
+    assert status == "REROUTED"
+    assert path[0] == start and path[-1] == goal and len(path) > 2
+
+
+def test_reroute_uses_batch_checker_and_budget():
+    nodes, adj = grid_graph()
+
+    class Engine:
+        def __init__(self):
+            self.batches = 0
+
+        def obstacle_checker(self, lat, lon):
+            raise AssertionError("single-point path should not be used")
+
+        def obstacle_checker_batch(self, lats, lons, threshold_km=1.0):
+            self.batches += 1
+            return [10.12 < lat < 10.38 and 70.12 < lon < 70.38 for lat, lon in zip(lats, lons)]
+
+    engine = Engine()
+    stats = {}
+    path, _, status = reroute(0, len(nodes) - 1, nodes, adj, engine.obstacle_checker, stats=stats)
+    assert status == "REROUTED" and path
+    assert stats["checker_calls"] == engine.batches
+
+    path, dist, status = reroute(0, len(nodes) - 1, nodes, adj, engine.obstacle_checker,
+                                 max_iterations=1, stats=stats)
+    assert (path, status, stats["iterations"]) == (None, "Reroute failed", 1)
+
+    print("\n✔ Iterative reroute tests passed")
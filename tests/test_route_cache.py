@@ -0,0 +1,86 @@
+from shapely.geometry import box
+
+from src.core_engine import get_path, simulate_route as simulate_module
+from src.core_engine.route_cache import RouteCache
+from src.graph_builder import hot_swap
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.graph_builder.hot_swap import GraphSnapshot
+from src.obstacle_detection.obstacle_engine import ObstacleEngine
+
+
+class FakeClock:
+    now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_and_ttl_eviction():
+    clock = FakeClock()
+    cache = RouteCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # a is now most recent
+    cache.put("c", 3)                   # evicts b
+    assert cache.get("b") is None and cache.get("c") == 3
+
+    clock.now = 11.0
+    assert cache.get("a") is None       # expired
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (2, 2, 1, 1)
+    assert stats["hit_rate"] == 0.5 and stats["entries"] == 1
+
+
+def _use_grid(monkeypatch):
+    nodes_dict, adj = generate_coarse_grid(10.0, 10.5, 70.0, 70.5, 0.05, land_mask=None)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+    monkeypatch.setattr(hot_swap, "_current", GraphSnapshot(nodes, adj, version=7, signature=None))
+    cache = RouteCache()
+    monkeypatch.setattr(get_path, "route_cache", cache)
+    monkeypatch.setattr(simulate_module, "route_cache", cache)
+    return cache
+
+
+def test_get_shortest_path_is_cached(monkeypatch):
+    cache = _use_grid(monkeypatch)
+
+    first = get_path.get_shortest_path(10.01, 70.01, 10.49, 70.48)
+    # different raw coordinates that snap to the same nodes
+    second = get_path.get_shortest_path(10.0, 70.0, 10.5, 70.5)
+    assert second == first and second is not first
+    assert cache.hits == 1 and cache.misses == 1
+
+    # an anytime query reuses the cached exact route
+    third = get_path.get_shortest_path(10.0, 70.0, 10.5, 70.5, epsilon=2.0)
+    assert third["suboptimality_bound"] == 1.0 and cache.hits == 2
+
+    # callers own their result: mutating it leaves the cached entry intact
+    expected = {k: list(v) if isinstance(v, list) else v for k, v in first.items()}
+    second["path_node_ids"].clear()
+    second["path_latlon"].append((0.0, 0.0))
+    first["path_node_ids"].reverse()
+    assert get_path.get_shortest_path(10.0, 70.0, 10.5, 70.5) == expected
+
+    # a new graph version never sees old entries
+    hot_swap._current.version = 8
+    get_path.get_shortest_path(10.0, 70.0, 10.5, 70.5)
+    assert cache.misses == 2
+
+
+def test_simulate_cache_follows_obstacle_layer(monkeypatch):
+    cache = _use_grid(monkeypatch)
+    engine = ObstacleEngine(ml_checker=lambda lat, lon: False)
+
+    path_ids, _, dist, status = simulate_module.simulate_route(10.0, 70.0, 10.5, 70.5, engine=engine)
+    path_ids.reverse()
+    again, _, _, _ = simulate_module.simulate_route(10.0, 70.0, 10.5, 70.5, engine=engine)
+    assert status == "OK" and cache.hits == 1
+    assert again == path_ids[::-1]
+
+    # new restricted zone across the route: cached answer is no longer used
+    engine.add_restricted_zone(box(70.12, 10.12, 70.38, 10.38))
+    path_ids, _, new_dist, new_status = simulate_module.simulate_route(10.0, 70.0, 10.5, 70.5, engine=engine)
+    assert new_status == "REROUTED" and new_dist > dist
+    assert cache.misses == 2
+
+    print("\n✔ Route cache tests passed")
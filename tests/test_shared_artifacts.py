@@ -0,0 +1,95 @@
+import json
+import pickle
+from multiprocessing import get_context
+
+import numpy as np
+
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.graph_builder.csr_graph import load_graph_csr
+from src.graph_builder.node_store import load_node_store
+from src.graph_builder.shared_artifacts import ensure_mmap_artifacts
+
+
+def _legacy(tmp_path):
+    nodes_dict, adj = generate_coarse_grid(10.0, 10.3, 70.0, 70.3, 0.05, land_mask=None)
+    data = [{"id": v["id"], "lat": v["lat"], "lon": v["lon"], "i": v["i"], "j": v["j"]}
+            for v in nodes_dict.values()]
+    with open(tmp_path / "nodes.json", "w") as f:
+        json.dump(data, f)
+    with open(tmp_path / "graph.pkl", "wb") as f:
+        pickle.dump(adj, f)
+    return {d["id"]: d for d in data}, adj
+
+
+def _paths(tmp_path):
+    return dict(nodes_file=tmp_path / "nodes.json", node_store_dir=tmp_path / "nodes",
+                pickle_file=tmp_path / "graph.pkl", csr_dir=tmp_path / "csr",
+                lock_file=tmp_path / ".lock")
+
+
+def _convert(kwargs):
+    return [str(p) for p in ensure_mmap_artifacts(**kwargs)]
+
+
+def test_legacy_graph_converted_once(tmp_path):
+    nodes, adj = _legacy(tmp_path)
+    kwargs = _paths(tmp_path)
+
+    # several "workers" race; exactly one of them writes each artifact
+    with get_context("fork").Pool(3) as pool:
+        written = pool.map(_convert, [kwargs] * 3)
+    assert sorted(sum(written, [])) == sorted([str(tmp_path / "nodes"), str(tmp_path / "csr")])
+    assert ensure_mmap_artifacts(**kwargs) == []
+
+    store = load_node_store(tmp_path / "nodes")
+    graph = load_graph_csr(tmp_path / "csr")
+    assert isinstance(graph.indices, np.memmap) and not graph.indices.flags.writeable
+    assert len(store) == len(nodes)
+    for n in (0, len(nodes) // 2, len(nodes) - 1):
+        assert store[n]["lat"] == nodes[n]["lat"] and store[n]["i"] == nodes[n]["i"]
+        assert sorted(graph.get(n)) == sorted((m, np.float32(d)) for m, d in adj[n])
+
+    print("\n✔ Shared artifact tests passed")
+
+
+def test_legacy_nodes_without_grid_indices(tmp_path):
+    data = [{"id": 0, "lat": 10.0, "lon": 70.0}, {"id": 1, "lat": 10.05, "lon": 70.0}]
+    with open(tmp_path / "nodes.json", "w") as f:
+        json.dump(data, f)
+    kwargs = _paths(tmp_path)
+    assert ensure_mmap_artifacts(**kwargs) == [tmp_path / "nodes"]
+
+    store = load_node_store(tmp_path / "nodes")
+    assert store.i is None and store.j is None
+    assert store[1] == {"lat": 10.05, "lon": 70.0}
+
+
+def test_publish_restores_old_build_when_swap_fails(tmp_path, monkeypatch):
+    import os
+    import pytest
+    from src.graph_builder import shared_artifacts
+    from src.graph_builder.shared_artifacts import publish_node_store
+
+    nodes = {"lat": [10.0, 10.05], "lon": [70.0, 70.0], "i": [0, 1], "j": [0, 0]}
+    publish_node_store(nodes, tmp_path / "nodes")
+    locks = []
+    real_exclusive, real_rename = shared_artifacts._exclusive, os.rename
+
+    def recording_exclusive(path):
+        locks.append(path)
+        return real_exclusive(path)
+
+    def failing_rename(src, dst):
+        if ".tmp-" in str(src):
+            raise OSError("disk full")
+        return real_rename(src, dst)
+
+    monkeypatch.setattr(shared_artifacts, "_exclusive", recording_exclusive)
+    monkeypatch.setattr(shared_artifacts.os, "rename", failing_rename)
+    with pytest.raises(OSError):
+        publish_node_store({"lat": [1.0], "lon": [2.0], "i": [0], "j": [0]}, tmp_path / "nodes")
+
+    # the swap ran under the artifact lock and the previous build is back in place
+    assert locks == [tmp_path / ".shared_artifacts.lock"]
+    assert len(load_node_store(tmp_path / "nodes")) == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".shared_artifacts.lock", "nodes"]
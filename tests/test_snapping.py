@@ -0,0 +1,51 @@
+import numpy as np
+from shapely.geometry import box
+
+from src.graph_builder.build_graph import (
+    generate_coarse_arrays, arrays_to_dicts, generate_coarse_grid, generate_coarse_lattice,
+)
+from src.graph_builder.node_store import NodeStore
+from src.pathfinding.snapping import SnapIndex
+from src.pathfinding.utils import find_nearest_node
+
+
+def _queries(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    # inside, on land and well outside the grid
+    return rng.uniform(9.5, 12.5, n), rng.uniform(69.5, 72.5, n)
+
+
+def test_snap_matches_linear_scan():
+    land = box(70.6, 10.6, 71.4, 11.4)
+    nodes_arr, edges = generate_coarse_arrays(10.0, 12.0, 70.0, 72.0, 0.05, land_mask=land)
+    nodes_dict, _ = arrays_to_dicts(nodes_arr, edges)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+
+    lats, lons = _queries()
+    for table in (nodes, NodeStore.from_dict(nodes)):
+        index = SnapIndex.from_nodes(table)
+        assert index.cells is not None
+        ids, dists = index.snap_many(lats, lons)
+        for lat, lon, nid, d in zip(lats, lons, ids, dists):
+            _, expected_d = find_nearest_node(lat, lon, nodes)
+            # equal distance (ties may pick either node); single and batch agree
+            assert abs(d - expected_d) < 1e-9
+            assert index.snap(lat, lon) == (nid, d)
+
+
+def test_snap_without_grid_and_on_lattice():
+    nodes_dict, _ = generate_coarse_grid(10.0, 10.5, 70.0, 70.5, 0.05, land_mask=None)
+    # no grid indices: KD-tree only
+    nodes = {v["id"]: {"lat": v["lat"], "lon": v["lon"]} for v in nodes_dict.values()}
+    index = SnapIndex.from_nodes(nodes)
+    assert index.cells is None
+    nid, d = index.snap(10.21, 70.33)
+    assert (nid, d) == find_nearest_node(10.21, 70.33, nodes)
+
+    lattice = generate_coarse_lattice(10.0, 11.0, 70.0, 71.0, 0.05, land_mask=box(70.4, 10.4, 70.6, 10.6))
+    index = SnapIndex.from_nodes(lattice.nodes)
+    nid, d = index.snap(10.5, 70.5)          # centre of the land block
+    expected, expected_d = find_nearest_node(10.5, 70.5, lattice.nodes)
+    assert nid in lattice.nodes and abs(d - expected_d) < 1e-9
+
+    print("\n✔ Snapping tests passed")
@@ -0,0 +1,37 @@
+from shapely.geometry import Polygon
+
+from src.graph_builder.build_graph import generate_coarse_grid
+from src.graph_builder.tile_store import TiledGraph, write_tiled_graph
+from src.pathfinding.astar import astar
+from src.pathfinding.dijkstra import dijkstra
+
+
+def test_tiled_graph_paging(tmp_path):
+    land = Polygon([(70.1, 10.1), (70.5, 10.1), (70.3, 10.6)])
+    bbox = dict(lat_min=10.0, lat_max=11.0, lon_min=70.0, lon_max=71.0, res=0.05)
+    write_tiled_graph(tmp_path / "tiles", **bbox, land_mask=land, tile_size=5)
+
+    nodes_dict, adj = generate_coarse_grid(**bbox, land_mask=land)
+    nodes = {v["id"]: v for v in nodes_dict.values()}
+
+    # budget of roughly two tiles forces evictions along the route
+    graph = TiledGraph(tmp_path / "tiles", max_bytes=4000)
+    assert len(graph) == len(nodes)
+
+    start, goal = graph.node_id_at(0, 0), graph.node_id_at(20, 20)
+    assert graph.node_id_at(5, 6) is None  # on the island
+    assert graph.nodes[goal]["lat"] == nodes_dict["20_20"]["lat"]
+
+    path, dist = astar(start, goal, graph.nodes, graph)
+    _, expected = astar(nodes_dict["0_0"]["id"], nodes_dict["20_20"]["id"], nodes, adj)
+    assert abs(dist - expected) < 1e-3
+
+    stats = graph.stats()
+    assert stats["misses"] > 0 and stats["hits"] > 0
+    assert stats["evictions"] > 0
+    assert stats["resident_bytes"] <= 4000 or stats["resident_tiles"] == 1
+
+    _, dj = dijkstra(start, goal, graph)
+    assert abs(dj - expected) < 1e-3
+
+    print("\n✔ Tiled graph test passed")
@@ -0,0 +1,116 @@
+import numpy as np
+from shapely.geometry import Polygon
+
+from src.graph_builder.build_graph import generate_coarse_arrays
+from src.graph_builder.tiled_build import generate_tiled_arrays, split_tiles, prune_tile_cache
+
+
+def test_split_tiles_cover_grid():
+    tiles = split_tiles(10, 7, 4)
+
+    covered = np.zeros((10, 7), dtype=int)
+    for r0, r1, c0, c1 in tiles:
+        covered[r0:r1, c0:c1] += 1
+    assert (covered == 1).all()
+    assert len(tiles) == 6
+
+
+def test_tiled_build_matches_sequential():
+    land = Polygon([(70.1, 10.1), (70.5, 10.1), (70.3, 10.6)])
+    bbox = dict(lat_min=10.0, lat_max=11.0, lon_min=70.0, lon_max=71.0, res=0.05)
+
+    nodes, edges = generate_coarse_arrays(**bbox, land_mask=land)
+    for workers in (1, 2):
+        t_nodes, t_edges = generate_tiled_arrays(**bbox, land_mask=land,
+                                                 tile_size=6, workers=workers)
+        for key in ("lat", "lon", "i", "j"):
+            assert (t_nodes[key] == nodes[key]).all()
+        for key in ("indptr", "indices", "weights"):
+            assert (t_edges[key] == edges[key]).all()
+
+    print("\n✔ Tiled build test passed")
+
+
+def test_incremental_rebuild_uses_tile_cache(tmp_path):
+    bbox = dict(lat_min=10.0, lat_max=11.0, lon_min=70.0, lon_max=71.0, res=0.05)
+    island = Polygon([(70.1, 10.1), (70.3, 10.1), (70.2, 10.25)])
+    reef = Polygon([(70.7, 10.7), (70.9, 10.7), (70.8, 10.9)])
+    cache = tmp_path / "tiles"
+
+    stats = {}
+    generate_tiled_arrays(**bbox, land_mask=island.union(reef), tile_size=10,
+                          workers=1, cache_dir=cache, stats=stats)
+    assert stats["rebuilt"] == stats["tiles"]
+
+    stats = {}
+    generate_tiled_arrays(**bbox, land_mask=island.union(reef), tile_size=10,
+                          workers=1, cache_dir=cache, stats=stats)
+    assert stats["rebuilt"] == 0
+
+    # moving the reef only touches the tiles around it
+    moved = Polygon([(70.72, 10.7), (70.92, 10.7), (70.82, 10.9)])
+    stats = {}
+    nodes, edges = generate_tiled_arrays(**bbox, land_mask=island.union(moved), tile_size=10,
+                                         workers=1, cache_dir=cache, stats=stats)
+    assert 0 < stats["rebuilt"] < stats["tiles"]
+
+    fresh_nodes, fresh_edges = generate_coarse_arrays(**bbox, land_mask=island.union(moved))
+    assert (nodes["i"] == fresh_nodes["i"]).all() and (nodes["j"] == fresh_nodes["j"]).all()
+    assert (edges["indices"] == fresh_edges["indices"]).all()
+
+
+def test_tile_cache_survives_bbox_shift(tmp_path):
+    island = Polygon([(70.1, 10.1), (70.3, 10.1), (70.2, 10.25)])
+    cache = tmp_path / "tiles"
+    stats = {}
+    generate_tiled_arrays(lat_min=10.0, lat_max=11.0, lon_min=70.0, lon_max=71.0, res=0.05,
+                          land_mask=island, tile_size=10, workers=1, cache_dir=cache, stats=stats)
+    first = stats["tiles"]
+
+    # lat_min one row further south: 10.0 - 0.05 + k * 0.05 != 10.0 + (k - 1) * 0.05 bitwise
+    stats = {}
+    nodes, _ = generate_tiled_arrays(lat_min=9.95, lat_max=11.0, lon_min=70.0, lon_max=71.0,
+                                     res=0.05, land_mask=island, tile_size=10, workers=1,
+                                     cache_dir=cache, stats=stats)
+    assert stats["tiles"] > first and stats["cached"] == first
+    fresh, _ = generate_coarse_arrays(lat_min=9.95, lat_max=11.0, lon_min=70.0, lon_max=71.0,
+                                      res=0.05, land_mask=island)
+    assert (nodes["i"] == fresh["i"]).all() and (nodes["j"] == fresh["j"]).all()
+
+
+def test_tile_cache_keeps_sub_cell_shifts_apart(tmp_path):
+    from src.graph_builder.land_raster import rasterize_land_mask
+    from src.graph_builder.tiled_build import tiled_water_raster
+
+    land = Polygon([(70.1, 10.1), (70.5, 10.1), (70.3, 10.6)])
+    cache = tmp_path / "tiles"
+    tiled_water_raster(10.0, 11.0, 70.0, 71.0, 0.05, land, tile_size=10, workers=1, cache_dir=cache)
+
+    # same cells after rounding, but sampled 0.02 degrees off: nothing may come from the cache
+    stats = {}
+    water = tiled_water_raster(10.02, 11.02, 70.02, 71.02, 0.05, land, tile_size=10, workers=1,
+                               cache_dir=cache, stats=stats)
+    assert stats["cached"] == 0
+    lats = 10.02 + np.arange(water.shape[0]) * 0.05
+    lons = 70.02 + np.arange(water.shape[1]) * 0.05
+    assert (water == rasterize_land_mask(land, lats, lons)).all()
+
+    # the shifted grid is cached under its own keys
+    stats = {}
+    tiled_water_raster(10.02, 11.02, 70.02, 71.02, 0.05, land, tile_size=10, workers=1,
+                       cache_dir=cache, stats=stats)
+    assert stats["rebuilt"] == 0
+
+
+def test_prune_tile_cache(tmp_path):
+    import os
+    for k in range(5):
+        f = tmp_path / f"tile_{k}.npy"
+        f.write_bytes(b"x" * 100)
+        os.utime(f, (1000 + k, 1000 + k))
+
+    assert prune_tile_cache(tmp_path, max_bytes=250) == 3
+    assert sorted(f.name for f in tmp_path.iterdir()) == ["tile_3.npy", "tile_4.npy"]
+    # recently used tiles are kept even over budget
+    assert prune_tile_cache(tmp_path, max_bytes=0, keep_since=1004) == 1
+    assert [f.name for f in tmp_path.iterdir()] == ["tile_4.npy"]